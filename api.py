@@ -0,0 +1,210 @@
+"""API JSON sans interface (intégration CRM) : mêmes KPI et séries que l'app.
+
+    POST /simulation   un bien (paramètres de la barre latérale)  -> KPI + séries annuelles
+    POST /simulations  {"biens": [...]}                            -> une réponse par bien
+    POST /echeanciers  {"biens": [...]}                            -> échéanciers mensuels en CSV (flux)
+    GET  /sante        état du service
+
+Les paramètres reprennent les colonnes du portefeuille (loyer_hc, provision,
+taux_gestion, gli, taux_gli, pno, credit_mensuel, capital, taux_credit, duree,
+tf_annuelle, copro_annuelle, taux_placement) avec les mêmes valeurs par défaut.
+Les lots volumineux sont calculés en une passe vectorisée sur le pool de
+processus partagé, sans bloquer la boucle asyncio.
+
+Usage : python api.py [--host 0.0.0.0] [--port 8502]
+"""
+import argparse
+import asyncio
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from echeancier import blocs_echeancier
+from moteur import MOIS_PAR_AN, calculer_indicateurs, capital_rembourse_au_mois, cashflow_au_mois
+from portefeuille import COLONNES_BOOLEENNES, COLONNES_OBLIGATOIRES, DUREE_MAX_ANNEES, VALEURS_DEFAUT, VALEURS_VRAIES
+from travaux import executeur, reinitialiser_executeur
+
+SEUIL_POOL = 64          # au-delà, le lot est calculé dans un processus du pool
+TAILLE_MAX_LOT = 10_000
+KPIS = ("loyer_cc", "total_frais_gestion", "cashflow_brut_mensuel", "cashflow_net_mensuel")
+
+
+# --- PRÉPARATION DES DONNÉES ---
+def _booleen(valeur):
+    if isinstance(valeur, str):
+        return valeur.strip().lower() in VALEURS_VRAIES
+    return bool(valeur)
+
+
+def _nombre(valeur, defaut):
+    try:
+        return float(valeur)
+    except (TypeError, ValueError):
+        return defaut
+
+
+def colonnes(biens):
+    """Colonnes numpy d'une liste de biens JSON, mêmes règles que ``portefeuille.normaliser``.
+
+    Évite le DataFrame intermédiaire : pour une requête d'un seul bien, pandas
+    coûte plus cher que tout le calcul. Les valeurs non finies (NaN, Infinity), les
+    durées non entières et celles hors de 1..``DUREE_MAX_ANNEES`` ans sont refusées
+    avant tout calcul.
+    """
+    for colonne in COLONNES_OBLIGATOIRES:
+        for k, bien in enumerate(biens):
+            if bien.get(colonne) is None:
+                raise ValueError(f"Bien {k} : colonne obligatoire manquante : {colonne}")
+            if _nombre(bien[colonne], None) is None:
+                raise ValueError(f"Bien {k} : valeur invalide pour {colonne} : {bien[colonne]!r}")
+    bloc = {colonne: np.array([float(b[colonne]) for b in biens]) for colonne in COLONNES_OBLIGATOIRES}
+    for colonne, defaut in VALEURS_DEFAUT.items():
+        valeurs = [b.get(colonne) for b in biens]
+        if colonne in COLONNES_BOOLEENNES:
+            bloc[colonne] = np.array([defaut if v is None else _booleen(v) for v in valeurs], dtype=bool)
+        else:
+            bloc[colonne] = np.array([_nombre(v, defaut) for v in valeurs], dtype=np.float64)
+    for colonne, valeurs in bloc.items():
+        invalides = np.flatnonzero(~np.isfinite(valeurs))
+        if invalides.size:
+            raise ValueError(f"Bien {invalides[0]} : valeur non finie pour {colonne}")
+    if ((bloc["duree"] < 1) | (bloc["duree"] > DUREE_MAX_ANNEES)).any():
+        raise ValueError(f"La durée restante doit être comprise entre 1 et {DUREE_MAX_ANNEES} ans")
+    non_entieres = np.flatnonzero(bloc["duree"] % 1)
+    if non_entieres.size:
+        raise ValueError(f"Bien {non_entieres[0]} : la durée restante doit être un nombre entier d'années")
+    bloc["duree"] = bloc["duree"].astype(np.int64)
+    return bloc
+
+
+# --- CALCUL ---
+def simuler_biens(biens):
+    """KPI et séries annuelles d'une liste de biens (dicts), en une passe vectorisée."""
+    bloc = colonnes(biens)
+    indicateurs = calculer_indicateurs(
+        bloc["loyer_hc"], bloc["provision"], bloc["taux_gestion"], bloc["gli"],
+        bloc["taux_gli"], bloc["pno"], bloc["credit_mensuel"],
+        bloc["tf_annuelle"], bloc["copro_annuelle"],
+    )
+    durees = bloc["duree"]
+    # Formes fermées évaluées en fin d'année seulement (mois 12, 24, ...), sans série mensuelle
+    mois = np.arange(1, int(durees.max()) + 1) * MOIS_PAR_AN
+    cashflow = cashflow_au_mois(np.atleast_1d(indicateurs.cashflow_net_mensuel)[:, None], bloc["taux_placement"][:, None], mois)
+    capital = capital_rembourse_au_mois(bloc["capital"][:, None], bloc["taux_credit"][:, None], durees[:, None] * MOIS_PAR_AN, mois)
+    cashflow, patrimoine = np.round(cashflow, 2), np.round(cashflow + capital, 2)
+    kpis = {nom: np.round(np.atleast_1d(getattr(indicateurs, nom)), 2) for nom in KPIS}
+
+    resultats = []
+    for k, duree in enumerate(durees):
+        resultats.append({
+            "kpis": {nom: float(valeurs[k]) for nom, valeurs in kpis.items()},
+            "series": {
+                "annees": list(range(1, int(duree) + 1)),
+                "cashflow_cumul": cashflow[k, :duree].tolist(),
+                "patrimoine": patrimoine[k, :duree].tolist(),
+            },
+            "patrimoine_horizon": float(patrimoine[k, duree - 1]),
+        })
+    return resultats
+
+
+async def _simuler(biens):
+    if len(biens) <= SEUIL_POOL:
+        return simuler_biens(biens)
+    pool = executeur()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(pool, simuler_biens, biens)
+    except BrokenProcessPool:
+        reinitialiser_executeur(pool)
+        raise
+
+
+# --- ROUTES ---
+def _erreur(message, statut=400):
+    return JSONResponse({"erreur": message}, status_code=statut)
+
+
+async def _lire_json(request):
+    try:
+        return await request.json()
+    except ValueError:
+        return None
+
+
+async def simulation(request):
+    bien = await _lire_json(request)
+    if not isinstance(bien, dict):
+        return _erreur("Le corps doit être un objet JSON décrivant un bien")
+    try:
+        [resultat] = await _simuler([bien])
+    except (ValueError, TypeError) as exc:
+        return _erreur(str(exc))
+    return JSONResponse(resultat)
+
+
+async def simulations(request):
+    corps = await _lire_json(request)
+    biens = corps.get("biens") if isinstance(corps, dict) else None
+    if not isinstance(biens, list) or not all(isinstance(b, dict) for b in biens):
+        return _erreur('Le corps doit être de la forme {"biens": [{...}, ...]}')
+    if len(biens) > TAILLE_MAX_LOT:
+        return _erreur(f"Au plus {TAILLE_MAX_LOT} biens par requête", 413)
+    if not biens:
+        return JSONResponse({"resultats": []})
+    try:
+        resultats = await _simuler(biens)
+    except (ValueError, TypeError) as exc:
+        return _erreur(str(exc))
+    return JSONResponse({"resultats": resultats})
+
+
+def _csv_par_blocs(bloc_colonnes):
+    entete = True
+    for lignes in blocs_echeancier(bloc_colonnes):
+        yield lignes.to_csv(index=False, header=entete).encode("utf-8")
+        entete = False
+
+
+async def echeanciers(request):
+    """Échéanciers mensuels en CSV long (bien, mois, ...), envoyés bloc par bloc au fil du calcul."""
+    corps = await _lire_json(request)
+    biens = corps.get("biens") if isinstance(corps, dict) else None
+    if not isinstance(biens, list) or not biens or not all(isinstance(b, dict) for b in biens):
+        return _erreur('Le corps doit être de la forme {"biens": [{...}, ...]}')
+    if len(biens) > TAILLE_MAX_LOT:
+        return _erreur(f"Au plus {TAILLE_MAX_LOT} biens par requête", 413)
+    try:
+        bloc = colonnes(biens)
+    except (ValueError, TypeError) as exc:
+        return _erreur(str(exc))
+    return StreamingResponse(_csv_par_blocs(bloc), media_type="text/csv")
+
+
+async def sante(request):
+    return JSONResponse({"statut": "ok"})
+
+
+app = Starlette(routes=[
+    Route("/simulation", simulation, methods=["POST"]),
+    Route("/simulations", simulations, methods=["POST"]),
+    Route("/echeanciers", echeanciers, methods=["POST"]),
+    Route("/sante", sante, methods=["GET"]),
+])
+
+
+# --- POINT D'ENTRÉE ---
+def main(argv=None):
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="API JSON de simulation PATRIM Gestion.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    args = parser.parse_args(argv)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Images statiques de l'app (logo, arcades) : chargées et optimisées une fois par processus.
+
+Les PNG d'origine (plusieurs milliers de pixels de large) sont redimensionnés à
+leur taille d'affichage et ré-encodés en WebP, puis nommés d'après leur empreinte
+(``logo.<sha>.webp``) pour être mis en cache indéfiniment par le navigateur.
+L'empreinte dépend de l'image d'origine et des réglages : un processus qui démarre
+relit la version déjà produite dans ``static/`` au lieu de ré-encoder (démarrage à
+froid). ``python assets.py`` la prépare à l'avance, par exemple à la construction
+de l'image du conteneur.
+Si le service statique de Streamlit est actif (``server.enableStaticServing``),
+les pages ne transportent plus qu'une URL ; sinon, un data URI calculé une seule
+fois sert de repli.
+"""
+import base64
+import hashlib
+import io
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+
+DOSSIER_APP = os.path.dirname(os.path.abspath(__file__))
+DOSSIER_STATIC = os.path.join(DOSSIER_APP, "static")
+URL_STATIC = "app/static"
+
+# (largeur maximale utile en px, qualité WebP) : le logo est affiché à 300px (x2 pour
+# les écrans haute densité), les arcades en fond plein écran à 5 % d'opacité
+OPTIMISATIONS = {"logo.png": (600, 85), "arcades.png": (1280, 50)}
+OPTIMISATION_DEFAUT = (None, 80)
+METHODE_WEBP = 4   # 6 ne gagne que ~2 % de poids pour un encodage 50 fois plus lent (~11 s au démarrage)
+
+
+@dataclass(frozen=True)
+class Asset:
+    nom: str
+    mime: str
+    donnees: bytes
+    empreinte: str
+
+    @property
+    def nom_fichier(self):
+        base = os.path.splitext(self.nom)[0]
+        extension = self.mime.split("/")[-1]
+        return f"{base}.{self.empreinte}.{extension}"
+
+    @property
+    def data_uri(self):
+        return f"data:{self.mime};base64,{base64.b64encode(self.donnees).decode()}"
+
+
+def _reencoder(brut, largeur_max, qualite):
+    """Redimensionne et convertit en WebP ; renvoie l'image d'origine si Pillow est absent."""
+    try:
+        from PIL import Image
+    except ImportError:
+        return brut, "image/png"
+    with Image.open(io.BytesIO(brut)) as image:
+        if largeur_max and image.width > largeur_max:
+            hauteur = round(image.height * largeur_max / image.width)
+            image = image.resize((largeur_max, hauteur), Image.LANCZOS)
+        sortie = io.BytesIO()
+        image.save(sortie, "WEBP", quality=qualite, method=METHODE_WEBP)
+    return sortie.getvalue(), "image/webp"
+
+
+@lru_cache(maxsize=None)
+def charger(nom):
+    """Image optimisée et empreinte, ou None si le fichier n'existe pas."""
+    chemin = os.path.join(DOSSIER_APP, nom)
+    if not os.path.exists(chemin):
+        return None
+    with open(chemin, "rb") as f:
+        brut = f.read()
+    optimisation = OPTIMISATIONS.get(nom, OPTIMISATION_DEFAUT)
+    empreinte = hashlib.sha256(brut + repr((optimisation, METHODE_WEBP)).encode()).hexdigest()[:12]
+    deja_optimisee = os.path.join(DOSSIER_STATIC, f"{os.path.splitext(nom)[0]}.{empreinte}.webp")
+    if os.path.exists(deja_optimisee):
+        with open(deja_optimisee, "rb") as f:
+            return Asset(nom, "image/webp", f.read(), empreinte)
+    donnees, mime = _reencoder(brut, *optimisation)
+    return Asset(nom, mime, donnees, empreinte)
+
+
+def _publier(asset):
+    """Écrit l'image dans static/ sous son nom à empreinte (sans réécrire un fichier existant)."""
+    chemin = os.path.join(DOSSIER_STATIC, asset.nom_fichier)
+    if not os.path.exists(chemin):
+        os.makedirs(DOSSIER_STATIC, exist_ok=True)
+        temporaire = f"{chemin}.{os.getpid()}.tmp"
+        with open(temporaire, "wb") as f:
+            f.write(asset.donnees)
+        os.replace(temporaire, chemin)
+    return f"{URL_STATIC}/{asset.nom_fichier}"
+
+
+@lru_cache(maxsize=None)
+def url(nom, service_statique=False):
+    """URL de l'image pour le HTML/CSS : chemin statique si possible, data URI sinon (None si absente)."""
+    asset = charger(nom)
+    if asset is None:
+        return None
+    try:
+        chemin_public = _publier(asset)  # sert aussi de cache aux processus suivants
+    except OSError:
+        chemin_public = None  # système de fichiers en lecture seule : repli sur le data URI
+    if service_statique and chemin_public:
+        return chemin_public
+    return asset.data_uri
+
+
+if __name__ == "__main__":
+    for nom_image in OPTIMISATIONS:
+        image = charger(nom_image)
+        if image is not None:
+            print(_publier(image))
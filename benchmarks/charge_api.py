@@ -0,0 +1,90 @@
+"""Test de charge de l'API JSON (api.py) : requêtes/s soutenues et latences p50/p95/p99.
+
+Client HTTP/1.1 keep-alive minimal sur asyncio (aucune dépendance) : ``--connexions``
+clients envoient des requêtes en boucle pendant ``--duree`` secondes.
+
+Usage : python benchmarks/charge_api.py [--url http://127.0.0.1:8502] [--connexions 32] [--duree 10] [--lot 1]
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from urllib.parse import urlsplit
+
+
+def _corps(taille_lot, rng):
+    def bien():
+        return {
+            "loyer_hc": rng.randrange(300, 2000, 10), "provision": rng.randrange(0, 150, 5),
+            "taux_gestion": rng.choice([4.0, 5.0, 6.5, 8.0]), "gli": rng.random() < 0.7, "taux_gli": 2.8,
+            "pno": True, "credit_mensuel": rng.randrange(0, 900, 10), "capital": rng.randrange(0, 200_000, 1000),
+            "taux_credit": 3.5, "duree": rng.randint(5, 25),
+        }
+    if taille_lot == 1:
+        return "/simulation", json.dumps(bien()).encode()
+    return "/simulations", json.dumps({"biens": [bien() for _ in range(taille_lot)]}).encode()
+
+
+async def _requete(lecteur, ecrivain, hote, chemin, corps):
+    ecrivain.write(
+        f"POST {chemin} HTTP/1.1\r\nHost: {hote}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(corps)}\r\nConnection: keep-alive\r\n\r\n".encode() + corps
+    )
+    await ecrivain.drain()
+    statut = int((await lecteur.readline()).split()[1])
+    longueur = 0
+    while (ligne := await lecteur.readline()) not in (b"\r\n", b""):
+        nom, _, valeur = ligne.decode().partition(":")
+        if nom.lower() == "content-length":
+            longueur = int(valeur)
+    await lecteur.readexactly(longueur)
+    return statut
+
+
+async def _client(url, fin, taille_lot, graine, latences, erreurs):
+    rng = random.Random(graine)
+    lecteur, ecrivain = await asyncio.open_connection(url.hostname, url.port or 80)
+    try:
+        while time.perf_counter() < fin:
+            chemin, corps = _corps(taille_lot, rng)
+            debut = time.perf_counter()
+            statut = await _requete(lecteur, ecrivain, url.netloc, chemin, corps)
+            latences.append(time.perf_counter() - debut)
+            if statut != 200:
+                erreurs.append(statut)
+    finally:
+        ecrivain.close()
+
+
+async def charger(url, connexions, duree, taille_lot):
+    url = urlsplit(url)
+    latences, erreurs = [], []
+    debut = time.perf_counter()
+    await asyncio.gather(*(_client(url, debut + duree, taille_lot, k, latences, erreurs) for k in range(connexions)))
+    ecoule = time.perf_counter() - debut
+    quantiles = statistics.quantiles(latences, n=100) if len(latences) > 1 else latences * 99
+    return {
+        "requetes": len(latences),
+        "erreurs": len(erreurs),
+        "requetes_par_s": round(len(latences) / ecoule, 1),
+        "biens_par_s": round(len(latences) * taille_lot / ecoule, 1),
+        "p50_ms": round(quantiles[49] * 1000, 2),
+        "p95_ms": round(quantiles[94] * 1000, 2),
+        "p99_ms": round(quantiles[98] * 1000, 2),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Test de charge de l'API PATRIM Gestion.")
+    parser.add_argument("--url", default="http://127.0.0.1:8502")
+    parser.add_argument("--connexions", type=int, default=32)
+    parser.add_argument("--duree", type=float, default=10.0, help="Durée du test en secondes")
+    parser.add_argument("--lot", type=int, default=1, help="Biens par requête (1 = /simulation, sinon /simulations)")
+    args = parser.parse_args(argv)
+    print(json.dumps(asyncio.run(charger(args.url, args.connexions, args.duree, args.lot)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
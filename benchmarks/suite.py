@@ -0,0 +1,332 @@
+"""Banc de mesure de PATRIM Gestion : moteur, reruns Streamlit et octets émis.
+
+Quatre parties, sélectionnables avec ``--parties`` :
+
+    micro      calculs du moteur (projection longue, lots, grille, Monte Carlo, solveur, offres)
+    reruns     durée des reruns de gestion_app.py pilotés par AppTest (interactions typiques)
+    octets     taille des éléments émis par rerun (bloc CSS, images base64, JSON Plotly)
+    demarrage  démarrage à froid, dans un interpréteur neuf : imports et premier affichage
+
+Chaque exécution est ajoutée à un historique JSON local (propre à la machine). Une
+mesure dépassant de plus de ``--seuil`` la médiane des ``--fenetre`` dernières
+exécutions est signalée comme régression (code de sortie 1). Sans historique local
+pour une mesure (clone neuf, CI), la comparaison se fait avec la référence versionnée
+``benchmarks/reference.json``, réécrite par ``--ecrire-reference`` : pour toutes les
+mesures si elle vient de la même machine, sinon seulement pour celles qui ne dépendent
+pas du matériel (octets émis, modules chargés). Toutes les mesures sont « plus bas = mieux ».
+
+Usage : python benchmarks/suite.py [--parties micro,reruns,octets] [--historique benchmarks/historique.json] [--seuil 0.2] [--ecrire-reference]
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RACINE)
+
+import numpy as np  # noqa: E402
+
+HISTORIQUE = os.path.join(RACINE, "benchmarks", "historique.json")
+REFERENCE = os.path.join(RACINE, "benchmarks", "reference.json")
+SEUIL = 0.20
+FENETRE = 5
+# Mesures indépendantes de la machine : comparables à une référence prise ailleurs
+MESURES_PORTABLES = ("octets.", "demarrage.modules_charges")
+APP = os.path.join(RACINE, "gestion_app.py")
+
+
+# --- OUTILS ---
+def chronometrer(fonction, repetitions=5, minimum_s=0.05):
+    """Meilleur temps (ms) d'un appel, sur ``repetitions`` séries d'au moins ``minimum_s`` secondes."""
+    fonction()  # échauffement (imports, caches de compilation)
+    nombre, duree = 1, 0.0
+    while True:
+        debut = time.perf_counter()
+        for _ in range(nombre):
+            fonction()
+        duree = time.perf_counter() - debut
+        if duree >= minimum_s:
+            break
+        nombre *= 2
+    meilleur = duree / nombre
+    for _ in range(repetitions - 1):
+        debut = time.perf_counter()
+        for _ in range(nombre):
+            fonction()
+        meilleur = min(meilleur, (time.perf_counter() - debut) / nombre)
+    return meilleur * 1000
+
+
+# --- 1. MICRO-BENCHMARKS DU MOTEUR ---
+def mesurer_micro():
+    from moteur import calculer_indicateurs, projeter, valeurs_a_horizon
+    from comparaison import OFFRES_TYPES, comparer_offres
+    from risque import HypothesesRisque, simuler_risque
+    from sensibilite import axe_loyers, axe_taux_gestion, calculer_grille
+    from solveur import capital_max, loyer_equilibre, taux_credit_max
+
+    rng = np.random.default_rng(0)
+
+    def lot(n):
+        return dict(
+            cf=rng.uniform(-500, 800, n), tp=rng.uniform(0, 8, n), capital=rng.uniform(0, 300_000, n),
+            taux=rng.uniform(1, 5, n), duree=rng.integers(5, 26, n).astype(float),
+        )
+
+    lot_1k, lot_100k = lot(1_000), lot(100_000)
+    loyers = rng.uniform(300, 2000, 100_000)
+    bien_risque = dict(
+        loyer_cc=650, taux_gestion=5.0, gli_active=True, taux_gli=2.8, pno_active=True, credit_mensuel=400,
+        charges_proprio_mensuel=100, taux_placement=4.0, capital=100_000, taux_credit=3.5, duree_annees=20,
+    )
+
+    offres_10 = [dict(o, taux_gestion=4.0 + 0.5 * k) for k, o in enumerate((OFFRES_TYPES * 4)[:10])]
+
+    mesures = {
+        "indicateurs_1_bien": lambda: calculer_indicateurs(600, 50, 5, True, 2.8, True, 400, 800, 400),
+        "projeter_1_bien_20ans": lambda: projeter(123.4, 4.0, 100_000, 3.5, 20),
+        "projeter_1_bien_40ans": lambda: projeter(123.4, 4.0, 100_000, 3.5, 40),
+        "projeter_1k_biens_mensuel": lambda: projeter(lot_1k["cf"], lot_1k["tp"], lot_1k["capital"], lot_1k["taux"], lot_1k["duree"]),
+        "horizon_100k_biens": lambda: valeurs_a_horizon(lot_100k["cf"], lot_100k["tp"], lot_100k["capital"], lot_100k["taux"], lot_100k["duree"]),
+        "grille_sensibilite": lambda: calculer_grille(
+            axe_loyers(600), axe_taux_gestion(), 50, True, 2.8, True, 400, 800, 400, 4.0, 100_000, 3.5, 20,
+        ),
+        "monte_carlo_4k_chemins": lambda: simuler_risque(bien_risque, HypothesesRisque(), 4_000),
+        "solveur_100k_loyer_capital": lambda: (
+            loyer_equilibre(50, 5, True, 2.8, True, loyers / 2, 800, 400),
+            capital_max(loyers, 50, 5, True, 2.8, True, 800, 400, 3.5, 20),
+        ),
+        "solveur_100k_taux_credit": lambda: taux_credit_max(lot_100k["capital"], 20, loyers, 50, 5, True, 2.8, True, 800, 400),
+        "comparaison_3_offres": lambda: comparer_offres(OFFRES_TYPES, 600, 50, 400, 800, 400, 4.0, 100_000, 3.5, 20),
+        "comparaison_10_offres": lambda: comparer_offres(offres_10, 600, 50, 400, 800, 400, 4.0, 100_000, 3.5, 20),
+    }
+    return {f"micro.{nom}_ms": chronometrer(fonction) for nom, fonction in mesures.items()}
+
+
+# --- 2. RERUNS STREAMLIT (AppTest) ---
+def _checkbox(at, debut_label):
+    return next(c for c in at.checkbox if c.label.startswith(debut_label))
+
+
+ONGLETS = ("💰 Flux de Trésorerie (Cashflow)", "🏛️ Enrichissement Latent (Patrimoine)", "🎯 Sensibilité")
+
+# Interaction -> action appliquée à l'AppTest avant le rerun mesuré (onglets en dernier :
+# les autres interactions sont mesurées sur l'onglet par défaut)
+INTERACTIONS = {
+    "curseur_loyer": lambda at, k: at.slider(key="s_loyer").set_value(600 + 10 * (k + 1)),
+    "case_gli": lambda at, k: _checkbox(at, "Option GLI").set_value(k % 2 == 1),
+    "curseur_honoraires": lambda at, k: next(s for s in at.slider if s.label.startswith("Honoraires")).set_value(5.5 + 0.5 * (k % 4)),
+    "changement_onglet": lambda at, k: at.session_state.__setitem__("onglet_graphique", ONGLETS[(k + 1) % len(ONGLETS)]),
+}
+
+
+def _app():
+    from streamlit.testing.v1 import AppTest
+
+    return AppTest.from_file(APP, default_timeout=120)
+
+
+def mesurer_reruns(repetitions=5):
+    import cache
+
+    resultats = {}
+    cache.scenarios.vider()
+    at = _app()
+    debut = time.perf_counter()
+    at.run()
+    resultats["reruns.premier_affichage_ms"] = (time.perf_counter() - debut) * 1000
+    if at.exception:
+        raise RuntimeError(f"Exception dans l'application : {at.exception[0].message}")
+
+    for nom, interaction in INTERACTIONS.items():
+        durees = []
+        for k in range(repetitions):
+            interaction(at, k)
+            debut = time.perf_counter()
+            at.run()
+            durees.append((time.perf_counter() - debut) * 1000)
+        resultats[f"reruns.{nom}_ms"] = statistics.median(durees)
+
+    # Rerun sans changement : bornes basses (cache de scénarios chaud)
+    durees = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        at.run()
+        durees.append((time.perf_counter() - debut) * 1000)
+    resultats["reruns.sans_changement_ms"] = statistics.median(durees)
+    return resultats
+
+
+# --- 3. OCTETS ÉMIS PAR RERUN ---
+def _categorie(noeud):
+    if noeud.type == "markdown":
+        texte = noeud.proto.body
+        if "<style" in texte:
+            return "css"
+        if "data:image" in texte:
+            return "images_base64"
+        return "markdown"
+    if noeud.type == "plotly_chart":
+        return "plotly"
+    return "autres"
+
+
+def _parcourir(noeud):
+    enfants = getattr(noeud, "children", None)
+    if not isinstance(enfants, dict):
+        return
+    for enfant in enfants.values():
+        if getattr(enfant, "proto", None) is not None:
+            yield enfant
+        yield from _parcourir(enfant)
+
+
+def mesurer_octets():
+    """Taille sérialisée (protobuf) des éléments d'un rerun complet, par catégorie."""
+    at = _app().run()
+    octets = {"css": 0, "images_base64": 0, "plotly": 0, "markdown": 0, "autres": 0}
+    for noeud in _parcourir(at._tree):
+        octets[_categorie(noeud)] += noeud.proto.ByteSize()
+    resultats = {f"octets.{nom}": total for nom, total in octets.items()}
+    resultats["octets.total"] = sum(octets.values())
+    return resultats
+
+
+# --- 4. DÉMARRAGE À FROID ---
+# Exécuté dans un interpréteur neuf : imports de Streamlit, puis des modules importés en tête
+# de gestion_app.py, puis premier affichage complet (conteneur qui sort d'une mise à l'échelle à zéro)
+SCRIPT_DEMARRAGE = r'''
+import ast, json, sys, time
+debut = time.perf_counter()
+import streamlit
+import_streamlit = time.perf_counter() - debut
+with open(sys.argv[1], encoding="utf-8") as f:
+    arbre = ast.parse(f.read())
+entete = ast.Module([noeud for noeud in arbre.body if isinstance(noeud, (ast.Import, ast.ImportFrom))], [])
+debut = time.perf_counter()
+exec(compile(entete, sys.argv[1], "exec"), {})
+import_app = time.perf_counter() - debut
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+debut = time.perf_counter()
+at.run()
+premier_rendu = time.perf_counter() - debut
+print(json.dumps({
+    "import_streamlit_ms": import_streamlit * 1000, "import_app_ms": import_app * 1000, "premier_rendu_ms": premier_rendu * 1000,
+    "modules_charges": len(sys.modules), "exception": bool(at.exception),
+}))
+'''
+
+
+def mesurer_demarrage(repetitions=3):
+    """Meilleur de ``repetitions`` démarrages à froid (ms), chacun dans un nouveau processus Python."""
+    essais = []
+    for _ in range(repetitions):
+        sortie = subprocess.run([sys.executable, "-c", SCRIPT_DEMARRAGE, APP], cwd=RACINE, capture_output=True, text=True, check=True)
+        essai = json.loads(sortie.stdout.strip().splitlines()[-1])
+        if essai.pop("exception"):
+            raise RuntimeError("Exception dans l'application au premier affichage")
+        essais.append(essai)
+    resultats = {f"demarrage.{nom}": min(e[nom] for e in essais) for nom in essais[0]}
+    resultats["demarrage.total_ms"] = min(e["import_streamlit_ms"] + e["import_app_ms"] + e["premier_rendu_ms"] for e in essais)
+    return resultats
+
+
+PARTIES = {"micro": mesurer_micro, "reruns": mesurer_reruns, "octets": mesurer_octets, "demarrage": mesurer_demarrage}
+
+
+# --- HISTORIQUE ET RÉGRESSIONS ---
+def charger_historique(chemin):
+    if not os.path.exists(chemin):
+        return []
+    with open(chemin, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def charger_reference(chemin):
+    """Exécution de référence versionnée (None si absente)."""
+    if not os.path.exists(chemin):
+        return None
+    with open(chemin, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def regressions(mesures, historique, seuil=SEUIL, fenetre=FENETRE, execution_reference=None):
+    """Mesures dépassant de plus de ``seuil`` la médiane des ``fenetre`` dernières exécutions.
+
+    Une mesure absente de l'historique est comparée à ``execution_reference`` si celle-ci
+    vient de la même machine, ou si la mesure est dans ``MESURES_PORTABLES``.
+    """
+    alertes = []
+    meme_machine = execution_reference is not None and execution_reference.get("machine") == platform.node()
+    for nom, valeur in mesures.items():
+        precedentes = [e["mesures"][nom] for e in historique[-fenetre:] if nom in e["mesures"]]
+        if (not precedentes and execution_reference is not None and nom in execution_reference["mesures"]
+                and (meme_machine or nom.startswith(MESURES_PORTABLES))):
+            precedentes = [execution_reference["mesures"][nom]]
+        if not precedentes:
+            continue
+        reference = statistics.median(precedentes)
+        if reference > 0 and valeur > reference * (1 + seuil):
+            alertes.append((nom, reference, valeur))
+    return alertes
+
+
+def _commit_courant():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RACINE, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Banc de mesure de PATRIM Gestion.")
+    parser.add_argument("--parties", default=",".join(PARTIES), help="Parties à exécuter, séparées par des virgules")
+    parser.add_argument("--historique", default=HISTORIQUE, help="Fichier JSON d'historique")
+    parser.add_argument("--reference", default=REFERENCE, help="Fichier JSON de référence versionné")
+    parser.add_argument("--ecrire-reference", action="store_true", help="Remplacer la référence par cette exécution")
+    parser.add_argument("--seuil", type=float, default=SEUIL, help="Dégradation tolérée (0.2 = +20 %%)")
+    parser.add_argument("--fenetre", type=int, default=FENETRE, help="Nombre d'exécutions de référence")
+    parser.add_argument("--sans-enregistrer", action="store_true", help="Ne pas ajouter cette exécution à l'historique")
+    args = parser.parse_args(argv)
+
+    os.chdir(RACINE)
+    mesures = {}
+    for partie in args.parties.split(","):
+        if partie not in PARTIES:
+            parser.error(f"Partie inconnue : {partie} (choix : {', '.join(PARTIES)})")
+        mesures.update(PARTIES[partie]())
+
+    historique = charger_historique(args.historique)
+    alertes = regressions(mesures, historique, args.seuil, args.fenetre, charger_reference(args.reference))
+    for nom, valeur in mesures.items():
+        print(f"{nom:<45} {valeur:>14,.2f}")
+    for nom, reference, valeur in alertes:
+        print(f"RÉGRESSION {nom} : {valeur:,.2f} contre {reference:,.2f} (+{(valeur / reference - 1) * 100:.0f} %)", file=sys.stderr)
+
+    execution = {
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": _commit_courant(),
+        "machine": platform.node(),
+        "python": platform.python_version(),
+        "mesures": {nom: round(valeur, 4) for nom, valeur in mesures.items()},
+    }
+    if not args.sans_enregistrer:
+        historique.append(execution)
+        with open(args.historique, "w", encoding="utf-8") as f:
+            json.dump(historique, f, indent=1, ensure_ascii=False)
+    if args.ecrire_reference:
+        with open(args.reference, "w", encoding="utf-8") as f:
+            json.dump(execution, f, indent=1, ensure_ascii=False)
+            f.write("\n")
+    return 1 if alertes else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""Cache LRU des scénarios, partagé par toutes les sessions du serveur.
+
+Streamlit ne ré-exécute que le script principal à chaque interaction : ce module,
+importé une seule fois par processus, conserve donc ses entrées d'un rerun et
+d'une session à l'autre. Les clés sont des tuples d'entrées normalisées.
+"""
+import threading
+from collections import OrderedDict
+
+TAILLE_MAX = 256
+DECIMALES = 6
+
+
+def normaliser_cle(*valeurs):
+    """Tuple hashable et stable : flottants arrondis, entiers et booléens conservés."""
+    cle = []
+    for valeur in valeurs:
+        if isinstance(valeur, (tuple, list)):
+            cle.append(normaliser_cle(*valeur))
+        elif isinstance(valeur, float):
+            cle.append(round(valeur, DECIMALES) + 0.0)  # + 0.0 : -0.0 et 0.0 donnent la même clé
+        else:
+            cle.append(valeur)
+    return tuple(cle)
+
+
+class CacheLRU:
+    """Dictionnaire borné à ``taille_max`` entrées, évincées de la moins récemment utilisée."""
+
+    def __init__(self, taille_max=TAILLE_MAX):
+        self.taille_max = taille_max
+        self._entrees = OrderedDict()
+        self._verrou = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def obtenir(self, cle, calculer):
+        """Valeur en cache pour ``cle``, sinon ``calculer()`` (hors verrou) puis mise en cache."""
+        with self._verrou:
+            if cle in self._entrees:
+                self._entrees.move_to_end(cle)
+                self.hits += 1
+                return self._entrees[cle]
+            self.misses += 1
+        valeur = calculer()
+        with self._verrou:
+            self._entrees[cle] = valeur
+            self._entrees.move_to_end(cle)
+            while len(self._entrees) > self.taille_max:
+                self._entrees.popitem(last=False)
+        return valeur
+
+    def consulter(self, cle):
+        """Valeur en cache pour ``cle`` sans calcul (None si absente) : résultats produits en arrière-plan."""
+        with self._verrou:
+            if cle not in self._entrees:
+                return None
+            self._entrees.move_to_end(cle)
+            self.hits += 1
+            return self._entrees[cle]
+
+    def vider(self):
+        with self._verrou:
+            self._entrees.clear()
+            self.hits = self.misses = 0
+
+    def statistiques(self):
+        with self._verrou:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entrees": len(self._entrees),
+                "taille_max": self.taille_max,
+                "taux_hit": self.hits / total if total else 0.0,
+            }
+
+
+# Cache partagé des scénarios de l'app (KPI, séries annuelles, figures)
+scenarios = CacheLRU()
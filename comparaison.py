@@ -0,0 +1,69 @@
+"""Comparaison côte à côte d'offres de gestion sur un même bien et un même crédit.
+
+Les offres (honoraires, GLI, PNO) sont placées sur un axe et évaluées en une seule
+passe diffusée du moteur : indicateurs, puis valeurs en fin d'année calculées en
+forme fermée (offres × années), sans série mensuelle. Le capital remboursé, commun
+à toutes les offres, n'est calculé qu'une fois : une dixième offre ne coûte qu'une
+ligne de plus dans les tableaux.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from moteur import MOIS_PAR_AN, Indicateurs, calculer_indicateurs, capital_rembourse_au_mois, cashflow_au_mois
+
+NB_OFFRES_MAX = 10
+
+# Offres proposées par défaut dans l'app (modifiables dans le tableau de comparaison)
+OFFRES_TYPES = [
+    dict(nom="Essentielle", taux_gestion=5.0, gli=False, taux_gli=2.8, pno=True),
+    dict(nom="Sérénité", taux_gestion=6.0, gli=True, taux_gli=2.5, pno=True),
+    dict(nom="Intégrale", taux_gestion=7.5, gli=True, taux_gli=2.8, pno=True),
+]
+
+
+@dataclass(frozen=True)
+class ComparaisonOffres:
+    """Résultats indexés par [offre] ou [offre, année]."""
+    noms: tuple
+    annees: np.ndarray
+    indicateurs: Indicateurs
+    cashflow_cumul: np.ndarray
+    patrimoine: np.ndarray
+
+    def ecarts(self, reference=0):
+        """Colonnes du tableau comparatif : valeurs par offre et écarts à l'offre ``reference``."""
+        colonnes = {
+            "frais_gestion_mensuel": self.indicateurs.total_frais_gestion,
+            "cashflow_net_mensuel": self.indicateurs.cashflow_net_mensuel,
+            "cashflow_horizon": self.cashflow_cumul[:, -1],
+            "patrimoine_horizon": self.patrimoine[:, -1],
+        }
+        return {
+            **colonnes,
+            **{f"ecart_{nom}": valeurs - valeurs[reference] for nom, valeurs in colonnes.items()},
+        }
+
+
+def comparer_offres(offres, loyer_hc, provision, credit_mensuel, tf_annuelle, copro_annuelle,
+                    taux_placement, capital, taux_credit, duree_annees):
+    """Évalue toutes les ``offres`` (dicts nom, taux_gestion, gli, taux_gli, pno) en une passe."""
+    if not 0 < len(offres) <= NB_OFFRES_MAX:
+        raise ValueError(f"Entre 1 et {NB_OFFRES_MAX} offres à comparer")
+    taux_gestion = np.array([float(o["taux_gestion"]) for o in offres])
+    gli = np.array([bool(o["gli"]) for o in offres])
+    taux_gli = np.array([float(o["taux_gli"]) for o in offres])
+    pno = np.array([bool(o["pno"]) for o in offres])
+    indicateurs = calculer_indicateurs(loyer_hc, provision, taux_gestion, gli, taux_gli, pno, credit_mensuel, tf_annuelle, copro_annuelle)
+
+    annees = np.arange(1, int(duree_annees) + 1)
+    fins_annee = annees * MOIS_PAR_AN
+    cashflow_cumul = cashflow_au_mois(indicateurs.cashflow_net_mensuel[:, None], taux_placement, fins_annee)
+    capital_rembourse = capital_rembourse_au_mois(capital, taux_credit, duree_annees * MOIS_PAR_AN, fins_annee)
+    return ComparaisonOffres(
+        noms=tuple(str(o["nom"]) for o in offres),
+        annees=annees,
+        indicateurs=indicateurs,
+        cashflow_cumul=cashflow_cumul,
+        patrimoine=cashflow_cumul + capital_rembourse,
+    )
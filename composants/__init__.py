@@ -0,0 +1,31 @@
+"""Composants Streamlit personnalisés (HTML/JS sans étape de build)."""
+import os
+
+import streamlit.components.v1 as components
+
+from moteur import MOIS_PAR_AN, PNO_ANNUELLE
+
+_DOSSIER = os.path.dirname(os.path.abspath(__file__))
+_projection_live = components.declare_component("projection_live", path=os.path.join(_DOSSIER, "projection_live"))
+
+DELAI_MS = 400
+
+
+def projection_live(loyer_hc, provision, taux_gestion, gli_active, taux_gli, pno_active, credit_mensuel, charges_proprio_mensuel,
+                    taux_placement, capital, taux_credit, duree_annees, couleurs, loyer_max=5000, pas=10, delai_ms=DELAI_MS,
+                    key=None, on_change=None):
+    """Curseur de loyer avec KPI et courbes recalculés dans le navigateur pendant le glissement.
+
+    Le moteur (indicateurs et formes fermées de moteur.py) est embarqué en JavaScript :
+    Python ne reçoit le nouveau loyer qu'au relâchement du curseur ou après
+    ``delai_ms`` sans mouvement. Renvoie le dernier envoi ``{"loyer": ..., "envoi": n}``
+    (None avant tout envoi) ; le numéro d'envoi change à chaque fois, même pour un loyer
+    déjà envoyé. ``on_change`` est appelé sans argument : il lit l'envoi dans ``st.session_state[key]``.
+    """
+    parametres = dict(
+        loyer_hc=loyer_hc, provision=provision, taux_gestion=taux_gestion, gli_active=gli_active, taux_gli=taux_gli,
+        cout_pno=PNO_ANNUELLE / MOIS_PAR_AN if pno_active else 0.0, credit_mensuel=credit_mensuel,
+        charges_proprio_mensuel=charges_proprio_mensuel, taux_placement=taux_placement, capital=capital,
+        taux_credit=taux_credit, duree_annees=duree_annees, couleurs=couleurs, loyer_max=loyer_max, pas=pas, delai_ms=delai_ms,
+    )
+    return _projection_live(parametres=parametres, default=None, key=key, on_change=on_change)
@@ -0,0 +1,173 @@
+"""Échéancier mensuel du crédit et de la trésorerie, pour un bien ou un portefeuille.
+
+Mois par mois : mensualité, intérêts, capital amorti, capital restant dû,
+cashflow cumulé et patrimoine. Les séries sont des tableaux NumPy (dernier axe =
+mois) calculés par le moteur en forme fermée ; un portefeuille est traité par
+blocs de ``TAILLE_BLOC`` biens et écrit au fil de l'eau (CSV, Parquet ou XLSX),
+si bien que 1 000 biens sur 25 ans n'occupent jamais plus d'un bloc en mémoire.
+Dans l'app, l'échéancier d'un portefeuille est un travail de la file partagée
+(cf. travaux.py) écrit sur disque et téléchargé par le service statique, sans
+passer par la mémoire du serveur (cf. exports.py).
+
+Usage : python echeancier.py biens.csv echeancier.parquet [--taille-bloc 200]
+"""
+import argparse
+import importlib.util
+import sys
+import tempfile
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from moteur import MOIS_PAR_AN, calculer_indicateurs, mensualite_credit, projeter
+from portefeuille import COLONNES_OBLIGATOIRES, VALEURS_DEFAUT, ecrire_resultats, lire_par_blocs, normaliser, ouvrir_ecrivain
+
+TAILLE_BLOC = 200              # biens par bloc : 200 x 300 mois = 60 000 lignes en mémoire
+TAILLE_MAX_MEMOIRE = 8 * 1024 * 1024   # au-delà, le fichier temporaire d'un export passe sur disque
+FORMATS_EXPORT = {
+    "csv": ("text/csv", None),
+    "parquet": ("application/vnd.apache.parquet", "pyarrow"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsxwriter"),
+}
+SERIES = ("mensualite", "interets", "capital_amorti", "capital_restant_du", "cashflow_cumul", "patrimoine")
+
+
+# --- CALCUL ---
+@dataclass(frozen=True)
+class Echeancier:
+    """Séries mensuelles (mois 1..n sur le dernier axe) d'un bien ou d'un lot de biens."""
+    mensualite: np.ndarray
+    interets: np.ndarray
+    capital_amorti: np.ndarray
+    capital_restant_du: np.ndarray
+    cashflow_cumul: np.ndarray
+    patrimoine: np.ndarray
+
+    @property
+    def nb_mois(self):
+        return self.mensualite.shape[-1]
+
+    @property
+    def mois(self):
+        return np.arange(1, self.nb_mois + 1)
+
+    def tableau(self, debut=0, fin=None):
+        """Lignes ``debut``..``fin`` (indices de mois à partir de 0) d'un échéancier à un seul bien."""
+        if self.mensualite.ndim != 1:
+            raise ValueError("tableau() attend l'échéancier d'un seul bien ; utiliser lignes() pour un lot")
+        periode = slice(debut, fin)
+        return pd.DataFrame({"mois": self.mois[periode], **{nom: np.round(getattr(self, nom)[periode], 2) for nom in SERIES}})
+
+    def lignes(self, durees_mois, identifiants):
+        """Format long d'un lot (une ligne par bien et par mois), limité à la durée de chaque bien."""
+        masque = self.mois <= np.asarray(durees_mois)[:, None]
+        indice_bien, indice_mois = np.nonzero(masque)
+        return pd.DataFrame({
+            "bien": np.asarray(identifiants)[indice_bien],
+            "mois": indice_mois + 1,
+            **{nom: np.round(getattr(self, nom)[masque], 2) for nom in SERIES},
+        })
+
+
+def calculer_echeancier(cashflow_net_mensuel, taux_placement, capital, taux_credit, duree_annees, horizon_annees=None):
+    """Échéancier mensuel (entrées scalaires ou tableaux, diffusées comme dans ``moteur.projeter``)."""
+    projection = projeter(cashflow_net_mensuel, taux_placement, capital, taux_credit, duree_annees, horizon_annees)
+    capital = np.asarray(capital, dtype=np.float64)[..., None]
+    duree_mois = np.asarray(duree_annees, dtype=np.float64)[..., None] * MOIS_PAR_AN
+    mois = np.arange(1, projection.nb_points + 1)
+
+    rembourse = projection.capital_rembourse
+    capital_amorti = np.diff(rembourse, axis=-1, prepend=0.0)
+    mensualite = np.where(mois <= duree_mois, mensualite_credit(capital, np.asarray(taux_credit, dtype=np.float64)[..., None], duree_mois), 0.0)
+    interets = np.where(mensualite > 0, mensualite - capital_amorti, 0.0)
+    return Echeancier(
+        mensualite=mensualite,
+        interets=interets,
+        capital_amorti=capital_amorti,
+        capital_restant_du=np.broadcast_to(capital, rembourse.shape) - rembourse,
+        cashflow_cumul=projection.cashflow_cumul,
+        patrimoine=projection.patrimoine,
+    )
+
+
+def blocs_echeancier(colonnes, taille_bloc=TAILLE_BLOC, premier_identifiant=0):
+    """Échéanciers d'un lot de biens déjà normalisés (dict de colonnes NumPy), en DataFrames longs par bloc."""
+    nb_biens = len(colonnes["loyer_hc"])
+    for debut in range(0, nb_biens, taille_bloc):
+        col = {nom: valeurs[debut:debut + taille_bloc] for nom, valeurs in colonnes.items()}
+        indicateurs = calculer_indicateurs(
+            col["loyer_hc"], col["provision"], col["taux_gestion"], col["gli"], col["taux_gli"],
+            col["pno"], col["credit_mensuel"], col["tf_annuelle"], col["copro_annuelle"],
+        )
+        echeancier = calculer_echeancier(
+            np.atleast_1d(indicateurs.cashflow_net_mensuel), col["taux_placement"], col["capital"], col["taux_credit"], col["duree"],
+        )
+        identifiants = premier_identifiant + debut + np.arange(len(col["loyer_hc"]))
+        yield echeancier.lignes(col["duree"] * MOIS_PAR_AN, identifiants)
+
+
+# --- EXPORT ---
+def exporter(echeancier, destination, format_fichier=None):
+    """Écrit l'échéancier d'un seul bien (CSV, Parquet ou XLSX selon ``format_fichier`` ou l'extension)."""
+    ecrivain = ouvrir_ecrivain(destination, format_fichier)
+    try:
+        for debut in range(0, echeancier.nb_mois, MOIS_PAR_AN * 5):
+            ecrivain.ecrire(echeancier.tableau(debut, debut + MOIS_PAR_AN * 5))
+    finally:
+        ecrivain.fermer()
+
+
+def echeancier_bloc(bloc, premier_identifiant=0):
+    """Échéanciers d'un bloc brut de portefeuille, en un DataFrame long (tâche du pool)."""
+    bloc = normaliser(bloc)
+    colonnes = {c: bloc[c].to_numpy() for c in (*COLONNES_OBLIGATOIRES, *VALEURS_DEFAUT)}
+    return pd.concat(blocs_echeancier(colonnes, max(len(bloc), 1), premier_identifiant), ignore_index=True)
+
+
+def taches_echeancier(source, taille_bloc=TAILLE_BLOC, format_entree=None):
+    """Tâches ``(echeancier_bloc, bloc, premier_identifiant)`` d'un portefeuille, lues bloc par bloc (pour travaux.py)."""
+    premier_identifiant = 0
+    for bloc in lire_par_blocs(source, taille_bloc, format_entree):
+        yield echeancier_bloc, bloc, premier_identifiant
+        premier_identifiant += len(bloc)
+
+
+def exporter_portefeuille(source, destination, taille_bloc=TAILLE_BLOC, format_entree=None, format_sortie=None):
+    """Échéanciers de tout un portefeuille, lus et écrits bloc par bloc. Retourne le nombre de lignes."""
+    lignes = (fonction(*arguments) for fonction, *arguments in taches_echeancier(source, taille_bloc, format_entree))
+    return ecrire_resultats(lignes, destination, format_sortie)
+
+
+def fichier_temporaire(ecrire):
+    """Fichier rembobiné produit par ``ecrire(fichier)`` : en mémoire s'il est petit, sur disque sinon.
+
+    Sert de ``data`` différé aux boutons de téléchargement de l'app, que Streamlit
+    convertit en ``bytes`` : réservé aux exports d'un seul bien (quelques centaines
+    de lignes). Les exports de portefeuille passent par ``exports.publier_export``.
+    """
+    fichier = tempfile.SpooledTemporaryFile(max_size=TAILLE_MAX_MEMOIRE)
+    ecrire(fichier)
+    fichier.seek(0)
+    return fichier
+
+
+def formats_disponibles():
+    """Formats d'export dont la dépendance optionnelle est installée."""
+    return [nom for nom, (_, module) in FORMATS_EXPORT.items() if module is None or importlib.util.find_spec(module)]
+
+
+# --- LIGNE DE COMMANDE ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Échéancier mensuel PATRIM Gestion d'un portefeuille de biens.")
+    parser.add_argument("entree", help="Fichier CSV ou Parquet, une ligne par bien")
+    parser.add_argument("sortie", help="Fichier échéancier (.csv, .parquet ou .xlsx)")
+    parser.add_argument("--taille-bloc", type=int, default=TAILLE_BLOC, help="Nombre de biens traités par bloc")
+    args = parser.parse_args(argv)
+    nb_lignes = exporter_portefeuille(args.entree, args.sortie, args.taille_bloc)
+    print(f"{nb_lignes} lignes -> {args.sortie}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,211 @@
+"""Études clients enregistrées (SQLite local) et état partageable par URL.
+
+Une étude conserve les entrées de la barre latérale et les résultats annuels déjà
+calculés : la recharger ne relance aucun calcul. Les recherches passent par des
+index sur le client, le bien et la date (intervalles de préfixe sur des colonnes
+normalisées, sans accent ni casse) et ne lisent jamais les colonnes JSON : elles
+restent instantanées avec des dizaines de milliers d'études.
+"""
+import base64
+import datetime
+import json
+import math
+import os
+import sqlite3
+import unicodedata
+import zlib
+from contextlib import closing
+from dataclasses import asdict, dataclass
+
+import numpy as np
+
+from moteur import Indicateurs
+
+BASE = os.environ.get("PATRIM_ETUDES_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "donnees", "etudes.sqlite"))
+LIMITE_RECHERCHE = 20
+VERSION_ETAT = "1"
+
+# Entrées d'une étude (clés de st.session_state) et valeurs par défaut de la barre latérale
+PARAMETRES_DEFAUT = {
+    "loyer_hc": 600,
+    "prov_mensuelle": 50,
+    "taux_gestion": 5.0,
+    "pno_active": True,
+    "gli_active": True,
+    "taux_gli": 2.8,
+    "has_credit": True,
+    "credit_mensuel_ass": 400,
+    "montant_emprunte_initial": 100000,
+    "taux_credit_hors_ass": 3.5,
+    "duree_restante_annees": 20,
+    "tf_annuelle": 800,
+    "copro_annuelle": 400,
+    "taux_placement": 4.0,
+}
+# Bornes des widgets de la barre latérale ; un paramètre sans borne reste dans les entiers sûrs de JavaScript
+BORNES_PARAMETRES = {
+    "loyer_hc": (0, 5000),
+    "taux_gestion": (4.0, 10.0),
+    "taux_gli": (2.5, 2.8),
+    "duree_restante_annees": (5, 25),
+    "taux_placement": (0.0, 15.0),
+}
+BORNE_NOMBRE = 2 ** 53 - 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS etudes (
+    id INTEGER PRIMARY KEY,
+    client TEXT NOT NULL,
+    bien TEXT NOT NULL,
+    client_recherche TEXT NOT NULL,
+    bien_recherche TEXT NOT NULL,
+    cree_le TEXT NOT NULL,
+    parametres TEXT NOT NULL,
+    resultats TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_etudes_client ON etudes (client_recherche, cree_le);
+CREATE INDEX IF NOT EXISTS idx_etudes_bien ON etudes (bien_recherche, cree_le);
+CREATE INDEX IF NOT EXISTS idx_etudes_date ON etudes (cree_le);
+"""
+
+
+@dataclass(frozen=True)
+class Resume:
+    """Ligne de résultat de recherche (sans les colonnes JSON)."""
+    id: int
+    client: str
+    bien: str
+    cree_le: str
+
+
+@dataclass(frozen=True)
+class Etude:
+    id: int
+    client: str
+    bien: str
+    cree_le: str
+    parametres: dict
+    resultats: dict
+
+
+# --- BASE SQLITE ---
+def _normaliser(texte):
+    """Forme de recherche : sans accents, minuscules, espaces réduits."""
+    sans_accents = unicodedata.normalize("NFKD", texte).encode("ascii", "ignore").decode("ascii")
+    return " ".join(sans_accents.lower().split())
+
+
+def _connexion(base=None):
+    """Connexion courte (une par opération) : sûre quel que soit le thread de session Streamlit."""
+    base = base or BASE
+    if base != ":memory:":
+        os.makedirs(os.path.dirname(base) or ".", exist_ok=True)
+    connexion = sqlite3.connect(base, timeout=10)
+    connexion.execute("PRAGMA journal_mode=WAL")
+    connexion.executescript(SCHEMA)
+    return connexion
+
+
+def enregistrer(client, bien, parametres, resultats, base=None):
+    """Ajoute une étude et renvoie son identifiant."""
+    client, bien = client.strip(), bien.strip()
+    if not client:
+        raise ValueError("Le nom du client est obligatoire")
+    with closing(_connexion(base)) as connexion, connexion:
+        curseur = connexion.execute(
+            "INSERT INTO etudes (client, bien, client_recherche, bien_recherche, cree_le, parametres, resultats) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (client, bien, _normaliser(client), _normaliser(bien), datetime.datetime.now().isoformat(timespec="seconds"),
+             json.dumps(parametres, separators=(",", ":")), json.dumps(resultats, separators=(",", ":"))),
+        )
+        return curseur.lastrowid
+
+
+def rechercher(texte="", limite=LIMITE_RECHERCHE, base=None):
+    """Études les plus récentes dont le client ou le bien commence par ``texte`` (toutes si vide)."""
+    prefixe = _normaliser(texte)
+    colonnes = "SELECT id, client, bien, cree_le FROM etudes"
+    with closing(_connexion(base)) as connexion:
+        if not prefixe:
+            lignes = connexion.execute(f"{colonnes} ORDER BY cree_le DESC, id DESC LIMIT ?", (limite,)).fetchall()
+        else:
+            # Intervalle [prefixe, prefixe + U+FFFF) : parcours d'index, contrairement à LIKE
+            fin = prefixe + "￿"
+            lignes = connexion.execute(
+                f"{colonnes} WHERE client_recherche >= ? AND client_recherche < ? "
+                f"UNION {colonnes} WHERE bien_recherche >= ? AND bien_recherche < ? "
+                "ORDER BY cree_le DESC, id DESC LIMIT ?",
+                (prefixe, fin, prefixe, fin, limite),
+            ).fetchall()
+    return [Resume(*ligne) for ligne in lignes]
+
+
+def charger(identifiant, base=None):
+    with closing(_connexion(base)) as connexion:
+        ligne = connexion.execute(
+            "SELECT id, client, bien, cree_le, parametres, resultats FROM etudes WHERE id = ?", (identifiant,),
+        ).fetchone()
+    if ligne is None:
+        raise KeyError(f"Étude {identifiant} introuvable")
+    return Etude(*ligne[:4], json.loads(ligne[4]), json.loads(ligne[5]))
+
+
+def supprimer(identifiant, base=None):
+    with closing(_connexion(base)) as connexion, connexion:
+        connexion.execute("DELETE FROM etudes WHERE id = ?", (identifiant,))
+
+
+# --- RÉSULTATS PRÉCALCULÉS ---
+def resultats(scenario):
+    """Résultats annuels d'un scénario de l'app, sérialisables en JSON (sans les bandes de risque)."""
+    return dict(
+        indicateurs={nom: float(valeur) for nom, valeur in asdict(scenario["indicateurs"]).items()},
+        annees_axis=list(scenario["annees_axis"]),
+        data_cashflow_cumul=list(scenario["data_cashflow_cumul"]),
+        data_patrimoine_cumul=list(scenario["data_patrimoine_cumul"]),
+    )
+
+
+def scenario(resultats_enregistres):
+    """Scénario de l'app reconstitué depuis des résultats enregistrés, sans recalcul."""
+    indicateurs = Indicateurs(**{nom: np.float64(valeur) for nom, valeur in resultats_enregistres["indicateurs"].items()})
+    return dict(
+        indicateurs=indicateurs,
+        annees_axis=resultats_enregistres["annees_axis"],
+        data_cashflow_cumul=resultats_enregistres["data_cashflow_cumul"],
+        data_patrimoine_cumul=resultats_enregistres["data_patrimoine_cumul"],
+        risque=None,
+    )
+
+
+# --- ÉTAT PARTAGEABLE PAR URL ---
+def encoder_etat(parametres):
+    """Code URL compact : valeurs dans l'ordre de PARAMETRES_DEFAUT, JSON, zlib puis base64 URL."""
+    valeurs = [parametres.get(nom, defaut) for nom, defaut in PARAMETRES_DEFAUT.items()]
+    compresse = zlib.compress(json.dumps(valeurs, separators=(",", ":")).encode("utf-8"), 9)
+    return VERSION_ETAT + "." + base64.urlsafe_b64encode(compresse).decode("ascii").rstrip("=")
+
+
+def decoder_etat(code):
+    """Paramètres d'une étude depuis un code URL ; ValueError si le code est invalide."""
+    version, _, donnees = code.partition(".")
+    if version != VERSION_ETAT:
+        raise ValueError("Lien de partage d'une version non prise en charge")
+    try:
+        valeurs = json.loads(zlib.decompress(base64.urlsafe_b64decode(donnees + "=" * (-len(donnees) % 4))))
+    except (ValueError, zlib.error) as exc:
+        raise ValueError("Lien de partage illisible") from exc
+    if not isinstance(valeurs, list) or len(valeurs) != len(PARAMETRES_DEFAUT):
+        raise ValueError("Lien de partage incomplet")
+    parametres = {}
+    for (nom, defaut), valeur in zip(PARAMETRES_DEFAUT.items(), valeurs):
+        if isinstance(defaut, bool):
+            parametres[nom] = bool(valeur)
+            continue
+        if not isinstance(valeur, (int, float)) or isinstance(valeur, bool) or (isinstance(valeur, float) and not math.isfinite(valeur)):
+            raise ValueError(f"Valeur invalide pour {nom} dans le lien de partage")
+        # Hors des bornes du widget, Streamlit refuserait la valeur et la page ne s'afficherait pas
+        minimum, maximum = BORNES_PARAMETRES.get(nom, (-BORNE_NOMBRE, BORNE_NOMBRE))
+        if not minimum <= valeur <= maximum:
+            raise ValueError(f"{nom} hors limites dans le lien de partage ({valeur} au lieu de {minimum} à {maximum})")
+        parametres[nom] = type(defaut)(valeur)
+    return parametres
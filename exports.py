@@ -0,0 +1,77 @@
+"""Exports volumineux (résultats de portefeuille, échéanciers, ZIP d'études) servis depuis le disque.
+
+Un export est écrit dans ``static/exports/`` sous un nom aléatoire et téléchargé
+par le service statique de Streamlit (``server.enableStaticServing``), sans passer
+par la mémoire de la session.
+
+Exposition : ``static/`` est public. Un export (données client confidentielles)
+n'est protégé que par son nom imprévisible (128 bits) : quiconque obtient l'URL
+peut le télécharger tant qu'il existe. D'où une durée de vie courte
+(``DUREE_VIE_EXPORT_S``) et une purge au démarrage puis toutes les
+``PERIODE_PURGE_S`` secondes, y compris sur un serveur sans activité.
+"""
+import os
+import secrets
+import threading
+import time
+
+DOSSIER_EXPORTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "exports")
+URL_EXPORTS = "app/static/exports"
+DUREE_VIE_EXPORT_S = 6 * 3600   # URL publique : au-delà, l'export est supprimé (cf. docstring du module)
+PERIODE_PURGE_S = 10 * 60
+
+_purge = None
+_verrou = threading.Lock()
+
+
+def purger_exports(duree_vie_s=DUREE_VIE_EXPORT_S):
+    """Supprime les exports de plus de ``duree_vie_s`` secondes ; renvoie le nombre de fichiers supprimés."""
+    limite = time.time() - duree_vie_s
+    supprimes = 0
+    try:
+        entrees = list(os.scandir(DOSSIER_EXPORTS))
+    except FileNotFoundError:
+        return 0
+    for entree in entrees:
+        try:
+            if entree.is_file() and entree.stat().st_mtime < limite:
+                os.remove(entree.path)
+                supprimes += 1
+        except OSError:
+            pass  # déjà supprimé par un autre processus
+    return supprimes
+
+
+def _purger_periodiquement(periode_s):
+    while True:
+        purger_exports()
+        time.sleep(periode_s)
+
+
+def demarrer_purge(periode_s=PERIODE_PURGE_S):
+    """Purge tout de suite puis toutes les ``periode_s`` secondes (un thread démon par processus, appels suivants sans effet)."""
+    global _purge
+    with _verrou:
+        if _purge is None:
+            _purge = threading.Thread(target=_purger_periodiquement, args=(periode_s,), name="purge-exports", daemon=True)
+            _purge.start()
+
+
+def publier_export(ecrire, format_fichier):
+    """Écrit un export par ``ecrire(chemin)`` dans static/exports/ sous un nom aléatoire.
+
+    Renvoie (url, chemin, valeur renvoyée par ``ecrire``). Le fichier n'apparaît
+    qu'une fois complet ; une écriture interrompue ne laisse rien sur le disque.
+    """
+    os.makedirs(DOSSIER_EXPORTS, exist_ok=True)
+    demarrer_purge()
+    nom = f"{secrets.token_urlsafe(16)}.{format_fichier}"
+    chemin = os.path.join(DOSSIER_EXPORTS, nom)
+    temporaire = f"{chemin}.tmp"
+    try:
+        valeur = ecrire(temporaire)
+        os.replace(temporaire, chemin)
+    finally:
+        if os.path.exists(temporaire):
+            os.remove(temporaire)
+    return f"{URL_EXPORTS}/{nom}", chemin, valeur
@@ -1,200 +1,40 @@
+import io
 import streamlit as st
-import pandas as pd
 import numpy as np
-import plotly.graph_objects as go
-import os
-import base64
-import streamlit.components.v1 as components
+from dataclasses import astuple
+
+import assets
+import cache
+import etudes
+import exports
+import profilage
+from cache import normaliser_cle
+from composants import projection_live
+from moteur import calculer_indicateurs, projeter
+from risque import HypothesesRisque, combiner_risque, lots_risque, simuler_lot, simuler_risque
+from solveur import capital_max, loyer_equilibre, taux_credit_max, taux_gestion_max
+from sensibilite import TAUX_GLI, axe_loyers, axe_taux_gestion, calculer_grille
+from travaux import ANNULE, ECHEC, TERMINE, FileSaturee, QuotaDepasse, gestionnaire, session_courante
+from theme import COLOR_BLEU_PATRIMOINE, COLOR_GRIS, COLOR_ROUGE, COLOR_VERT, css_application, fmt, fmt_dec
+# Modules lourds (pandas, Plotly, fpdf) importés dans les sections qui s'en servent : démarrage et premier affichage plus rapides
 
 # --- 1. CONFIGURATION DE LA PAGE ---
 st.set_page_config(page_title="PATRIM Gestion", page_icon="🏢", layout="wide")
-
-# --- PALETTE DE COULEURS ---
-COLOR_ROUGE = "#8a0e01"
-COLOR_VERT = "#2e7d32"
-COLOR_GRIS = "#393939"
-COLOR_ROSE = "#d35f52"
-COLOR_BLEU_PATRIMOINE = "#34495e"
-COLOR_BG_CARD = "#ffffff" 
-
-# --- FONCTIONS UTILITAIRES ---
-def get_file_path(filename):
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    return os.path.join(script_dir, filename)
-
-def get_img_as_base64(file_path):
-    with open(file_path, "rb") as f:
-        data = f.read()
-    return base64.b64encode(data).decode()
-
-# --- FORMATAGE ---
-def fmt(nombre):
-    return f"{nombre:,.0f}".replace(",", ".")
-
-def fmt_dec(nombre):
-    return f"{nombre:,.2f}".replace(",", ".").replace(".", ",")
+profil = profilage.demarrer()  # ?profilage=1 ou PATRIM_PROFILAGE=1
 
 # --- CSS INTELLIGENT (MOBILE VS ORDI) ---
-bg_css = ""
-arcades_path = get_file_path("arcades.png") 
-
-if os.path.exists(arcades_path):
-    try:
-        img_bg_ext = get_img_as_base64(arcades_path)
-        bg_css = f"""
-        .arcades-overlay {{
-            position: fixed; top: 0; left: 0; width: 100%; height: 100%;
-            background-image: url("data:image/png;base64,{img_bg_ext}");
-            background-size: cover; background-position: center;
-            opacity: 0.05; z-index: -1; pointer-events: none; mix-blend-mode: overlay;
-        }}
-        """
-    except Exception: pass
-
-st.markdown(f"""
-    <style>
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700;800&display=swap');
-    :root {{ --primary-red: {COLOR_ROUGE}; --text-grey: {COLOR_GRIS}; }}
-    
-    /* FOND ANIMÉ 3D */
-    .background-container {{
-        position: fixed; top: 0; left: 0; width: 100vw; height: 100vh;
-        background-color: #f4f7f9; z-index: -3; overflow: hidden;
-    }}
-    .orb {{
-        position: absolute; border-radius: 50%; filter: blur(80px); opacity: 0.6;
-        animation: float 20s infinite ease-in-out alternate;
-    }}
-    .orb-1 {{ width: 70vh; height: 70vh; background: radial-gradient(circle, {COLOR_ROSE}, {COLOR_ROUGE}); top: -15%; left: -15%; animation-duration: 25s; }}
-    .orb-2 {{ width: 60vh; height: 60vh; background: radial-gradient(circle, #ffdfba, {COLOR_ROSE}); bottom: -15%; right: -15%; animation-delay: -5s; animation-duration: 28s; }}
-    .orb-3 {{ width: 40vh; height: 40vh; background: radial-gradient(circle, #ffffff, #dceefc); top: 40%; left: 40%; opacity: 0.8; animation: float-mid 35s infinite ease-in-out; }}
-    
-    @keyframes float {{ 0% {{ transform: translate(0, 0) rotate(0deg); }} 100% {{ transform: translate(-30px, 20px) rotate(-5deg); }} }}
-    @keyframes float-mid {{ 0% {{ transform: translate(0, 0) scale(1); }} 50% {{ transform: translate(40px, -30px) scale(1.1); }} 100% {{ transform: translate(0, 0) scale(1); }} }}
-
-    {bg_css}
-
-    /* BASE */
-    .stApp {{ background-color: transparent !important; font-family: 'Inter', sans-serif; color: var(--text-grey); }}
-    [data-testid="stAppViewContainer"] {{ background-color: transparent !important; }}
-    
-    /* ELEMENTS COMMUNS */
-    div[data-testid="stSidebarHeader"] {{ display: none; }}
-    .block-container {{ padding-top: 1rem !important; padding-bottom: 5rem !important; }}
-    .logo-container-html {{ display: flex; justify-content: center; align-items: center; margin-bottom: 20px; margin-top: 20px; padding: 0; background: transparent !important; }}
-    .custom-logo {{ width: 100% !important; max-width: 300px !important; height: auto; }}
-    
-    /* WIDGETS */
-    .stSlider > div > div > div > div {{ background-color: {COLOR_ROUGE} !important; }} 
-    .stNumberInput input, .stSelectbox div[data-baseweb="select"] {{ background-color: #ffffff !important; color: {COLOR_GRIS} !important; border: 1px solid #e0e0e0; border-radius: 8px; }}
-    button[data-testid="stNumberInputStepDown"], button[data-testid="stNumberInputStepUp"] {{ background-color: #ffffff !important; color: {COLOR_GRIS} !important; border-color: #e0e0e0 !important; font-weight: bold !important; }}
-    
-    /* --- CORRECTION VISIBILITÉ TEXTE SIDEBAR --- */
-    /* Force TOUS les titres (h1, h2, h3) dans la sidebar à être GRIS FONCÉ */
-    [data-testid="stSidebar"] h1, 
-    [data-testid="stSidebar"] h2, 
-    [data-testid="stSidebar"] h3 {{
-        color: #393939 !important;
-        font-weight: 800 !important;
-    }}
-    
-    /* Force TOUS les textes standards, labels et spans à être GRIS FONCÉ */
-    [data-testid="stSidebar"] p, 
-    [data-testid="stSidebar"] label, 
-    [data-testid="stSidebar"] span,
-    [data-testid="stSidebar"] div {{
-        color: #393939 !important;
-    }}
-    
-    /* Exception pour les captions (petits textes) un peu plus clairs */
-    [data-testid="stSidebar"] .stCaption {{
-        color: #666666 !important;
-    }}
-
-    /* KPI CARDS */
-    .kpi-card {{ 
-        background-color: rgba(255, 255, 255, 0.75); backdrop-filter: blur(15px);
-        padding: 25px 20px; border-radius: 16px; border: 1px solid rgba(255,255,255,0.6);
-        box-shadow: 0 4px 15px rgba(0,0,0,0.03); margin-bottom: 20px; position: relative; z-index: 1; transition: all 0.3s ease; height: 100%;
-    }}
-    .kpi-label {{ font-size: 0.8rem; font-weight: 600; color: #666; margin-bottom: 10px; }}
-    .kpi-value {{ font-size: 2.2rem; font-weight: 800; letter-spacing: -1px; }}
-    .kpi-sub {{ font-size: 0.85rem; color: #888; margin-top: 8px; font-weight: 500; }}
-
-    /* GRAPHIQUE */
-    .graph-header {{ color: {COLOR_GRIS}; padding: 10px 0px; font-weight: 800; font-size: 1.2rem; text-align: left; margin-top: 5px; position: relative; z-index: 2; }}
-    .graph-container {{ 
-        background-color: rgba(255, 255, 255, 0.8); backdrop-filter: blur(15px);
-        padding: 20px; border-radius: 24px; border: 1px solid rgba(255,255,255,0.6);
-        box-shadow: 0 8px 30px rgba(0,0,0,0.03); position: relative; z-index: 1; margin-bottom: 20px;
-    }}
-    .stTabs [data-baseweb="tab-list"] {{ gap: 10px; background-color: transparent; border-bottom: none; }}
-    .stTabs [data-baseweb="tab"] {{ height: 40px; border-radius: 20px; background-color: rgba(255,255,255,0.6); border: 1px solid rgba(0,0,0,0.05); color: {COLOR_GRIS}; font-weight: 600; padding: 0 20px; }}
-    .stTabs [data-baseweb="tab"][aria-selected="true"] {{ background-color: {COLOR_ROUGE}; color: white; border: none; }}
-
-    /* CONTEXTE & CONCLUSION */
-    .context-box, .conclusion-box {{
-        background-color: rgba(255, 255, 255, 0.8); backdrop-filter: blur(12px);
-        border-radius: 20px; padding: 25px; 
-        box-shadow: 0 4px 15px rgba(0,0,0,0.03); border: 1px solid rgba(255,255,255,0.6);
-    }}
-    .context-title {{ font-weight: 700; text-transform: uppercase; font-size: 0.85rem; margin-bottom: 15px; letter-spacing: 1px; }}
-    .context-text {{ color: {COLOR_GRIS}; font-size: 1.05rem; font-weight: 500; line-height: 1.5; }}
-    .conclusion-title {{ color: {COLOR_GRIS}; margin-top:0; margin-bottom: 25px; font-size: 1.6rem; font-weight: 800; letter-spacing: -1px; }}
-    .conclusion-p {{ font-size: 1.15rem; line-height: 1.8; color: #555; margin-bottom: 20px; font-weight: 500; }}
-    .highlight {{ font-weight: 700; color: {COLOR_GRIS}; background-color: rgba(255,255,255,0.5); padding: 2px 6px; border-radius: 4px; border:1px solid #eee; }}
-    .highlight-red {{ font-weight: 800; color: {COLOR_ROUGE}; }}
-
-
-    /* --- GESTION DES ECRANS --- */
-
-    /* MODE ORDINATEUR (ECRANS > 768px) */
-    @media (min-width: 769px) {{
-        [data-testid="stSidebar"] {{ 
-            min-width: 350px !important; 
-            max-width: 350px !important;
-            background-color: rgba(255, 255, 255, 0.65); 
-            backdrop-filter: blur(25px);
-            border-right: 1px solid rgba(255,255,255,0.4);
-            box-shadow: 5px 0 20px rgba(0,0,0,0.03); 
-        }}
-    }}
-
-    /* MODE MOBILE (ECRANS < 768px) */
-    @media (max-width: 768px) {{
-        /* Le menu prend tout l'écran quand il est ouvert pour être propre */
-        [data-testid="stSidebar"] {{ 
-            width: 100% !important; 
-            min-width: 100% !important;
-            background-color: #ffffff !important; /* Fond blanc opaque sur mobile */
-            border-right: none;
-        }}
-        
-        /* Ajustement des marges */
-        .block-container {{ padding-left: 1rem !important; padding-right: 1rem !important; }}
-        
-        /* Titres plus petits */
-        h1 {{ font-size: 1.8rem !important; }}
-        .graph-header {{ font-size: 1rem !important; }}
-        
-        /* Cartes KPI compactes */
-        .kpi-value {{ font-size: 1.6rem !important; }}
-        .kpi-card {{ padding: 15px !important; margin-bottom: 10px !important; }}
-        
-        /* Cacher les décors lourds */
-        .arcades-overlay {{ display: none !important; }}
-        .orb {{ opacity: 0.3 !important; }}
-    }}
-
-    /* IMPRESSION */
-    @media print {{
-        @page {{ size: A4; margin: 10mm; }}
-        .background-container, .arcades-overlay, [data-testid="stSidebar"], header, footer, .no-print {{ display: none !important; }}
-        html, body, .stApp {{ background: white !important; }}
-        .kpi-card, .graph-container, .context-box, .conclusion-box {{ box-shadow: none !important; border: 1px solid #ccc !important; page-break-inside: avoid; }}
-    }}
-    </style>
-""", unsafe_allow_html=True)
+profil.etape("css_assets")
+# Images redimensionnées/WebP une fois par processus et servies par URL statique (cf. assets.py)
+service_statique = st.get_option("server.enableStaticServing")
+exports.demarrer_purge()  # exports publics (static/exports/) périmés supprimés même sans nouvel export
+arcades_url = None
+try:
+    arcades_url = assets.url("arcades.png", service_statique)
+except Exception: pass
+
+css_global = css_application(arcades_url)  # mis en cache par processus (cf. theme.py)
+st.markdown(css_global, unsafe_allow_html=True)
+profil.compter("css", len(css_global))
 
 # --- INJECTION 3D ---
 st.markdown("""
@@ -207,17 +47,38 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # --- BARRE LATÉRALE ---
-if 'loyer_hc' not in st.session_state: st.session_state.loyer_hc = 600
-if 'prov_mensuelle_input' not in st.session_state: st.session_state.prov_mensuelle_input = 50
+profil.etape("barre_laterale")
+def appliquer_parametres(parametres):
+    for cle_parametre in etudes.PARAMETRES_DEFAUT.keys() & parametres.keys(): st.session_state[cle_parametre] = parametres[cle_parametre]
+    st.session_state.s_loyer = st.session_state.loyer_hc
+def charger_etude(identifiant):
+    # Callback : les widgets du rerun suivant reprennent les entrées, le scénario vient des résultats enregistrés
+    etude = etudes.charger(identifiant)
+    appliquer_parametres(etude.parametres)
+    st.session_state.etude_chargee = etude
+
+# Lien de partage (?etat=...) appliqué une fois, à l'ouverture de la session
+code_etat = st.query_params.get("etat")
+if code_etat and not st.session_state.get("etat_url_applique"):
+    st.session_state.etat_url_applique = True
+    try:
+        appliquer_parametres(etudes.decoder_etat(code_etat))
+    except ValueError as exc:
+        st.toast(f"Lien de partage ignoré : {exc}")
+for cle_parametre, defaut in etudes.PARAMETRES_DEFAUT.items(): st.session_state.setdefault(cle_parametre, defaut)
+st.session_state.setdefault('s_loyer', st.session_state.loyer_hc)
 
 def sync_widgets(key_slider, key_input): st.session_state[key_input] = st.session_state[key_slider]
 def sync_widgets_reverse(key_input, key_slider): st.session_state[key_slider] = st.session_state[key_input]
+def sync_live():
+    # Les composants v1 appellent on_change sans arguments
+    if st.session_state.live_loyer is not None: st.session_state.loyer_hc = st.session_state.s_loyer = st.session_state.live_loyer["loyer"]
 
 with st.sidebar:
-    logo_path = get_file_path("logo.png")
-    if os.path.exists(logo_path):
-        img_b64 = get_img_as_base64(logo_path)
-        st.markdown(f'<div class="logo-container-html"><img src="data:image/png;base64,{img_b64}" class="custom-logo"></div>', unsafe_allow_html=True)
+    logo_url = assets.url("logo.png", service_statique)
+    profil.compter("images", len(logo_url or "") + len(arcades_url or ""))
+    if logo_url:
+        st.markdown(f'<div class="logo-container-html"><img src="{logo_url}" class="custom-logo"></div>', unsafe_allow_html=True)
     else:
         st.markdown(f"<div style='margin-top:20px; text-align:center;'><h1 style='color:{COLOR_ROUGE}; font-size:3rem;'>PATRIM</h1></div>", unsafe_allow_html=True)
 
@@ -225,32 +86,34 @@ with st.sidebar:
     st.markdown("### 🏠 Revenus & Charges")
     st.markdown("**Loyer Hors Charges (€)**")
     c1, c2 = st.columns([3, 2])
-    with c1: st.slider("", 0, 5000, key='s_loyer', value=st.session_state.loyer_hc, step=10, on_change=sync_widgets, args=('s_loyer', 'loyer_hc'), label_visibility="collapsed")
-    with c2: st.number_input("", 0, 5000, key='loyer_hc', value=st.session_state.loyer_hc, step=10, on_change=sync_widgets_reverse, args=('loyer_hc', 's_loyer'), label_visibility="collapsed", format="%d")
+    with c1: st.slider("", *etudes.BORNES_PARAMETRES["loyer_hc"], key='s_loyer', step=10, on_change=sync_widgets, args=('s_loyer', 'loyer_hc'), label_visibility="collapsed")
+    with c2: st.number_input("", *etudes.BORNES_PARAMETRES["loyer_hc"], key='loyer_hc', step=10, on_change=sync_widgets_reverse, args=('loyer_hc', 's_loyer'), label_visibility="collapsed", format="%d")
+    mode_live = st.checkbox("⚡ Calcul instantané (démo)", value=False, help="KPI et courbes recalculés dans le navigateur pendant le glissement du loyer")
+    graphiques_compacts = st.checkbox("📱 Graphiques allégés (mobile)", value=False, help="Données float32, tracés linéaires sans marqueurs : moins de données à transférer et à dessiner")
 
     # MODIFICATION 1 : PROVISION MENSUELLE
     st.caption("Charges Locatives")
-    prov_mensuelle = st.number_input("Provision sur charges (Mensuel €)", value=st.session_state.prov_mensuelle_input, step=5, format="%d", help="Montant mensuel des provisions")
+    prov_mensuelle = st.number_input("Provision sur charges (Mensuel €)", key="prov_mensuelle", step=5, format="%d", help="Montant mensuel des provisions")
 
     # --- GESTION ---
     st.markdown("---")
     st.markdown("### 💼 Offre de Gestion")
     
     # MODIFICATION 2 : TAUX JUSQU'A 10%
-    taux_gestion = st.slider("Honoraires Gestion TTC (%)", 4.0, 10.0, 5.0, 0.5)
+    taux_gestion = st.slider("Honoraires Gestion TTC (%)", *etudes.BORNES_PARAMETRES["taux_gestion"], step=0.5, key="taux_gestion")
     
     col_opt1, col_opt2 = st.columns(2)
-    with col_opt1: pno_active = st.checkbox("Option PNO (80€/an)", value=True)
-    with col_opt2: gli_active = st.checkbox("Option GLI", value=True)
+    with col_opt1: pno_active = st.checkbox("Option PNO (80€/an)", key="pno_active")
+    with col_opt2: gli_active = st.checkbox("Option GLI", key="gli_active")
     
     # MODIFICATION 3 : CURSEUR GLI
     taux_gli = 2.8 # Valeur par défaut
     if gli_active:
-        taux_gli = st.slider("Taux GLI (%)", 2.5, 2.8, 2.8, 0.1)
+        taux_gli = st.slider("Taux GLI (%)", *etudes.BORNES_PARAMETRES["taux_gli"], step=0.1, key="taux_gli")
 
     # --- FINANCEMENT ---
     st.markdown("---")
-    has_credit = st.checkbox("Crédit en cours sur ce bien ?", value=True)
+    has_credit = st.checkbox("Crédit en cours sur ce bien ?", key="has_credit")
     credit_mensuel_ass = 0
     montant_emprunte_initial = 0
     taux_credit_hors_ass = 0
@@ -258,72 +121,164 @@ with st.sidebar:
 
     if has_credit:
         st.caption("Flux de Trésorerie")
-        credit_mensuel_ass = st.number_input("Mensualité Crédit (avec assurance) €", value=400, step=10, format="%d")
+        credit_mensuel_ass = st.number_input("Mensualité Crédit (avec assurance) €", key="credit_mensuel_ass", step=10, format="%d")
         st.caption("Calcul Patrimoine (Amortissement)")
         c_fin1, c_fin2 = st.columns(2)
-        with c_fin1: montant_emprunte_initial = st.number_input("Capital Emprunté (€)", value=100000, step=1000, format="%d")
-        with c_fin2: taux_credit_hors_ass = st.number_input("Taux Crédit (hors ass.) %", value=3.5, step=0.1, format="%.1f")
-        duree_restante_annees = st.slider("Durée restante (années)", 5, 25, 20, 1)
+        with c_fin1: montant_emprunte_initial = st.number_input("Capital Emprunté (€)", key="montant_emprunte_initial", step=1000, format="%d")
+        with c_fin2: taux_credit_hors_ass = st.number_input("Taux Crédit (hors ass.) %", key="taux_credit_hors_ass", step=0.1, format="%.1f")
+        duree_restante_annees = st.slider("Durée restante (années)", *etudes.BORNES_PARAMETRES["duree_restante_annees"], step=1, key="duree_restante_annees")
 
     # --- ANALYSE POUSSÉE ---
     st.markdown("---")
     with st.expander("📊 Analyse Poussée (Rentabilité Nette)"):
-        tf_annuelle = st.number_input("Taxe Foncière (Annuelle €)", value=800, step=50, format="%d")
-        copro_annuelle = st.number_input("Charges Copro Propriétaire (Annuelle €)", value=400, step=50, format="%d", help="Charges non récupérables")
+        tf_annuelle = st.number_input("Taxe Foncière (Annuelle €)", key="tf_annuelle", step=50, format="%d")
+        copro_annuelle = st.number_input("Charges Copro Propriétaire (Annuelle €)", key="copro_annuelle", step=50, format="%d", help="Charges non récupérables")
         st.markdown("**Stratégie Cashflow**")
-        taux_placement = st.slider("Rendement placement (%)", 0.0, 15.0, 4.0, 0.5, help="Si cashflow positif")
+        taux_placement = st.slider("Rendement placement (%)", *etudes.BORNES_PARAMETRES["taux_placement"], step=0.5, key="taux_placement", help="Si cashflow positif")
+
+    # --- MODE RISQUE ---
+    with st.expander("🎲 Mode Risque (Monte Carlo)"):
+        mode_risque = st.checkbox("Activer les scénarios aléatoires", value=False)
+        vacance_mois = st.slider("Vacance locative (mois/an)", 0.0, 3.0, 0.5, 0.25)
+        proba_impaye = st.slider("Risque d'impayé (% des mois)", 0.0, 10.0, 2.0, 0.5, help="Couvert si l'option GLI est active")
+        inflation_charges = st.slider("Inflation des charges (%/an)", 0.0, 6.0, 2.0, 0.5)
+        volatilite_placement = st.slider("Volatilité du placement (%/an)", 0.0, 20.0, 8.0, 1.0)
+        nb_chemins = st.select_slider("Nombre de scénarios", options=[1_000, 10_000, 100_000], value=10_000, format_func=fmt)
+
+# --- TRAVAUX LOURDS (file partagée entre sessions, cf. travaux.py) ---
+session_travaux = session_courante()
+def travail_session(cle, signature, taches, combiner, total=None, libelle=""):
+    # Repris tant que ses entrées (signature) sont inchangées ; soumis sinon (l'ancien est alors annulé)
+    travaux_session = st.session_state.setdefault("travaux", {})
+    travail = travaux_session.get(cle)
+    if travail is None or travail.signature != signature:
+        try:
+            travail = gestionnaire().soumettre(session_travaux, cle, taches(), combiner, signature=signature, total=total, libelle=libelle)
+        except (FileSaturee, QuotaDepasse) as exc:
+            st.warning(f"{libelle} : {exc}")
+            return None
+        travaux_session[cle] = travail
+    return travail
+
+def abandonner_travail(cle):
+    travail = st.session_state.get("travaux", {}).pop(cle, None)
+    if travail is not None: travail.annuler()
+
+def travail_lance(cle, signature):
+    # Travail déjà lancé sur ces entrées (celui d'entrées différentes est abandonné)
+    travail = st.session_state.get("travaux", {}).get(cle)
+    if travail is not None and travail.signature != signature:
+        abandonner_travail(cle)
+        return None
+    return travail
+
+@st.fragment(run_every=0.5)
+def suivre_travail(cle):
+    # Seul ce fragment est relancé pendant le travail ; la page entière l'est à la fin
+    travail = st.session_state.travaux[cle]
+    if not travail.actif: st.rerun()
+    texte = f"{travail.libelle} : {fmt(travail.faites)} / {fmt(travail.total)}" if travail.total else f"{travail.libelle} : {fmt(travail.faites)} lots traités"
+    p1, p2 = st.columns([5, 1], vertical_alignment="center")
+    with p1: st.progress(travail.progression or 0.0, text=texte)
+    with p2: st.button("Annuler", key=f"annuler_{cle}", on_click=travail.annuler, width="stretch")
+
+def afficher_travail(cle):
+    """Progression du travail ``cle`` ou son issue (annulé, échec) ; True s'il est terminé."""
+    travail = st.session_state.get("travaux", {}).get(cle)
+    if travail is None: return False
+    if travail.statut == TERMINE: return True
+    if travail.actif:
+        suivre_travail(cle)
+        return False
+    if travail.statut == ECHEC: st.error(f"{travail.libelle} impossible : {travail.erreur}")
+    elif travail.annule or travail.statut == ANNULE: st.info(f"{travail.libelle} annulé.")
+    st.button("Relancer", key=f"relancer_{cle}", on_click=abandonner_travail, args=(cle,))
+    return False
 
 # --- CALCULS MOTEUR ---
-# 1. Revenus
-loyer_cc = st.session_state.loyer_hc + prov_mensuelle
-
-# 2. Dépenses Gestion
-cout_gestion = loyer_cc * (taux_gestion / 100)
-cout_gli = loyer_cc * (taux_gli / 100) if gli_active else 0
-cout_pno = 80 / 12 if pno_active else 0
-total_frais_gestion = cout_gestion + cout_gli + cout_pno
-cashflow_brut_mensuel = loyer_cc - total_frais_gestion - credit_mensuel_ass
-charges_proprio_mensuel = (tf_annuelle + copro_annuelle) / 12
-cashflow_net_mensuel = cashflow_brut_mensuel - charges_proprio_mensuel
-
-# --- DONNÉES GRAPHIQUES ---
-nb_mois_projection = duree_restante_annees * 12
-annees_axis = list(range(1, duree_restante_annees + 1))
-
-# Cashflow Cumulé
-data_cashflow_cumul = []
-cumul_cf = 0
-for m in range(1, nb_mois_projection + 1):
-    if cashflow_net_mensuel > 0: cumul_cf = (cumul_cf + cashflow_net_mensuel) * (1 + taux_placement/100/12)
-    else: cumul_cf += cashflow_net_mensuel
-    if m % 12 == 0: data_cashflow_cumul.append(cumul_cf)
-
-# Patrimoine Cumulé
-data_patrimoine_cumul = []
-capital_rembourse_total = 0
-remaining_balance = montant_emprunte_initial
-taux_mensuel_credit = taux_credit_hors_ass / 100 / 12
-mensualite_theorique_ha = 0
-if has_credit and montant_emprunte_initial > 0 and taux_credit_hors_ass > 0:
-    mensualite_theorique_ha = montant_emprunte_initial * (taux_mensuel_credit / (1 - (1 + taux_mensuel_credit) ** (-nb_mois_projection)))
-
-for m in range(1, nb_mois_projection + 1):
-    interet_mois = remaining_balance * taux_mensuel_credit
-    capital_mois = mensualite_theorique_ha - interet_mois
-    if remaining_balance > 0:
-        capital_rembourse_total += capital_mois
-        remaining_balance -= capital_mois
-    if m % 12 == 0:
-        patrimoine_at_year = data_cashflow_cumul[m//12 -1] + capital_rembourse_total
-        data_patrimoine_cumul.append(patrimoine_at_year)
+profil.etape("scenario")
+def bien_pour_risque(indicateurs, loyer_hc, prov_mensuelle, taux_gestion, pno_active, gli_active, taux_gli, credit_mensuel_ass, montant_emprunte_initial,
+                     taux_credit_hors_ass, duree_restante_annees, tf_annuelle, copro_annuelle, taux_placement, *_):
+    return dict(
+        loyer_cc=float(indicateurs.loyer_cc), taux_gestion=taux_gestion, gli_active=gli_active, taux_gli=taux_gli, pno_active=pno_active,
+        credit_mensuel=credit_mensuel_ass, charges_proprio_mensuel=float(indicateurs.charges_proprio_mensuel), taux_placement=taux_placement,
+        capital=montant_emprunte_initial, taux_credit=taux_credit_hors_ass, duree_annees=duree_restante_annees,
+    )
+
+def calculer_scenario(loyer_hc, prov_mensuelle, taux_gestion, pno_active, gli_active, taux_gli, credit_mensuel_ass, montant_emprunte_initial,
+                      taux_credit_hors_ass, duree_restante_annees, tf_annuelle, copro_annuelle, taux_placement, hypotheses, nb_chemins):
+    # 1. Revenus & 2. Dépenses Gestion
+    with profil.phase("projection"):
+        indicateurs = calculer_indicateurs(loyer_hc, prov_mensuelle, taux_gestion, gli_active, taux_gli, pno_active, credit_mensuel_ass, tf_annuelle, copro_annuelle)
+
+        # 3. Cashflow Cumulé & Patrimoine Cumulé (moteur vectorisé, points de fin d'année)
+        annees_axis = list(range(1, duree_restante_annees + 1))
+        projection = projeter(indicateurs.cashflow_net_mensuel, taux_placement, montant_emprunte_initial, taux_credit_hors_ass, duree_restante_annees).annuelle()
+        data_cashflow_cumul = projection.cashflow_cumul.tolist()
+        data_patrimoine_cumul = projection.patrimoine.tolist()
+
+    # 4. Mode Risque : bandes P5 / P50 / P95 (un seul lot de chemins ; au-delà, file de travaux)
+    risque = None
+    if hypotheses is not None:
+        bien_risque = bien_pour_risque(indicateurs, loyer_hc, prov_mensuelle, taux_gestion, pno_active, gli_active, taux_gli, credit_mensuel_ass,
+                                       montant_emprunte_initial, taux_credit_hors_ass, duree_restante_annees, tf_annuelle, copro_annuelle, taux_placement)
+        with profil.phase("risque"):
+            risque = simuler_risque(bien_risque, hypotheses, nb_chemins)
+
+    return dict(indicateurs=indicateurs, annees_axis=annees_axis, data_cashflow_cumul=data_cashflow_cumul, data_patrimoine_cumul=data_patrimoine_cumul, risque=risque)
+
+# Cache LRU partagé entre sessions, clé = entrées normalisées (taux GLI ignoré si l'option est inactive)
+hypotheses = None
+if mode_risque:
+    hypotheses = HypothesesRisque(vacance_mois_par_an=vacance_mois, proba_impaye=proba_impaye / 100, inflation_charges=inflation_charges, volatilite_placement=volatilite_placement)
+parametres_scenario = (
+    st.session_state.loyer_hc, prov_mensuelle, taux_gestion, pno_active, gli_active, taux_gli if gli_active else 0.0, credit_mensuel_ass, montant_emprunte_initial,
+    taux_credit_hors_ass, duree_restante_annees, tf_annuelle, copro_annuelle, taux_placement, hypotheses, nb_chemins if mode_risque else 0,
+)
+cle_scenario = normaliser_cle(*parametres_scenario[:-2], astuple(hypotheses) if hypotheses else None, parametres_scenario[-1])
+# Étude rechargée et entrées inchangées : résultats enregistrés repris tels quels, sans recalcul
+parametres_etude = {cle_parametre: st.session_state[cle_parametre] for cle_parametre in etudes.PARAMETRES_DEFAUT}
+etude_chargee = st.session_state.get("etude_chargee")
+risque_en_fond = hypotheses is not None and len(lots_risque(nb_chemins)) > 1
+if etude_chargee is not None and hypotheses is None and etude_chargee.parametres == parametres_etude:
+    scenario = cache.scenarios.obtenir(cle_scenario, lambda: etudes.scenario(etude_chargee.resultats))
+elif risque_en_fond:
+    # Monte Carlo en plusieurs lots : scénario de base tout de suite, bandes calculées par la file de travaux
+    scenario = cache.scenarios.consulter(cle_scenario)
+    if scenario is None:
+        parametres_base = (*parametres_scenario[:-2], None, 0)
+        scenario = cache.scenarios.obtenir(normaliser_cle(*parametres_base[:-2], None, 0), lambda: calculer_scenario(*parametres_base))
+        bien_risque = bien_pour_risque(scenario["indicateurs"], *parametres_scenario)
+        lots = lots_risque(nb_chemins)
+        travail_risque = travail_session(
+            "risque", cle_scenario, lambda: [(simuler_lot, bien_risque, hypotheses, taille, graine) for taille, graine in lots],
+            lambda cashflows, cle=cle_scenario, base=scenario, bien=bien_risque: cache.scenarios.obtenir(cle, lambda: dict(base, risque=combiner_risque(bien, cashflows))),
+            libelle=f"Mode risque ({fmt(nb_chemins)} scénarios)",
+        )
+        if travail_risque is not None and travail_risque.statut == TERMINE:
+            scenario = travail_risque.resultat()
+else:
+    scenario = cache.scenarios.obtenir(cle_scenario, lambda: calculer_scenario(*parametres_scenario))
+if not risque_en_fond or scenario["risque"] is not None:
+    abandonner_travail("risque")
+
+indicateurs = scenario["indicateurs"]
+loyer_cc = indicateurs.loyer_cc
+total_frais_gestion = indicateurs.total_frais_gestion
+cashflow_brut_mensuel = indicateurs.cashflow_brut_mensuel
+cashflow_net_mensuel = indicateurs.cashflow_net_mensuel
+data_patrimoine_cumul = scenario["data_patrimoine_cumul"]
+risque = scenario["risque"]
 
 # --- PAGE PRINCIPALE ---
+profil.etape("kpi")
 st.markdown(f"<h1 style='color:{COLOR_GRIS}; margin-bottom:0; font-weight: 800; letter-spacing: -1px;'>Étude de Gestion Locative</h1>", unsafe_allow_html=True)
 st.caption(f"Analyse pour un loyer de {fmt(st.session_state.loyer_hc)} € HC")
+if risque_en_fond and risque is None:
+    afficher_travail("risque")
 st.write("")
 
 # KPI CARDS
-k1, k2, k3, k4 = st.columns(4)
 def kpi(label, val, sub, color_code):
     return f"""<div class="kpi-card" style="border-left: 4px solid {color_code};">
                 <div class="kpi-label">{label}</div>
@@ -334,47 +289,87 @@ def kpi(label, val, sub, color_code):
 color_cf = COLOR_VERT if cashflow_net_mensuel >= 0 else COLOR_ROUGE
 txt_cf = "Cashflow Positif" if cashflow_net_mensuel >= 0 else "Effort d'épargne"
 
-with k1: st.markdown(kpi("Loyer Charges Comprises", f"{fmt(loyer_cc)} €", f"Dont {fmt(prov_mensuelle)}€ provisions", COLOR_ROUGE), unsafe_allow_html=True)
-with k2: st.markdown(kpi("Total Frais Gestion", f"{fmt(total_frais_gestion)} €", f"Taux eff: {total_frais_gestion/loyer_cc*100:.1f}% TTC", COLOR_GRIS), unsafe_allow_html=True)
-with k3: st.markdown(kpi("Reste à Vivre (Brut)", f"{fmt(cashflow_brut_mensuel)} €", "Avant TF et Charges Proprio", color_cf), unsafe_allow_html=True)
-with k4: st.markdown(kpi("Cashflow Net Réel", f"{fmt(cashflow_net_mensuel)} €", txt_cf, color_cf), unsafe_allow_html=True)
+if mode_live:
+    # Calcul instantané côté navigateur : le serveur ne reçoit le loyer qu'au relâchement du curseur
+    projection_live(
+        st.session_state.loyer_hc, prov_mensuelle, taux_gestion, gli_active, taux_gli, pno_active, credit_mensuel_ass, float(indicateurs.charges_proprio_mensuel),
+        taux_placement, montant_emprunte_initial, taux_credit_hors_ass, duree_restante_annees,
+        couleurs=dict(rouge=COLOR_ROUGE, vert=COLOR_VERT, gris=COLOR_GRIS, patrimoine=COLOR_BLEU_PATRIMOINE),
+        key='live_loyer', on_change=sync_live,
+    )
+else:
+    k1, k2, k3, k4 = st.columns(4)
+    with k1: st.markdown(kpi("Loyer Charges Comprises", f"{fmt(loyer_cc)} €", f"Dont {fmt(prov_mensuelle)}€ provisions", COLOR_ROUGE), unsafe_allow_html=True)
+    with k2: st.markdown(kpi("Total Frais Gestion", f"{fmt(total_frais_gestion)} €", f"Taux eff: {total_frais_gestion/loyer_cc*100:.1f}% TTC", COLOR_GRIS), unsafe_allow_html=True)
+    with k3: st.markdown(kpi("Reste à Vivre (Brut)", f"{fmt(cashflow_brut_mensuel)} €", "Avant TF et Charges Proprio", color_cf), unsafe_allow_html=True)
+    with k4: st.markdown(kpi("Cashflow Net Réel", f"{fmt(cashflow_net_mensuel)} €", txt_cf, color_cf), unsafe_allow_html=True)
 
 # --- ZONE GRAPHIQUE ---
+profil.etape("graphiques")
 st.write("")
 col_graph, col_context = st.columns([3, 1])
 
 with col_graph:
+    from graphiques import CONFIG, ECHELLE_CASHFLOW, ECHELLE_PATRIMOINE, figure_carte, figure_projection
     st.markdown('<div class="graph-header">Projection Financière</div>', unsafe_allow_html=True)
-    tab1, tab2 = st.tabs(["💰 Flux de Trésorerie (Cashflow)", "🏛️ Enrichissement Latent (Patrimoine)"])
-    
-    config = {'displayModeBar': False, 'scrollZoom': False}
-    axis_style = dict(showgrid=False, showline=False, zeroline=False, tickfont=dict(color='#999', size=11, family='Inter'), fixedrange=True)
-    yaxis_style = dict(showgrid=True, gridcolor='rgba(0,0,0,0.05)', gridwidth=1, showline=False, zeroline=False, tickfont=dict(color='#999', size=11), tickprefix="€ ", fixedrange=True)
-    layout_common = dict(
-        separators=",.", paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', 
-        margin=dict(t=30, b=30, l=10, r=10), height=350,
-        hovermode="x unified", hoverlabel=dict(bgcolor="white", font_size=12, font_family="Inter", bordercolor="rgba(0,0,0,0.1)"),
-        xaxis=dict(**axis_style, title="Années"), yaxis=dict(**yaxis_style)
-    )
-
-    with tab1:
-        st.markdown('<div class="graph-container">', unsafe_allow_html=True)
-        fig1 = go.Figure()
-        color_line1 = COLOR_VERT if cashflow_net_mensuel >= 0 else COLOR_ROUGE
-        fig1.add_trace(go.Scatter(x=annees_axis, y=data_cashflow_cumul, mode='lines+markers', name='Cumul', line=dict(width=3, color=color_line1, shape='spline'), marker=dict(size=6, color='white', line=dict(width=2, color=color_line1))))
-        fig1.update_layout(**layout_common, showlegend=False)
-        st.plotly_chart(fig1, use_container_width=True, config=config)
-        st.markdown('</div>', unsafe_allow_html=True)
-
-    with tab2:
-        st.markdown('<div class="graph-container">', unsafe_allow_html=True)
-        fig2 = go.Figure()
-        fig2.add_trace(go.Scatter(x=annees_axis, y=data_patrimoine_cumul, mode='lines+markers', name='Patrimoine', line=dict(width=3, color=COLOR_BLEU_PATRIMOINE, shape='spline'), marker=dict(size=6, color='white', line=dict(width=2, color=COLOR_BLEU_PATRIMOINE)), fill='tozeroy', fillcolor="rgba(52, 73, 94, 0.1)"))
-        fig2.update_layout(**layout_common, showlegend=False)
-        st.plotly_chart(fig2, use_container_width=True, config=config)
-        st.markdown('</div>', unsafe_allow_html=True)
+    # Onglets paresseux : seul l'onglet ouvert est calculé et envoyé (un changement d'onglet relance le script)
+    tab1, tab2, tab3 = st.tabs(["💰 Flux de Trésorerie (Cashflow)", "🏛️ Enrichissement Latent (Patrimoine)", "🎯 Sensibilité"], key="onglet_graphique", on_change="rerun")
+    gabarits = st.session_state.setdefault("gabarits_figures", {})
+
+    if tab1.open:
+        with tab1:
+            st.markdown('<div class="graph-container">', unsafe_allow_html=True)
+            color_line1 = COLOR_VERT if cashflow_net_mensuel >= 0 else COLOR_ROUGE
+            with profil.phase("figures"):
+                fig1 = figure_projection(gabarits, "cashflow", scenario["annees_axis"], scenario["data_cashflow_cumul"], color_line1,
+                                         bandes=risque.cashflow_cumul if risque is not None else None, compact=graphiques_compacts)
+            with profil.phase("plotly_chart"):
+                st.plotly_chart(fig1, width="stretch", config=CONFIG)
+            profil.compter("plotly", lambda: len(fig1.to_json()))
+            if risque is not None:
+                st.caption(f"Mode risque : {fmt(risque.nb_chemins)} scénarios, bande P5–P95. Probabilité d'une trésorerie cumulée négative à {duree_restante_annees} ans : {risque.proba_cashflow_negatif*100:.1f} %")
+            st.markdown('</div>', unsafe_allow_html=True)
+
+    if tab2.open:
+        with tab2:
+            st.markdown('<div class="graph-container">', unsafe_allow_html=True)
+            with profil.phase("figures"):
+                fig2 = figure_projection(gabarits, "patrimoine", scenario["annees_axis"], data_patrimoine_cumul, COLOR_BLEU_PATRIMOINE,
+                                         bandes=risque.patrimoine if risque is not None else None, compact=graphiques_compacts)
+            with profil.phase("plotly_chart"):
+                st.plotly_chart(fig2, width="stretch", config=CONFIG)
+            profil.compter("plotly", lambda: len(fig2.to_json()))
+            st.markdown('</div>', unsafe_allow_html=True)
+
+    if tab3.open:
+        with tab3:
+            profil.etape("sensibilite")
+            st.markdown('<div class="graph-container">', unsafe_allow_html=True)
+            # Grille loyer HC x honoraires (x taux GLI) calculée en une seule passe vectorisée
+            grille = calculer_grille(
+                axe_loyers(st.session_state.loyer_hc), axe_taux_gestion(), prov_mensuelle, gli_active, TAUX_GLI if gli_active else taux_gli,
+                pno_active, credit_mensuel_ass, tf_annuelle, copro_annuelle, taux_placement, montant_emprunte_initial, taux_credit_hors_ass, duree_restante_annees,
+            )
+            taux_gli_grille = taux_gli
+            if gli_active:
+                options_gli = [float(t) for t in grille.taux_gli]
+                taux_gli_grille = st.select_slider("Taux GLI de la grille (%)", options=options_gli, value=options_gli[grille.indice_gli(taux_gli)], format_func=fmt_dec)
+            idx_gli = grille.indice_gli(taux_gli_grille)
+
+            cartes = (
+                ("cashflow", "Cashflow net mensuel", grille.cashflow_net_mensuel[idx_gli], ECHELLE_CASHFLOW),
+                ("patrimoine", f"Patrimoine à {duree_restante_annees} ans", grille.patrimoine_horizon[idx_gli], ECHELLE_PATRIMOINE),
+            )
+            for col_heatmap, (nom_heatmap, titre_heatmap, z_heatmap, echelle) in zip(st.columns(2), cartes):
+                with profil.phase("figures"):
+                    fig_heatmap = figure_carte(gabarits, nom_heatmap, titre_heatmap, grille.loyers_hc, grille.taux_gestion, z_heatmap, echelle,
+                                               (st.session_state.loyer_hc, taux_gestion), compact=graphiques_compacts)
+                with col_heatmap, profil.phase("plotly_chart"): st.plotly_chart(fig_heatmap, width="stretch", config=CONFIG)
+                profil.compter("plotly", lambda: len(fig_heatmap.to_json()))
+            st.markdown('</div>', unsafe_allow_html=True)
 
 # --- CONTEXTE AVANCÉ ET DÉTAILLÉ ---
+profil.etape("contexte_conclusion")
 with col_context:
     st.write("") 
     st.write("") 
@@ -448,5 +443,190 @@ conclusion_html = f"""
 """
 st.markdown(conclusion_html, unsafe_allow_html=True)
 
+# --- OBJECTIFS (CALCUL DIRECT) ---
+profil.etape("objectifs")
+with st.expander("🎯 Objectifs : loyer d'équilibre, honoraires et emprunt maximum"):
+    c_obj1, c_obj2 = st.columns(2)
+    with c_obj1: cashflow_cible = st.number_input("Cashflow net visé (Mensuel €)", value=0, step=10, format="%d")
+    with c_obj2: effort_max = st.number_input("Effort d'épargne accepté (Mensuel €)", value=0, min_value=0, step=10, format="%d")
+    objectif_loyer = loyer_equilibre(prov_mensuelle, taux_gestion, gli_active, taux_gli, pno_active, credit_mensuel_ass, tf_annuelle, copro_annuelle, cashflow_cible)
+    objectif_taux = taux_gestion_max(st.session_state.loyer_hc, prov_mensuelle, gli_active, taux_gli, pno_active, credit_mensuel_ass, tf_annuelle, copro_annuelle, cashflow_cible)
+    objectif_capital = capital_max(st.session_state.loyer_hc, prov_mensuelle, taux_gestion, gli_active, taux_gli, pno_active, tf_annuelle, copro_annuelle,
+                                   taux_credit_hors_ass, duree_restante_annees, effort_max)
+    objectif_taux_credit = taux_credit_max(montant_emprunte_initial, duree_restante_annees, st.session_state.loyer_hc, prov_mensuelle, taux_gestion, gli_active,
+                                           taux_gli, pno_active, tf_annuelle, copro_annuelle, effort_max)
+    inatteignable = "Inatteignable"
+    o1, o2, o3, o4 = st.columns(4)
+    with o1: st.markdown(kpi("Loyer HC minimum", inatteignable if np.isnan(objectif_loyer) else f"{fmt(np.ceil(objectif_loyer))} €", f"Pour {fmt(cashflow_cible)}€ de cashflow net", COLOR_ROUGE), unsafe_allow_html=True)
+    with o2: st.markdown(kpi("Honoraires maximum", inatteignable if np.isnan(objectif_taux) else f"{fmt_dec(objectif_taux)} %", f"TTC, au loyer de {fmt(st.session_state.loyer_hc)}€", COLOR_GRIS), unsafe_allow_html=True)
+    with o3: st.markdown(kpi("Capital empruntable", inatteignable if np.isnan(objectif_capital) else f"{fmt(objectif_capital)} €", f"À {taux_credit_hors_ass}% sur {duree_restante_annees} ans", COLOR_BLEU_PATRIMOINE), unsafe_allow_html=True)
+    with o4: st.markdown(kpi("Taux de crédit maximum", "—" if not montant_emprunte_initial else inatteignable if np.isnan(objectif_taux_credit) else f"{fmt_dec(objectif_taux_credit)} %", f"Pour {fmt(montant_emprunte_initial)}€ sur {duree_restante_annees} ans", COLOR_BLEU_PATRIMOINE), unsafe_allow_html=True)
+    st.caption(f"Effort d'épargne accepté : {fmt(effort_max)}€/mois. Mensualités hors assurance pour le capital et le taux.")
+
+# --- COMPARAISON D'OFFRES (calculée seulement panneau ouvert) ---
+profil.etape("comparaison")
+panneau_comparaison = st.expander("⚖️ Comparer des offres de gestion", key="panneau_comparaison", on_change="rerun")
+if panneau_comparaison.open:
+    from comparaison import NB_OFFRES_MAX, OFFRES_TYPES, comparer_offres
+    from graphiques import CONFIG, figure_comparaison
+    with panneau_comparaison:
+        st.caption(f"Même bien et même crédit que la barre latérale ; l'offre saisie est comparée à {NB_OFFRES_MAX - 1} offres au plus (une ligne par offre).")
+        offres_editees = st.data_editor(
+            OFFRES_TYPES, key="offres_comparees", num_rows="dynamic", hide_index=True, width="stretch",
+            column_config=dict(
+                nom=st.column_config.TextColumn("Offre", default="Nouvelle offre", required=True),
+                taux_gestion=st.column_config.NumberColumn("Honoraires TTC (%)", min_value=4.0, max_value=10.0, step=0.5, default=6.0, required=True),
+                gli=st.column_config.CheckboxColumn("GLI", default=True),
+                taux_gli=st.column_config.NumberColumn("Taux GLI (%)", min_value=2.5, max_value=2.8, step=0.1, default=2.8, required=True),
+                pno=st.column_config.CheckboxColumn("PNO", default=True),
+            ),
+        )
+        offres = [dict(nom="Offre saisie", taux_gestion=taux_gestion, gli=gli_active, taux_gli=taux_gli, pno=pno_active)]
+        offres += [o for o in offres_editees if o.get("taux_gestion") is not None and o.get("taux_gli") is not None][:NB_OFFRES_MAX - 1]
+        comparaison = comparer_offres(
+            offres, st.session_state.loyer_hc, prov_mensuelle, credit_mensuel_ass, tf_annuelle, copro_annuelle,
+            taux_placement, montant_emprunte_initial, taux_credit_hors_ass, duree_restante_annees,
+        )
+        reference = st.radio("Offre de référence", range(len(offres)), format_func=lambda k: comparaison.noms[k], horizontal=True, key="offre_reference")
+        reference = min(reference, len(offres) - 1)
+        ecarts = comparaison.ecarts(reference)
+        signe = lambda valeur: ("+" if valeur > 0 else "") + fmt(valeur)
+        lignes = [f"| Offre | Frais de gestion /mois | Cashflow net /mois | Écart /mois | Patrimoine à {duree_restante_annees} ans | Écart patrimoine |", "|---|---:|---:|---:|---:|---:|"]
+        for k, nom in enumerate(comparaison.noms):
+            nom = nom.replace("|", "\\|")
+            lignes.append(
+                f"| {'**' + nom + '**' if k == reference else nom} | {fmt(ecarts['frais_gestion_mensuel'][k])} € | {fmt(ecarts['cashflow_net_mensuel'][k])} € | "
+                f"{signe(ecarts['ecart_cashflow_net_mensuel'][k])} € | {fmt(ecarts['patrimoine_horizon'][k])} € | {signe(ecarts['ecart_patrimoine_horizon'][k])} € |"
+            )
+        st.markdown("\n".join(lignes))
+        for col_comparaison, (courbe, titre, series) in zip(st.columns(2), (
+            ("cashflow", "Cashflow cumulé", comparaison.cashflow_cumul), ("patrimoine", "Patrimoine", comparaison.patrimoine),
+        )):
+            with col_comparaison:
+                st.markdown(f"**{titre}**")
+                with profil.phase("figures"):
+                    fig_comparaison = figure_comparaison(gabarits, courbe, comparaison.annees, series, comparaison.noms, reference, compact=graphiques_compacts)
+                with profil.phase("plotly_chart"):
+                    st.plotly_chart(fig_comparaison, width="stretch", config=CONFIG, key=f"comparaison_{courbe}")
+                profil.compter("plotly", lambda: len(fig_comparaison.to_json()))
+
+# --- ÉCHÉANCIER MENSUEL (calculé seulement panneau ouvert) ---
+profil.etape("echeancier")
+panneau_echeancier = st.expander("📅 Échéancier mensuel (crédit et trésorerie)", key="panneau_echeancier", on_change="rerun")
+if panneau_echeancier.open:
+    from echeancier import FORMATS_EXPORT, SERIES, calculer_echeancier, exporter, fichier_temporaire, formats_disponibles
+    with panneau_echeancier:
+        echeancier = calculer_echeancier(cashflow_net_mensuel, taux_placement, montant_emprunte_initial, taux_credit_hors_ass, duree_restante_annees)
+        annee_echeancier = st.select_slider("Année affichée", options=list(range(1, duree_restante_annees + 1)), value=1, format_func=lambda a: f"Année {a}")
+        st.dataframe(
+            echeancier.tableau((annee_echeancier - 1) * 12, annee_echeancier * 12), hide_index=True, width="stretch",
+            column_config={nom: st.column_config.NumberColumn(nom.replace("_", " ").capitalize(), format="%.2f €") for nom in SERIES},
+        )
+        st.caption(f"Intérêts sur {duree_restante_annees} ans : {fmt(echeancier.interets.sum())} € · Patrimoine final : {fmt(echeancier.patrimoine[-1])} €")
+        for col_export, format_export in zip(st.columns(len(FORMATS_EXPORT)), FORMATS_EXPORT):
+            with col_export:
+                st.download_button(
+                    f"Exporter ({format_export.upper()})", data=lambda format_export=format_export: fichier_temporaire(lambda f: exporter(echeancier, f, format_export)),
+                    file_name=f"echeancier_patrim.{format_export}", mime=FORMATS_EXPORT[format_export][0], disabled=format_export not in formats_disponibles(),
+                )
+
+# --- ÉTUDES CLIENTS (base locale interrogée seulement panneau ouvert) ---
+profil.etape("etudes")
+panneau_etudes = st.expander("💾 Études clients : enregistrer, retrouver, partager", key="panneau_etudes", on_change="rerun")
+if panneau_etudes.open:
+    with panneau_etudes:
+        e1, e2, e3 = st.columns([2, 2, 1], vertical_alignment="bottom")
+        with e1: nom_client = st.text_input("Client", key="etude_client")
+        with e2: nom_bien = st.text_input("Bien", key="etude_bien", placeholder="Adresse ou référence")
+        with e3: enregistrer_etude = st.button("Enregistrer l'étude", width="stretch")
+        if enregistrer_etude:
+            try:
+                etudes.enregistrer(nom_client, nom_bien, parametres_etude, etudes.resultats(scenario))
+            except ValueError as exc:
+                st.error(str(exc))
+            else:
+                st.success(f"Étude enregistrée pour {nom_client.strip()}.")
+        recherche_etude = st.text_input("Rechercher", key="etude_recherche", placeholder="Début du nom du client ou du bien")
+        resultats_recherche = etudes.rechercher(recherche_etude)
+        if not resultats_recherche:
+            st.caption("Aucune étude enregistrée ne correspond.")
+        for resume in resultats_recherche:
+            r1, r2 = st.columns([5, 1], vertical_alignment="center")
+            with r1: st.text(f"{resume.client} · {resume.bien or '—'} · {resume.cree_le.replace('T', ' ')}")
+            with r2: st.button("Charger", key=f"charger_etude_{resume.id}", on_click=charger_etude, args=(resume.id,), width="stretch")
+        if st.button("🔗 Lien de partage de l'étude affichée"):
+            code_etat = etudes.encoder_etat(parametres_etude)
+            st.query_params["etat"] = code_etat
+            st.caption("L'adresse de la page contient désormais l'étude ; paramètre à ajouter à l'URL de l'application :")
+            st.code(f"?etat={code_etat}", language=None)
+
+# --- EXPORT PDF (généré seulement au clic) ---
+profil.etape("exports")
+bien_courant = dict(
+    loyer_hc=st.session_state.loyer_hc, provision=prov_mensuelle, taux_gestion=taux_gestion, gli=gli_active, taux_gli=taux_gli, pno=pno_active,
+    credit_mensuel=credit_mensuel_ass, capital=montant_emprunte_initial, taux_credit=taux_credit_hors_ass, duree=duree_restante_annees,
+    tf_annuelle=tf_annuelle, copro_annuelle=copro_annuelle, taux_placement=taux_placement,
+)
+def pdf_etude(bien):
+    from rapport import etudier, rendre_pdf  # fpdf chargé au premier téléchargement
+    return rendre_pdf(etudier(bien))
+st.write("")
+st.download_button("📄 Télécharger l'étude (PDF)", data=lambda: pdf_etude(bien_courant), file_name="etude_patrim.pdf", mime="application/pdf")
+
+# --- PORTEFEUILLE (SIMULATION EN LOT) ---
+with st.expander("📂 Simulation d'un portefeuille (CSV / Parquet)"):
+    st.caption("Une ligne par bien : loyer_hc, provision, taux_gestion, gli, taux_gli, pno, credit_mensuel, capital, taux_credit, duree (+ tf_annuelle, copro_annuelle, taux_placement optionnels).")
+    fichier_portefeuille = st.file_uploader("Fichier des biens", type=["csv", "parquet"], label_visibility="collapsed")
+    if fichier_portefeuille is None:
+        for cle_travail in ("portefeuille", "rapports", "echeanciers"): abandonner_travail(cle_travail)
+    else:
+        from echeancier import FORMATS_EXPORT, TAILLE_BLOC as TAILLE_BLOC_ECHEANCIER, formats_disponibles, taches_echeancier
+        from exports import publier_export
+        from portefeuille import TAILLE_BLOC, detecter_format, ecrire_blocs_formates, taches_formatees, taches_portefeuille
+        from rapport import ecrire_zip, taches_rapports
+        # Simulation, études PDF et échéanciers dans la file de travaux : blocs de biens répartis sur les processus,
+        # mis en forme (CSV, Arrow) par le pool puis concaténés sur disque et téléchargés par le service statique
+        contenu_portefeuille, format_portefeuille = fichier_portefeuille.getvalue(), detecter_format(fichier_portefeuille)
+        nb_lignes_csv = contenu_portefeuille.count(b"\n") + (not contenu_portefeuille.endswith(b"\n")) - 1  # sans l'en-tête
+        def export_formate(format_export):
+            return lambda blocs: publier_export(lambda chemin: ecrire_blocs_formates(blocs, chemin, format_export), format_export)
+        def lien_export(cle, nom, libelle, mime):
+            url, chemin, _ = st.session_state.travaux[cle].resultat()
+            if service_statique:
+                st.markdown(f'<a href="{url}" download="{nom}">📥 {libelle}</a>', unsafe_allow_html=True)
+            else:
+                st.download_button(libelle, data=lambda: open(chemin, "rb"), file_name=nom, mime=mime, key=f"telecharger_{cle}")
+        travail_session(
+            "portefeuille", fichier_portefeuille.file_id,
+            lambda: taches_formatees(taches_portefeuille(io.BytesIO(contenu_portefeuille), format_entree=format_portefeuille), "csv"), export_formate("csv"),
+            total=-(-nb_lignes_csv // TAILLE_BLOC) if format_portefeuille == "csv" else None, libelle="Simulation du portefeuille",
+        )
+        if afficher_travail("portefeuille"):
+            _, _, nb_biens = st.session_state.travaux["portefeuille"].resultat()
+            st.success(f"{fmt(nb_biens)} biens simulés.")
+            lien_export("portefeuille", "portefeuille_patrim.csv", "Télécharger les résultats (CSV)", "text/csv")
+            if travail_lance("rapports", fichier_portefeuille.file_id) is None and st.button("Préparer une étude PDF par bien (ZIP)"):
+                travail_session(
+                    "rapports", fichier_portefeuille.file_id, lambda: taches_rapports(io.BytesIO(contenu_portefeuille), format_portefeuille),
+                    lambda rapports: publier_export(lambda chemin: ecrire_zip(rapports, chemin), "zip"),
+                    total=nb_biens, libelle="Études PDF",
+                )
+            if afficher_travail("rapports"):
+                lien_export("rapports", "etudes_patrim.zip", "Télécharger une étude PDF par bien (ZIP)", "application/zip")
+            format_echeancier = "parquet" if "parquet" in formats_disponibles() else "csv"
+            if travail_lance("echeanciers", fichier_portefeuille.file_id) is None and st.button(f"Préparer les échéanciers mensuels ({format_echeancier.upper()})"):
+                travail_session(
+                    "echeanciers", fichier_portefeuille.file_id,
+                    lambda: taches_formatees(taches_echeancier(io.BytesIO(contenu_portefeuille), format_entree=format_portefeuille), format_echeancier),
+                    export_formate(format_echeancier),
+                    total=-(-nb_biens // TAILLE_BLOC_ECHEANCIER), libelle="Échéanciers mensuels",
+                )
+            if afficher_travail("echeanciers"):
+                lien_export("echeanciers", f"echeanciers_patrim.{format_echeancier}", f"Télécharger les échéanciers mensuels ({format_echeancier.upper()})",
+                            FORMATS_EXPORT[format_echeancier][0])
+
 # --- PIED DE PAGE & PRINT ---
-st.markdown(f"<div style='text-align:center; color:#999; margin-top:20px; margin-bottom: 40px; font-size:0.8rem;'>Agence PATRIM Toulouse - Simulation Confidentielle</div>", unsafe_allow_html=True)
\ No newline at end of file
+st.markdown(f"<div style='text-align:center; color:#999; margin-top:20px; margin-bottom: 40px; font-size:0.8rem;'>Agence PATRIM Toulouse - Simulation Confidentielle</div>", unsafe_allow_html=True)
+
+# --- PROFILAGE (OPT-IN) ---
+profilage.publier(profil)
@@ -0,0 +1,150 @@
+"""Figures Plotly de PATRIM Gestion : styles partagés et gabarits réutilisés.
+
+Construire et valider une ``go.Figure`` coûte plusieurs millisecondes ; la mettre à
+jour sur place quelques dizaines de microsecondes. Chaque session garde donc ses
+gabarits (dans ``st.session_state``, jamais partagés entre sessions) et, à chaque
+rerun, seules les données et couleurs sont remplacées.
+
+Le mode compact réduit ce qui part vers le navigateur : données en float32
+(encodées en binaire base64 par Plotly), tracés linéaires sans marqueurs et
+modèle de mise en page Plotly vide (~6 Ko de moins par figure), cartes de
+sensibilité sous-échantillonnées.
+"""
+import numpy as np
+import plotly.graph_objects as go
+
+from theme import COLOR_BLEU_PATRIMOINE, COLOR_GRIS, COLOR_ROUGE, COLOR_VERT
+
+CONFIG = {'displayModeBar': False, 'scrollZoom': False}
+AXIS_STYLE = dict(showgrid=False, showline=False, zeroline=False, tickfont=dict(color='#999', size=11, family='Inter'), fixedrange=True)
+YAXIS_STYLE = dict(showgrid=True, gridcolor='rgba(0,0,0,0.05)', gridwidth=1, showline=False, zeroline=False, tickfont=dict(color='#999', size=11), tickprefix="€ ", fixedrange=True)
+LAYOUT_COMMON = dict(
+    separators=",.", paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
+    margin=dict(t=30, b=30, l=10, r=10), height=350,
+    hovermode="x unified", hoverlabel=dict(bgcolor="white", font_size=12, font_family="Inter", bordercolor="rgba(0,0,0,0.1)"),
+    xaxis=dict(**AXIS_STYLE, title="Années"), yaxis=dict(**YAXIS_STYLE),
+)
+LAYOUT_HEATMAP = dict(
+    separators=",.", paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
+    margin=dict(t=40, b=30, l=10, r=10), height=350, showlegend=False,
+    xaxis=dict(**AXIS_STYLE, title="Loyer HC (€)"), yaxis=dict(**AXIS_STYLE, title="Honoraires TTC (%)", ticksuffix=" %"),
+)
+ECHELLE_CASHFLOW = [[0, COLOR_ROUGE], [0.5, "#ffffff"], [1, COLOR_VERT]]
+ECHELLE_PATRIMOINE = [[0, COLOR_ROUGE], [0.5, "#ffffff"], [1, COLOR_BLEU_PATRIMOINE]]
+SEUIL_MARQUEURS = 30     # au-delà de ce nombre de points, les marqueurs sont omis
+PAS_CARTE_COMPACTE = 2   # mode compact : une colonne de loyer sur deux dans les cartes
+GABARIT_VIDE = go.layout.Template()
+
+# Styles propres à chaque courbe de projection : remplissage de la bande P5–P95 et sous la courbe
+COURBES = {
+    "cashflow": dict(nom="Cumul", bande="rgba(57, 57, 57, 0.08)", remplissage=None),
+    "patrimoine": dict(nom="Patrimoine", bande="rgba(52, 73, 94, 0.15)", remplissage="rgba(52, 73, 94, 0.1)"),
+}
+# Comparaison d'offres : une couleur par offre (la référence en rouge PATRIM)
+COULEURS_OFFRES = [COLOR_ROUGE, COLOR_BLEU_PATRIMOINE, COLOR_VERT, "#d4a017", "#7b4ea3", "#1f8a9e", "#c2185b", "#6d8b3c", "#8d6e63", COLOR_GRIS]
+LEGENDE_OFFRES = dict(orientation="h", yanchor="bottom", y=1.02, xanchor="left", x=0, font=dict(color=COLOR_GRIS, size=12, family="Inter"))
+
+
+def _donnees(valeurs, compact):
+    return np.asarray(valeurs, dtype=np.float32 if compact else np.float64)
+
+
+# --- COURBES DE PROJECTION ---
+def _gabarit_projection(courbe, avec_bandes, marqueurs, compact):
+    style = COURBES[courbe]
+    forme = 'linear' if compact else 'spline'
+    fig = go.Figure()
+    if avec_bandes:
+        fig.add_trace(go.Scatter(mode='lines', name='P95', line=dict(width=0, shape=forme)))
+        fig.add_trace(go.Scatter(mode='lines', name='P5', line=dict(width=0, shape=forme), fill='tonexty', fillcolor=style["bande"]))
+        fig.add_trace(go.Scatter(mode='lines', name='Médiane', line=dict(width=2, dash='dot', shape=forme)))
+    principale = go.Scatter(mode='lines+markers' if marqueurs else 'lines', name=style["nom"], line=dict(width=3, shape=forme))
+    if marqueurs:
+        principale.marker = dict(size=6, color='white', line=dict(width=2))
+    if style["remplissage"]:
+        principale.update(fill='tozeroy', fillcolor=style["remplissage"])
+    fig.add_trace(principale)
+    fig.update_layout(**LAYOUT_COMMON, showlegend=False)
+    if compact:
+        fig.update_layout(template=GABARIT_VIDE)
+    return fig
+
+
+def figure_projection(gabarits, courbe, annees, valeurs, couleur, bandes=None, compact=False):
+    """Courbe cumulée (``courbe`` : "cashflow" ou "patrimoine"), avec bande P5–P95 optionnelle.
+
+    ``gabarits`` est le dictionnaire de la session où les figures sont conservées ;
+    ``bandes`` est le tableau (P5, P50, P95) du mode risque.
+    """
+    marqueurs = not compact and len(annees) <= SEUIL_MARQUEURS
+    cle = ("projection", courbe, bandes is not None, marqueurs, compact)
+    fig = gabarits.get(cle)
+    if fig is None:
+        fig = gabarits[cle] = _gabarit_projection(courbe, bandes is not None, marqueurs, compact)
+
+    x = np.asarray(annees)
+    series = [valeurs] if bandes is None else [bandes[2], bandes[0], bandes[1], valeurs]
+    with fig.batch_update():
+        for trace, y in zip(fig.data, series):
+            trace.x, trace.y = x, _donnees(y, compact)
+        fig.data[-1].line.color = couleur
+        if marqueurs:
+            fig.data[-1].marker.line.color = couleur
+        if bandes is not None:
+            fig.data[-2].line.color = couleur
+    return fig
+
+
+# --- COMPARAISON D'OFFRES ---
+def _gabarit_comparaison(nb_offres, compact):
+    forme = 'linear' if compact else 'spline'
+    fig = go.Figure([go.Scatter(mode='lines', line=dict(width=2, shape=forme)) for _ in range(nb_offres)])
+    fig.update_layout(**LAYOUT_COMMON, showlegend=True, legend=LEGENDE_OFFRES)
+    if compact:
+        fig.update_layout(template=GABARIT_VIDE)
+    return fig
+
+
+def figure_comparaison(gabarits, courbe, annees, series, noms, reference=0, compact=False):
+    """Courbes superposées d'une même grandeur (``series`` : offres x années), l'offre de référence en gras."""
+    cle = ("comparaison", courbe, len(noms), compact)
+    fig = gabarits.get(cle)
+    if fig is None:
+        fig = gabarits[cle] = _gabarit_comparaison(len(noms), compact)
+    x = np.asarray(annees)
+    with fig.batch_update():
+        for k, (trace, y, nom) in enumerate(zip(fig.data, series, noms)):
+            couleur = COULEURS_OFFRES[(k - reference) % len(COULEURS_OFFRES)]
+            trace.x, trace.y, trace.name = x, _donnees(y, compact), nom
+            trace.line.color, trace.line.width = couleur, 3 if k == reference else 2
+    return fig
+
+
+# --- CARTES DE SENSIBILITÉ ---
+def _gabarit_carte(compact):
+    fig = go.Figure(go.Heatmap(
+        zmid=0, colorbar=dict(thickness=10, tickfont=dict(color='#999', size=11)),
+        hovertemplate="Loyer HC %{x:.0f} €<br>Honoraires %{y:.1f} %<br>%{z:,.0f} €<extra></extra>",
+    ))
+    fig.add_trace(go.Scatter(mode='markers', hoverinfo='skip', marker=dict(symbol='x', size=10, color=COLOR_GRIS)))
+    fig.update_layout(**LAYOUT_HEATMAP, title=dict(font=dict(color=COLOR_GRIS, size=14, family='Inter')))
+    if compact:
+        fig.update_layout(template=GABARIT_VIDE)
+    return fig
+
+
+def figure_carte(gabarits, nom, titre, loyers_hc, taux_gestion, z, echelle, point, compact=False):
+    """Carte de chaleur loyer HC x honoraires, avec le scénario courant (``point``) marqué d'une croix."""
+    cle = ("carte", nom, compact)
+    fig = gabarits.get(cle)
+    if fig is None:
+        fig = gabarits[cle] = _gabarit_carte(compact)
+    with fig.batch_update():
+        carte, marque = fig.data
+        colonnes = slice(None, None, PAS_CARTE_COMPACTE if compact else 1)
+        carte.x, carte.y = np.round(loyers_hc[colonnes], 0), np.round(taux_gestion, 2)
+        carte.z = _donnees(np.round(z[:, colonnes], 0), compact)
+        carte.colorscale = echelle
+        marque.x, marque.y = [point[0]], [point[1]]
+        fig.layout.title.text = titre
+    return fig
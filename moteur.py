@@ -0,0 +1,167 @@
+"""Moteur de projection PATRIM Gestion.
+
+Calcule le cashflow cumulé (placé au taux de placement s'il est positif) et le
+capital remboursé d'un crédit amortissable, mois par mois, sans boucle Python :
+toutes les fonctions acceptent des scalaires ou des tableaux NumPy et diffusent
+(broadcast) sur les dimensions de tête, la dernière dimension étant le temps.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+MOIS_PAR_AN = 12
+PNO_ANNUELLE = 80
+
+
+# --- INDICATEURS MENSUELS ---
+@dataclass(frozen=True)
+class Indicateurs:
+    """KPI mensuels d'un bien (scalaires, ou tableaux pour un portefeuille)."""
+    loyer_cc: np.ndarray
+    cout_gestion: np.ndarray
+    cout_gli: np.ndarray
+    cout_pno: np.ndarray
+    total_frais_gestion: np.ndarray
+    cashflow_brut_mensuel: np.ndarray
+    charges_proprio_mensuel: np.ndarray
+    cashflow_net_mensuel: np.ndarray
+
+
+def calculer_indicateurs(loyer_hc, provision, taux_gestion, gli_active, taux_gli, pno_active, credit_mensuel, tf_annuelle, copro_annuelle):
+    """Revenus, frais de gestion et cashflows mensuels (entrées scalaires ou tableaux)."""
+    loyer_cc = np.asarray(loyer_hc, dtype=np.float64) + np.asarray(provision, dtype=np.float64)
+    cout_gestion = loyer_cc * (np.asarray(taux_gestion, dtype=np.float64) / 100)
+    cout_gli = np.where(gli_active, loyer_cc * (np.asarray(taux_gli, dtype=np.float64) / 100), 0.0)
+    cout_pno = np.where(pno_active, PNO_ANNUELLE / MOIS_PAR_AN, 0.0)
+    total_frais_gestion = cout_gestion + cout_gli + cout_pno
+    cashflow_brut_mensuel = loyer_cc - total_frais_gestion - np.asarray(credit_mensuel, dtype=np.float64)
+    charges_proprio_mensuel = (np.asarray(tf_annuelle, dtype=np.float64) + np.asarray(copro_annuelle, dtype=np.float64)) / MOIS_PAR_AN
+    cashflow_net_mensuel = cashflow_brut_mensuel - charges_proprio_mensuel
+    # [()] : rend un scalaire NumPy pour des entrées scalaires, le tableau sinon
+    return Indicateurs(*(np.asarray(x)[()] for x in (
+        loyer_cc, cout_gestion, cout_gli, cout_pno, total_frais_gestion,
+        cashflow_brut_mensuel, charges_proprio_mensuel, cashflow_net_mensuel,
+    )))
+
+
+# --- CRÉDIT ---
+def mensualite_credit(capital, taux_annuel, nb_mois):
+    """Mensualité hors assurance d'un prêt amortissable (0 si capital, taux ou durée nul)."""
+    capital = np.asarray(capital, dtype=np.float64)
+    taux_mensuel = np.asarray(taux_annuel, dtype=np.float64) / 100 / MOIS_PAR_AN
+    nb_mois = np.asarray(nb_mois, dtype=np.float64)
+    actif = (capital > 0) & (taux_mensuel > 0) & (nb_mois > 0)
+    t = np.where(actif, taux_mensuel, 1.0)
+    n = np.where(actif, nb_mois, 1.0)
+    return np.where(actif, capital * t / (1 - (1 + t) ** (-n)), 0.0)
+
+
+def capital_rembourse_au_mois(capital, taux_annuel, duree_mois, mois):
+    """Capital remboursé cumulé à la fin du mois ``mois`` (entrées diffusées entre elles).
+
+    Forme fermée du solde restant dû : ``P(1+i)^m - M((1+i)^m - 1)/i``.
+    Au-delà de la durée du prêt, le capital reste plafonné au montant emprunté.
+    """
+    capital = np.asarray(capital, dtype=np.float64)
+    i = np.asarray(taux_annuel, dtype=np.float64) / 100 / MOIS_PAR_AN
+    m = np.asarray(mois, dtype=np.float64)
+    mensualite = mensualite_credit(capital, taux_annuel, duree_mois)
+    croissance = (1 + i) ** m
+    facteur = np.where(i > 0, (croissance - 1) / np.where(i > 0, i, 1.0), m)
+    restant_du = capital * croissance - mensualite * facteur
+    return np.where(mensualite > 0, np.clip(capital - restant_du, 0.0, capital), 0.0)
+
+
+def capital_rembourse(capital, taux_annuel, duree_mois, nb_mois):
+    """Capital remboursé cumulé à la fin de chaque mois 1..nb_mois (nouvel axe final)."""
+    return capital_rembourse_au_mois(
+        np.asarray(capital, dtype=np.float64)[..., None],
+        np.asarray(taux_annuel, dtype=np.float64)[..., None],
+        np.asarray(duree_mois, dtype=np.float64)[..., None],
+        np.arange(1, nb_mois + 1),
+    )
+
+
+# --- TRÉSORERIE ---
+def cashflow_au_mois(cashflow_net_mensuel, taux_placement, mois):
+    """Cashflow cumulé à la fin du mois ``mois`` (entrées diffusées entre elles).
+
+    Un cashflow positif est versé puis capitalisé au taux de placement annuel
+    (``c_m = (c_{m-1} + cf)(1+r)``, soit une rente à terme échu sommée en forme
+    fermée). Un cashflow négatif (effort d'épargne) s'additionne simplement.
+    """
+    cf = np.asarray(cashflow_net_mensuel, dtype=np.float64)
+    g = 1 + np.asarray(taux_placement, dtype=np.float64) / 100 / MOIS_PAR_AN
+    m = np.asarray(mois, dtype=np.float64)
+    facteur = np.where(g != 1, (g ** m - 1) / np.where(g != 1, g - 1, 1.0), m)
+    return np.where(cf > 0, cf * g * facteur, cf * m)
+
+
+def cashflow_cumule(cashflow_net_mensuel, taux_placement, nb_mois):
+    """Cashflow cumulé à la fin de chaque mois 1..nb_mois (nouvel axe final)."""
+    return cashflow_au_mois(
+        np.asarray(cashflow_net_mensuel, dtype=np.float64)[..., None],
+        np.asarray(taux_placement, dtype=np.float64)[..., None],
+        np.arange(1, nb_mois + 1),
+    )
+
+
+# --- PROJECTION ---
+@dataclass(frozen=True)
+class Projection:
+    """Séries cumulées d'une ou plusieurs simulations (dernier axe = temps)."""
+    cashflow_cumul: np.ndarray
+    capital_rembourse: np.ndarray
+    pas_mois: int = 1
+
+    @property
+    def patrimoine(self):
+        return self.cashflow_cumul + self.capital_rembourse
+
+    @property
+    def nb_points(self):
+        return self.cashflow_cumul.shape[-1]
+
+    @property
+    def axe_annees(self):
+        return np.arange(1, self.nb_points + 1) * self.pas_mois / MOIS_PAR_AN
+
+    def annuelle(self):
+        """Sous-échantillonnage en fin d'année (mois 12, 24, ...)."""
+        if self.pas_mois != 1:
+            raise ValueError("La projection est déjà agrégée")
+        fin_annee = slice(MOIS_PAR_AN - 1, None, MOIS_PAR_AN)
+        return Projection(self.cashflow_cumul[..., fin_annee], self.capital_rembourse[..., fin_annee], MOIS_PAR_AN)
+
+
+def projeter(cashflow_net_mensuel, taux_placement, capital, taux_credit, duree_annees, horizon_annees=None):
+    """Projection mensuelle du cashflow cumulé et du capital remboursé.
+
+    Le crédit est amorti sur ``duree_annees`` ; l'horizon de projection vaut par
+    défaut la plus longue durée rencontrée.
+    """
+    cf, placement, capital, taux_credit, duree_annees = np.broadcast_arrays(
+        *(np.asarray(x, dtype=np.float64) for x in (cashflow_net_mensuel, taux_placement, capital, taux_credit, duree_annees))
+    )
+    duree_mois = duree_annees * MOIS_PAR_AN
+    if horizon_annees is None:
+        nb_mois = int(duree_mois.max()) if duree_mois.size else 0
+    else:
+        nb_mois = int(horizon_annees) * MOIS_PAR_AN
+    return Projection(
+        cashflow_cumule(cf, placement, nb_mois),
+        capital_rembourse(capital, taux_credit, duree_mois, nb_mois),
+    )
+
+
+def valeurs_a_horizon(cashflow_net_mensuel, taux_placement, capital, taux_credit, duree_annees):
+    """Cashflow cumulé et capital remboursé à la fin du crédit, sans matérialiser la série mensuelle.
+
+    Toutes les entrées sont diffusées entre elles : une grille de sensibilité ou un
+    portefeuille entier se calcule en une seule évaluation.
+    """
+    duree_mois = np.asarray(duree_annees, dtype=np.float64) * MOIS_PAR_AN
+    return (
+        cashflow_au_mois(cashflow_net_mensuel, taux_placement, duree_mois),
+        capital_rembourse_au_mois(capital, taux_credit, duree_mois, duree_mois),
+    )
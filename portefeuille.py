@@ -0,0 +1,340 @@
+"""Simulation en lot d'un portefeuille de biens (CSV ou Parquet).
+
+Chaque ligne décrit un bien ; les KPI et le patrimoine à l'horizon du crédit sont
+calculés par blocs, en une seule passe vectorisée par bloc, puis écrits au fil de
+l'eau pour garder une mémoire constante quelle que soit la taille du portefeuille.
+
+Usage : python portefeuille.py biens.csv resultats.parquet [--taille-bloc 5000]
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from moteur import calculer_indicateurs, valeurs_a_horizon
+from solveur import capital_max, loyer_equilibre, taux_gestion_max
+
+TAILLE_BLOC = 5000
+DUREE_MAX_ANNEES = 50
+
+# Colonnes attendues et valeurs par défaut (celles de la barre latérale de l'app)
+COLONNES_OBLIGATOIRES = ("loyer_hc",)
+VALEURS_DEFAUT = {
+    "provision": 0.0,
+    "taux_gestion": 5.0,
+    "gli": True,
+    "taux_gli": 2.8,
+    "pno": True,
+    "credit_mensuel": 0.0,
+    "capital": 0.0,
+    "taux_credit": 0.0,
+    "duree": 20,
+    "tf_annuelle": 800.0,
+    "copro_annuelle": 400.0,
+    "taux_placement": 4.0,
+}
+COLONNES_BOOLEENNES = ("gli", "pno")
+SEPARATEURS_CSV = ",;\t|"
+VALEURS_VRAIES = {"1", "true", "vrai", "oui", "o", "yes", "y", "x"}
+
+
+# --- PRÉPARATION DES DONNÉES ---
+def _en_booleen(serie):
+    if pd.api.types.is_bool_dtype(serie):
+        return serie
+    if pd.api.types.is_numeric_dtype(serie):
+        return serie.fillna(0) != 0
+    return serie.astype(str).str.strip().str.lower().isin(VALEURS_VRAIES)
+
+
+def _verifier_finies(bloc, colonne):
+    invalides = bloc.index[~np.isfinite(bloc[colonne])]
+    if len(invalides):
+        raise ValueError(f"Bien {invalides[0]} : valeur manquante ou invalide pour {colonne}")
+
+
+def normaliser(bloc):
+    """Complète les colonnes manquantes et fixe les types (float64 / bool / int64).
+
+    Refuse (ValueError) les valeurs non finies, les durées non entières et celles hors
+    de 1..``DUREE_MAX_ANNEES`` ans, avant toute allocation proportionnelle à la durée.
+    """
+    manquantes = [c for c in COLONNES_OBLIGATOIRES if c not in bloc.columns]
+    if manquantes:
+        raise ValueError(f"Colonnes obligatoires manquantes : {', '.join(manquantes)}")
+    bloc = bloc.copy()
+    for colonne, defaut in VALEURS_DEFAUT.items():
+        if colonne not in bloc.columns:
+            bloc[colonne] = defaut
+        elif colonne in COLONNES_BOOLEENNES:
+            bloc[colonne] = _en_booleen(bloc[colonne])
+        else:
+            # float64 quel que soit le bloc : le schéma Parquet est fixé par le premier bloc écrit
+            bloc[colonne] = pd.to_numeric(bloc[colonne], errors="coerce").fillna(defaut).astype(np.float64)
+            _verifier_finies(bloc, colonne)
+    for colonne in COLONNES_OBLIGATOIRES:
+        bloc[colonne] = pd.to_numeric(bloc[colonne], errors="raise").astype(np.float64)
+        _verifier_finies(bloc, colonne)
+    if ((bloc["duree"] < 1) | (bloc["duree"] > DUREE_MAX_ANNEES)).any():
+        raise ValueError(f"La durée restante doit être comprise entre 1 et {DUREE_MAX_ANNEES} ans")
+    non_entieres = bloc.index[bloc["duree"] % 1 != 0]
+    if len(non_entieres):
+        raise ValueError(f"Bien {non_entieres[0]} : la durée restante doit être un nombre entier d'années")
+    bloc["duree"] = bloc["duree"].astype(np.int64)
+    return bloc
+
+
+# --- CALCUL VECTORISÉ ---
+def simuler_bloc(bloc):
+    """KPI et valeurs à l'horizon de chaque bien d'un bloc, en une passe vectorisée."""
+    bloc = normaliser(bloc)
+    col = {c: bloc[c].to_numpy() for c in (*COLONNES_OBLIGATOIRES, *VALEURS_DEFAUT)}
+    indicateurs = calculer_indicateurs(
+        col["loyer_hc"], col["provision"], col["taux_gestion"], col["gli"], col["taux_gli"],
+        col["pno"], col["credit_mensuel"], col["tf_annuelle"], col["copro_annuelle"],
+    )
+    cashflow_horizon, capital_horizon = valeurs_a_horizon(
+        indicateurs.cashflow_net_mensuel, col["taux_placement"], col["capital"], col["taux_credit"], col["duree"],
+    )
+
+    resultats = {
+        "loyer_cc": indicateurs.loyer_cc,
+        "total_frais_gestion": indicateurs.total_frais_gestion,
+        "cashflow_brut_mensuel": indicateurs.cashflow_brut_mensuel,
+        "cashflow_net_mensuel": indicateurs.cashflow_net_mensuel,
+        "cashflow_cumule_horizon": cashflow_horizon,
+        "capital_rembourse_horizon": capital_horizon,
+        "patrimoine_horizon": cashflow_horizon + capital_horizon,
+        # Objectifs : cashflow net nul, sans effort d'épargne
+        "loyer_hc_equilibre": loyer_equilibre(
+            col["provision"], col["taux_gestion"], col["gli"], col["taux_gli"], col["pno"],
+            col["credit_mensuel"], col["tf_annuelle"], col["copro_annuelle"],
+        ),
+        "taux_gestion_max": taux_gestion_max(
+            col["loyer_hc"], col["provision"], col["gli"], col["taux_gli"], col["pno"],
+            col["credit_mensuel"], col["tf_annuelle"], col["copro_annuelle"],
+        ),
+        "capital_max": capital_max(
+            col["loyer_hc"], col["provision"], col["taux_gestion"], col["gli"], col["taux_gli"], col["pno"],
+            col["tf_annuelle"], col["copro_annuelle"], col["taux_credit"], col["duree"],
+        ),
+    }
+    return bloc.assign(**{nom: np.asarray(valeurs, dtype=np.float64) for nom, valeurs in resultats.items()})
+
+
+# --- LECTURE / ÉCRITURE PAR BLOCS ---
+def detecter_format(source, format_fichier=None):
+    """Format imposé, sinon déduit de l'extension du chemin ou du nom de fichier (csv par défaut)."""
+    if format_fichier:
+        return format_fichier.lower()
+    nom = str(source if isinstance(source, (str, os.PathLike)) else getattr(source, "name", "")).lower()
+    if nom.endswith((".parquet", ".pq")):
+        return "parquet"
+    return "xlsx" if nom.endswith(".xlsx") else "csv"
+
+
+def _pyarrow_parquet():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise ImportError("Le format Parquet nécessite pyarrow (pip install pyarrow)") from exc
+    return pa, pq
+
+
+def detecter_separateur(source):
+    """Séparateur CSV le plus fréquent sur la ligne d'en-tête (virgule si aucun)."""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as fichier:
+            entete = fichier.readline()
+    else:
+        position = source.tell()
+        entete = source.readline()
+        source.seek(position)
+    if isinstance(entete, bytes):
+        entete = entete.decode("utf-8", errors="ignore")
+    return max(SEPARATEURS_CSV, key=entete.count)
+
+
+def lire_par_blocs(source, taille_bloc=TAILLE_BLOC, format_fichier=None):
+    """Itère sur les lignes d'un CSV ou d'un Parquet par DataFrames de ``taille_bloc`` lignes."""
+    format_fichier = detecter_format(source, format_fichier)
+    if format_fichier == "xlsx":
+        raise ValueError("Import XLSX non pris en charge : exportez le fichier en CSV")
+    if format_fichier == "parquet":
+        _, pq = _pyarrow_parquet()
+        for lot in pq.ParquetFile(source).iter_batches(batch_size=taille_bloc):
+            yield lot.to_pandas()
+    else:
+        # Séparateur détecté une fois sur l'en-tête : lecture par le moteur C, bien plus rapide que le reniflage
+        yield from pd.read_csv(source, sep=detecter_separateur(source), chunksize=taille_bloc)
+
+
+class _EcrivainParquet:
+    def __init__(self, destination):
+        self.pa, pq = _pyarrow_parquet()
+        self._pq = pq
+        self.destination = destination
+        self.writer = None
+
+    def ecrire(self, bloc):
+        if self.writer is None:
+            table = self.pa.Table.from_pandas(bloc, preserve_index=False)
+            self.writer = self._pq.ParquetWriter(self.destination, table.schema)
+        else:
+            table = self.pa.Table.from_pandas(bloc, schema=self.writer.schema, preserve_index=False)
+        self.writer.write_table(table)
+
+    def ecrire_octets(self, octets):
+        """Bloc déjà formaté par ``formater_bloc`` (flux Arrow IPC) : lu sans copie, écrit hors GIL."""
+        table = self.pa.ipc.open_stream(octets).read_all()
+        if self.writer is None:
+            self.writer = self._pq.ParquetWriter(self.destination, table.schema)
+        elif table.schema != self.writer.schema:
+            table = table.cast(self.writer.schema)
+        self.writer.write_table(table)
+
+    def fermer(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+class _EcrivainXlsx:
+    """Classeur Excel écrit ligne à ligne (mode ``constant_memory`` de xlsxwriter)."""
+    LIGNES_MAX = 1_048_576
+
+    def __init__(self, destination):
+        try:
+            import xlsxwriter
+        except ImportError as exc:
+            raise ImportError("Le format XLSX nécessite xlsxwriter (pip install xlsxwriter)") from exc
+        self.classeur = xlsxwriter.Workbook(destination, {"constant_memory": True, "in_memory": False})
+        self.feuille = self.classeur.add_worksheet()
+        self.ligne = 0
+
+    def ecrire(self, bloc):
+        if self.ligne + len(bloc) + (self.ligne == 0) > self.LIGNES_MAX:
+            raise ValueError(f"Excel est limité à {self.LIGNES_MAX} lignes : utilisez CSV ou Parquet")
+        if self.ligne == 0:
+            self.feuille.write_row(0, 0, list(bloc.columns))
+            self.ligne = 1
+        for valeurs in bloc.itertuples(index=False, name=None):
+            self.feuille.write_row(self.ligne, 0, valeurs)
+            self.ligne += 1
+
+    def fermer(self):
+        self.classeur.close()
+
+
+class _EcrivainCsv:
+    def __init__(self, destination):
+        self.proprietaire = isinstance(destination, (str, os.PathLike))
+        self.fichier = open(destination, "wb") if self.proprietaire else destination
+        self.entete = True
+
+    def ecrire(self, bloc):
+        self.ecrire_octets(formater_bloc(bloc, "csv", self.entete))
+
+    def ecrire_octets(self, octets):
+        self.fichier.write(octets)
+        self.entete = False
+
+    def fermer(self):
+        if self.proprietaire:
+            self.fichier.close()
+
+
+ECRIVAINS = {"csv": _EcrivainCsv, "parquet": _EcrivainParquet, "xlsx": _EcrivainXlsx}
+
+
+def ouvrir_ecrivain(destination, format_fichier=None):
+    """Écrivain par blocs (``ecrire(DataFrame)`` puis ``fermer()``) adapté au format de ``destination``."""
+    return ECRIVAINS[detecter_format(destination, format_fichier)](destination)
+
+
+def simuler_portefeuille(source, destination, taille_bloc=TAILLE_BLOC, format_entree=None, format_sortie=None):
+    """Simule tout un portefeuille bloc par bloc et écrit les résultats au fil de l'eau.
+
+    ``source`` et ``destination`` sont des chemins ou des objets fichier binaires.
+    Retourne le nombre de biens simulés.
+    """
+    return ecrire_resultats((simuler_bloc(bloc) for bloc in lire_par_blocs(source, taille_bloc, format_entree)), destination, format_sortie)
+
+
+def taches_portefeuille(source, taille_bloc=TAILLE_BLOC, format_entree=None):
+    """Tâches ``(simuler_bloc, bloc)`` d'un portefeuille, lues bloc par bloc (pour travaux.py)."""
+    for bloc in lire_par_blocs(source, taille_bloc, format_entree):
+        yield simuler_bloc, bloc
+
+
+def ecrire_resultats(blocs, destination, format_sortie=None):
+    """Écrit les blocs de résultats au fil de l'eau ; renvoie le nombre de biens."""
+    ecrivain = ouvrir_ecrivain(destination, format_sortie)
+    nb_biens = 0
+    try:
+        for bloc in blocs:
+            ecrivain.ecrire(bloc)
+            nb_biens += len(bloc)
+    finally:
+        ecrivain.fermer()
+    return nb_biens
+
+
+# --- BLOCS FORMATÉS DANS LE POOL ---
+# Dans l'app, mettre en forme CSV ou Arrow se fait dans les processus du pool : le thread
+# du serveur qui combine les résultats ne fait que concaténer des octets, sans tenir le GIL.
+def formater_bloc(bloc, format_fichier, entete=True):
+    """Octets d'un bloc prêts à concaténer : lignes CSV (en-tête si ``entete``) ou flux Arrow IPC pour Parquet."""
+    if format_fichier == "csv":
+        return bloc.to_csv(index=False, header=entete).encode("utf-8")
+    if format_fichier == "parquet":
+        pa, _ = _pyarrow_parquet()
+        table = pa.Table.from_pandas(bloc, preserve_index=False)
+        sortie = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sortie, table.schema) as flux:
+            flux.write_table(table)
+        return sortie.getvalue().to_pybytes()
+    raise ValueError(f"Format {format_fichier} non formatable par blocs : csv ou parquet")
+
+
+def tache_formatee(format_fichier, entete, fonction, *arguments):
+    """Tâche du pool : ``fonction(*arguments)`` puis son bloc formaté ; renvoie (octets, nombre de lignes)."""
+    bloc = fonction(*arguments)
+    return formater_bloc(bloc, format_fichier, entete), len(bloc)
+
+
+def taches_formatees(taches, format_fichier):
+    """Les ``taches`` (pour travaux.py) avec mise en forme de leur résultat ; en-tête CSV au premier bloc seulement."""
+    for k, (fonction, *arguments) in enumerate(taches):
+        yield (tache_formatee, format_fichier, k == 0, fonction, *arguments)
+
+
+def ecrire_blocs_formates(blocs, destination, format_sortie=None):
+    """Écrit au fil de l'eau les (octets, nombre de lignes) de ``tache_formatee`` ; renvoie le nombre de lignes."""
+    ecrivain = ouvrir_ecrivain(destination, format_sortie)
+    nb_lignes = 0
+    try:
+        for octets, nb in blocs:
+            ecrivain.ecrire_octets(octets)
+            nb_lignes += nb
+    finally:
+        ecrivain.fermer()
+    return nb_lignes
+
+
+# --- LIGNE DE COMMANDE ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulation PATRIM Gestion d'un portefeuille de biens.")
+    parser.add_argument("entree", help="Fichier CSV ou Parquet, une ligne par bien")
+    parser.add_argument("sortie", help="Fichier résultat (.csv, .parquet ou .xlsx)")
+    parser.add_argument("--taille-bloc", type=int, default=TAILLE_BLOC, help="Nombre de biens traités par bloc")
+    args = parser.parse_args(argv)
+    nb_biens = simuler_portefeuille(args.entree, args.sortie, args.taille_bloc)
+    print(f"{nb_biens} biens simulés -> {args.sortie}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""Profilage des reruns de gestion_app.py (mode opt-in).
+
+Activé par ``?profilage=1`` dans l'URL ou par la variable d'environnement
+``PATRIM_PROFILAGE=1``. Chaque phase du script est chronométrée, le détail est
+affiché dans un panneau repliable et un enregistrement JSON par rerun (phases,
+tailles des contenus émis, identifiant de session) est ajouté à un journal
+local à rotation. Inactif, le profilage ne coûte qu'un test par appel.
+
+Agrégation p50 / p95 par phase, toutes sessions confondues :
+    python profilage.py [logs/profilage.jsonl]
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+
+import numpy as np
+
+VARIABLE_ENV = "PATRIM_PROFILAGE"
+PARAMETRE_URL = "profilage"
+JOURNAL = os.environ.get("PATRIM_PROFILAGE_JOURNAL", os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs", "profilage.jsonl"))
+TAILLE_MAX_JOURNAL = 5 * 1024 * 1024
+NB_ARCHIVES = 5
+VALEURS_ACTIVES = {"1", "true", "oui"}
+
+_verrou = threading.Lock()
+_journal = None
+
+
+# --- JOURNAL À ROTATION ---
+def _journal_profilage():
+    """Logger écrivant une ligne JSON par rerun, créé une fois par processus."""
+    global _journal
+    with _verrou:
+        if _journal is None:
+            os.makedirs(os.path.dirname(JOURNAL), exist_ok=True)
+            gestionnaire = RotatingFileHandler(JOURNAL, maxBytes=TAILLE_MAX_JOURNAL, backupCount=NB_ARCHIVES, encoding="utf-8")
+            gestionnaire.setFormatter(logging.Formatter("%(message)s"))
+            journal = logging.getLogger("patrim.profilage")
+            journal.setLevel(logging.INFO)
+            journal.propagate = False
+            journal.addHandler(gestionnaire)
+            _journal = journal
+    return _journal
+
+
+# --- CHRONOMÉTRAGE ---
+class Profil:
+    """Chronomètre d'un rerun : étapes successives, sous-phases et tailles émises (ms / octets)."""
+
+    def __init__(self, actif, session_id=None):
+        self.actif = actif
+        self.session_id = session_id
+        self.phases = {}
+        self.octets = defaultdict(int)
+        self._debut = self._debut_etape = time.perf_counter()
+        self._etape = None
+
+    def etape(self, nom):
+        """Clôt l'étape en cours et démarre ``nom`` (découpage du script sans ré-indentation)."""
+        if not self.actif:
+            return
+        maintenant = time.perf_counter()
+        if self._etape is not None:
+            self.phases[self._etape] = self.phases.get(self._etape, 0.0) + (maintenant - self._debut_etape) * 1000
+        self._etape, self._debut_etape = nom, maintenant
+
+    @contextmanager
+    def phase(self, nom):
+        """Sous-phase imbriquée dans l'étape courante (comptée en plus, préfixée par l'étape)."""
+        if not self.actif:
+            yield
+            return
+        cle = f"{self._etape}.{nom}" if self._etape else nom
+        debut = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[cle] = self.phases.get(cle, 0.0) + (time.perf_counter() - debut) * 1000
+
+    def compter(self, nom, taille):
+        """Ajoute ``taille`` octets à la catégorie ``nom`` ; un appelable n'est évalué qu'en mode actif.
+
+        Le temps de mesure (ex. sérialisation JSON d'une figure) est retiré de l'étape courante.
+        """
+        if not self.actif:
+            return
+        debut = time.perf_counter()
+        self.octets[nom] += taille() if callable(taille) else taille
+        self._debut_etape += time.perf_counter() - debut
+
+    def terminer(self):
+        """Clôt la dernière étape et renvoie l'enregistrement du rerun (None si inactif)."""
+        if not self.actif:
+            return None
+        self.etape(None)
+        return {
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "session": self.session_id,
+            "total_ms": round((time.perf_counter() - self._debut) * 1000, 3),
+            "phases": {nom: round(duree, 3) for nom, duree in self.phases.items()},
+            "octets": dict(self.octets),
+        }
+
+
+def demarrer():
+    """Profil du rerun courant, actif si demandé par l'URL ou l'environnement."""
+    import streamlit as st
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    actif = os.environ.get(VARIABLE_ENV, "").lower() in VALEURS_ACTIVES or st.query_params.get(PARAMETRE_URL, "").lower() in VALEURS_ACTIVES
+    contexte = get_script_run_ctx() if actif else None
+    return Profil(actif, contexte.session_id if contexte else None)
+
+
+def publier(profil):
+    """Termine le profil, l'ajoute au journal et affiche le panneau de détail."""
+    enregistrement = profil.terminer()
+    if enregistrement is None:
+        return
+    _journal_profilage().info(json.dumps(enregistrement, ensure_ascii=False))
+
+    import streamlit as st
+
+    with st.expander(f"⏱️ Profilage du rerun : {enregistrement['total_ms']:.0f} ms"):
+        lignes = ["| Phase | ms | % |", "|---|---:|---:|"]
+        for nom, duree in enregistrement["phases"].items():
+            lignes.append(f"| {nom} | {duree:.1f} | {duree / enregistrement['total_ms'] * 100:.0f} |")
+        st.markdown("\n".join(lignes))
+        if enregistrement["octets"]:
+            st.markdown("\n".join(["| Contenu émis | octets |", "|---|---:|"] + [f"| {nom} | {taille:,} |" for nom, taille in enregistrement["octets"].items()]))
+        st.caption(f"Session {enregistrement['session']} · journal : {JOURNAL}")
+
+
+# --- AGRÉGATION ---
+def lire_journal(chemin=JOURNAL):
+    """Enregistrements du journal et de ses archives (chemin.1, chemin.2, ...)."""
+    enregistrements = []
+    for fichier in sorted(glob.glob(glob.escape(chemin) + "*")):
+        with open(fichier, encoding="utf-8") as f:
+            enregistrements.extend(json.loads(ligne) for ligne in f if ligne.strip())
+    return enregistrements
+
+
+def agreger(enregistrements):
+    """p50 / p95 par phase (ms) et par catégorie de contenu (octets), toutes sessions confondues."""
+    series = defaultdict(list)
+    for e in enregistrements:
+        series["total"].append(e["total_ms"])
+        for nom, duree in e["phases"].items():
+            series[nom].append(duree)
+        for nom, taille in e.get("octets", {}).items():
+            series[f"octets.{nom}"].append(taille)
+    return {
+        nom: {"n": len(valeurs), "p50": float(np.percentile(valeurs, 50)), "p95": float(np.percentile(valeurs, 95))}
+        for nom, valeurs in series.items()
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Agrège le journal de profilage (p50 / p95 par phase).")
+    parser.add_argument("journal", nargs="?", default=JOURNAL)
+    args = parser.parse_args(argv)
+    enregistrements = lire_journal(args.journal)
+    if not enregistrements:
+        parser.exit(1, f"Aucun enregistrement dans {args.journal}\n")
+    sessions = {e.get("session") for e in enregistrements}
+    print(f"{len(enregistrements)} reruns, {len(sessions)} sessions")
+    print(f"{'phase':<40} {'n':>7} {'p50':>12} {'p95':>12}")
+    for nom, stats in agreger(enregistrements).items():
+        print(f"{nom:<40} {stats['n']:>7} {stats['p50']:>12,.1f} {stats['p95']:>12,.1f}")
+
+
+if __name__ == "__main__":
+    main()
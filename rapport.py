@@ -0,0 +1,297 @@
+"""Rapport PDF « Synthèse de votre Gestion » et génération en masse pour un portefeuille.
+
+Un rapport reprend les KPI de l'app, les deux courbes de projection (rastérisées
+avec Pillow, sans navigateur) et le texte de conclusion. En masse, les biens d'un
+CSV/Parquet sont rendus sur le pool de processus partagé avec un nombre borné de
+rapports en vol, et chaque PDF est écrit dans le ZIP dès qu'il est prêt.
+
+Usage : python rapport.py biens.csv etudes.zip
+"""
+import argparse
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+import zipfile
+from collections import deque
+from functools import lru_cache
+
+from fpdf import FPDF
+
+from moteur import calculer_indicateurs, projeter
+from portefeuille import TAILLE_BLOC, lire_par_blocs, normaliser
+from theme import COLOR_BLEU_PATRIMOINE, COLOR_GRIS, COLOR_ROUGE, COLOR_VERT, fmt, fmt_dec
+
+COLONNES_NOM = ("reference", "lot", "client", "nom")
+LARGEUR_GRAPHIQUE, HAUTEUR_GRAPHIQUE = 1200, 420
+QUALITE_JPEG = 85
+
+
+# --- ÉTUDE ---
+def etudier(bien):
+    """KPI, séries annuelles et textes d'un bien (dict au format d'une ligne de portefeuille)."""
+    indicateurs = calculer_indicateurs(
+        bien["loyer_hc"], bien["provision"], bien["taux_gestion"], bien["gli"], bien["taux_gli"], bien["pno"],
+        bien["credit_mensuel"], bien["tf_annuelle"], bien["copro_annuelle"],
+    )
+    projection = projeter(indicateurs.cashflow_net_mensuel, bien["taux_placement"], bien["capital"], bien["taux_credit"], bien["duree"]).annuelle()
+    return dict(bien=bien, indicateurs=indicateurs, cashflow_cumul=projection.cashflow_cumul.tolist(), patrimoine=projection.patrimoine.tolist())
+
+
+def conclusion(etude):
+    """Les trois paragraphes de la synthèse, en texte brut (mêmes termes que l'app)."""
+    bien, ind = etude["bien"], etude["indicateurs"]
+    frais_details = [f"Honoraires: {fmt_dec(bien['taux_gestion'])}%"]
+    if bien["gli"]: frais_details.append(f"GLI: {fmt_dec(bien['taux_gli'])}%")
+    if bien["pno"]: frais_details.append("PNO: 80€/an")
+    valeur_finale = etude["patrimoine"][-1] if etude["patrimoine"] else 0
+    gain_str = "un enrichissement net estimé à" if valeur_finale > 0 else "un coût global de"
+    return [
+        f"Pour un bien générant {fmt(ind.loyer_cc)} € CC de revenus locatifs (dont {fmt(bien['provision'])}€ de provisions), "
+        f"l'agence PATRIM sécurise votre investissement avec une offre de gestion complète. "
+        f"Le coût mensuel global de nos services s'élève à {fmt(ind.total_frais_gestion)} € ({' + '.join(frais_details)}).",
+        f"En intégrant le remboursement de votre crédit ({fmt(bien['credit_mensuel'])}€) et vos charges propriétaires, "
+        f"votre opération dégage un résultat net mensuel de {fmt(ind.cashflow_net_mensuel)} €.",
+        f"Vision Patrimoniale à {int(bien['duree'])} ans : grâce à la capitalisation de votre emprunt et aux flux de trésorerie cumulés, "
+        f"cette opération représente {gain_str} {fmt(valeur_finale)} €.",
+    ]
+
+
+# --- GRAPHIQUES RASTÉRISÉS ---
+def _rgb(couleur):
+    couleur = couleur.lstrip("#")
+    return tuple(int(couleur[i:i + 2], 16) for i in (0, 2, 4))
+
+
+def graphique_jpeg(serie, couleur, chemin, remplir=False):
+    """Courbe annuelle dessinée avec Pillow (grille, remplissage optionnel), enregistrée en JPEG.
+
+    Le JPEG est embarqué tel quel par PyFPDF, là où un PNG est ré-analysé en Python
+    et coûte dix fois plus cher à encoder.
+    """
+    from PIL import Image, ImageDraw, ImageFont
+
+    image = Image.new("RGB", (LARGEUR_GRAPHIQUE, HAUTEUR_GRAPHIQUE), "white")
+    dessin = ImageDraw.Draw(image, "RGBA")
+    try:
+        police = ImageFont.load_default(size=20)
+    except TypeError:  # Pillow < 10.1 : police bitmap de taille fixe
+        police = ImageFont.load_default()
+    marge_g, marge_d, marge_h, marge_b = 130, 30, 20, 40
+    bas, haut = min(0.0, *serie), max(0.0, *serie)
+    plage = (haut - bas) or 1.0
+    largeur, hauteur = LARGEUR_GRAPHIQUE - marge_g - marge_d, HAUTEUR_GRAPHIQUE - marge_h - marge_b
+
+    def x(k): return marge_g + (k * largeur / (len(serie) - 1) if len(serie) > 1 else largeur / 2)
+    def y(v): return marge_h + (haut - v) * hauteur / plage
+
+    for k in range(5):
+        valeur = bas + plage * k / 4
+        dessin.line([(marge_g, y(valeur)), (LARGEUR_GRAPHIQUE - marge_d, y(valeur))], fill=(0, 0, 0, 20), width=2)
+        dessin.text((10, y(valeur) - 10), fmt(valeur), fill=(153, 153, 153), font=police)
+    for k in range(0, len(serie), max(1, len(serie) // 10)):
+        dessin.text((x(k) - 6, HAUTEUR_GRAPHIQUE - marge_b + 10), str(k + 1), fill=(153, 153, 153), font=police)
+
+    points = [(x(k), y(v)) for k, v in enumerate(serie)]
+    r, g, b = _rgb(couleur)
+    if remplir and len(points) > 1:
+        dessin.polygon([(points[0][0], y(0)), *points, (points[-1][0], y(0))], fill=(r, g, b, 26))
+    dessin.line(points, fill=(r, g, b), width=6, joint="curve")
+    for px, py in points:
+        dessin.ellipse([px - 6, py - 6, px + 6, py + 6], fill="white", outline=(r, g, b), width=3)
+    image.save(chemin, "JPEG", quality=QUALITE_JPEG)
+
+
+_dossier_processus = None
+
+
+@lru_cache(maxsize=None)
+def _logo_jpeg():
+    """Logo aplati sur fond blanc (PyFPDF ne gère pas la transparence), une fois par processus."""
+    global _dossier_processus
+    source = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logo.png")
+    if not os.path.exists(source):
+        return None
+    from PIL import Image
+
+    if _dossier_processus is None:
+        _dossier_processus = tempfile.mkdtemp(prefix="patrim_")
+        atexit.register(shutil.rmtree, _dossier_processus, True)
+    with Image.open(source) as logo:
+        logo = logo.convert("RGBA")
+        logo.thumbnail((600, 600))
+        fond = Image.new("RGB", logo.size, "white")
+        fond.paste(logo, mask=logo.getchannel("A"))
+    chemin = os.path.join(_dossier_processus, "logo.jpg")
+    fond.save(chemin, "JPEG", quality=QUALITE_JPEG)
+    return chemin
+
+
+# --- PDF ---
+def _texte(texte):
+    # Polices standard PDF en WinAnsi : l'euro et les guillemets typographiques passent par cp1252
+    return texte.encode("cp1252", "replace").decode("latin-1")
+
+
+def _carte_kpi(pdf, x, y, largeur, label, valeur, sous_titre, couleur):
+    pdf.set_fill_color(247, 247, 247)
+    pdf.rect(x, y, largeur, 26, "F")
+    pdf.set_fill_color(*_rgb(couleur))
+    pdf.rect(x, y, 1.2, 26, "F")
+    pdf.set_xy(x + 4, y + 3)
+    pdf.set_font("Helvetica", "B", 7)
+    pdf.set_text_color(102, 102, 102)
+    pdf.cell(largeur - 6, 4, _texte(label))
+    pdf.set_xy(x + 4, y + 9)
+    pdf.set_font("Helvetica", "B", 15)
+    pdf.set_text_color(*_rgb(couleur))
+    pdf.cell(largeur - 6, 8, _texte(valeur))
+    pdf.set_xy(x + 4, y + 19)
+    pdf.set_font("Helvetica", "", 6.5)
+    pdf.set_text_color(136, 136, 136)
+    pdf.cell(largeur - 6, 4, _texte(sous_titre))
+
+
+def rendre_pdf(etude, titre=None):
+    """PDF A4 de l'étude, renvoyé en octets."""
+    bien, ind = etude["bien"], etude["indicateurs"]
+    pdf = FPDF("P", "mm", "A4")
+    pdf.set_margins(15, 10, 15)
+    pdf.set_auto_page_break(False)
+    pdf.add_page()
+    logo = _logo_jpeg()
+    if logo:
+        pdf.image(logo, 150, 10, 45)
+    pdf.set_xy(15, 14)
+    pdf.set_font("Helvetica", "B", 20)
+    pdf.set_text_color(*_rgb(COLOR_GRIS))
+    pdf.cell(0, 10, _texte("Étude de Gestion Locative"))
+    pdf.set_xy(15, 24)
+    pdf.set_font("Helvetica", "", 9)
+    pdf.set_text_color(136, 136, 136)
+    pdf.cell(0, 5, _texte(titre or f"Analyse pour un loyer de {fmt(bien['loyer_hc'])} € HC"))
+
+    couleur_cf = COLOR_VERT if ind.cashflow_net_mensuel >= 0 else COLOR_ROUGE
+    taux_effectif = f"{ind.total_frais_gestion / ind.loyer_cc * 100:.1f}" if ind.loyer_cc else "–"
+    cartes = (
+        ("Loyer Charges Comprises", f"{fmt(ind.loyer_cc)} €", f"Dont {fmt(bien['provision'])}€ provisions", COLOR_ROUGE),
+        ("Total Frais Gestion", f"{fmt(ind.total_frais_gestion)} €", f"Taux eff: {taux_effectif}% TTC", COLOR_GRIS),
+        ("Reste à Vivre (Brut)", f"{fmt(ind.cashflow_brut_mensuel)} €", "Avant TF et Charges Proprio", couleur_cf),
+        ("Cashflow Net Réel", f"{fmt(ind.cashflow_net_mensuel)} €", "Cashflow Positif" if ind.cashflow_net_mensuel >= 0 else "Effort d'épargne", couleur_cf),
+    )
+    for k, carte in enumerate(cartes):
+        _carte_kpi(pdf, 15 + k * 46, 36, 42, *carte)
+
+    with tempfile.TemporaryDirectory(prefix="patrim_") as dossier:
+        graphiques = (
+            ("Flux de Trésorerie (Cashflow)", etude["cashflow_cumul"], couleur_cf, False, 68),
+            ("Enrichissement Latent (Patrimoine)", etude["patrimoine"], COLOR_BLEU_PATRIMOINE, True, 141),
+        )
+        for k, (titre_graphique, serie, couleur, remplir, y) in enumerate(graphiques):
+            chemin = os.path.join(dossier, f"graphique_{k}.jpg")
+            graphique_jpeg(serie, couleur, chemin, remplir)
+            pdf.set_xy(15, y)
+            pdf.set_font("Helvetica", "B", 10)
+            pdf.set_text_color(*_rgb(COLOR_GRIS))
+            pdf.cell(0, 6, _texte(titre_graphique))
+            pdf.image(chemin, 15, y + 7, 180, 180 * HAUTEUR_GRAPHIQUE / LARGEUR_GRAPHIQUE)
+
+    pdf.set_xy(15, 216)
+    pdf.set_font("Helvetica", "B", 14)
+    pdf.set_text_color(*_rgb(COLOR_GRIS))
+    pdf.cell(0, 8, _texte("Synthèse de votre Gestion"))
+    pdf.set_xy(15, 226)
+    pdf.set_font("Helvetica", "", 9.5)
+    pdf.set_text_color(85, 85, 85)
+    for paragraphe in conclusion(etude):
+        pdf.multi_cell(180, 5, _texte(paragraphe))
+        pdf.ln(3)
+
+    pdf.set_xy(15, 282)
+    pdf.set_font("Helvetica", "", 7)
+    pdf.set_text_color(153, 153, 153)
+    pdf.cell(180, 5, _texte("Agence PATRIM Toulouse - Simulation Confidentielle"), align="C")
+    return pdf.output(dest="S").encode("latin-1")
+
+
+# --- GÉNÉRATION EN MASSE ---
+def _nom_fichier(bien, indice):
+    for colonne in COLONNES_NOM:
+        valeur = bien.get(colonne)
+        if valeur is not None and str(valeur).strip():
+            nom = "".join(c if c.isalnum() or c in "-_" else "_" for c in str(valeur).strip())
+            return f"etude_{indice:05d}_{nom}.pdf"
+    return f"etude_{indice:05d}.pdf"
+
+
+def rendre_bien(bien, indice):
+    """Tâche exécutée dans un processus du pool : (nom du fichier, octets du PDF)."""
+    return _nom_fichier(bien, indice), rendre_pdf(etudier(bien))
+
+
+def _biens(source, format_entree=None):
+    indice = 0
+    for bloc in lire_par_blocs(source, TAILLE_BLOC, format_entree):
+        for bien in normaliser(bloc).to_dict("records"):
+            indice += 1
+            yield bien, indice
+
+
+def taches_rapports(source, format_entree=None):
+    """Tâches ``(rendre_bien, bien, indice)`` d'un portefeuille, lues bloc par bloc (pour travaux.py)."""
+    for bien, indice in _biens(source, format_entree):
+        yield rendre_bien, bien, indice
+
+
+def ecrire_zip(rapports, destination):
+    """Écrit les (nom, octets) de ``rapports`` dans un ZIP au fil de l'eau ; renvoie le nombre de PDF."""
+    nb_rapports = 0
+    with zipfile.ZipFile(destination, "w", zipfile.ZIP_DEFLATED) as archive:
+        for nom, contenu in rapports:
+            archive.writestr(nom, contenu)
+            nb_rapports += 1
+    return nb_rapports
+
+
+def rapports_zip(source, destination, pool=None, en_vol=None, format_entree=None):
+    """Rend un PDF par bien et les écrit dans un ZIP au fil de l'eau ; renvoie le nombre de PDF.
+
+    Au plus ``en_vol`` rendus sont soumis simultanément (2 par processus par défaut) :
+    la mémoire reste bornée quelle que soit la taille du portefeuille.
+    """
+    if pool is None:
+        from travaux import executeur
+        pool = executeur()
+    en_vol = en_vol or 2 * (os.cpu_count() or 1)
+
+    def rapports():
+        futures = deque()
+        try:
+            for fonction, *arguments in taches_rapports(source, format_entree):
+                futures.append(pool.submit(fonction, *arguments))
+                if len(futures) >= en_vol:
+                    yield futures.popleft().result()
+            while futures:
+                yield futures.popleft().result()
+        finally:
+            # Un rendu en échec (ou une écriture du ZIP interrompue) : les rendus en attente sont retirés du pool
+            for future in futures:
+                future.cancel()
+
+    return ecrire_zip(rapports(), destination)
+
+
+# --- LIGNE DE COMMANDE ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Études PDF PATRIM Gestion pour un portefeuille de biens.")
+    parser.add_argument("entree", help="Fichier CSV ou Parquet, une ligne par bien")
+    parser.add_argument("sortie", help="Archive ZIP des études")
+    args = parser.parse_args(argv)
+    nb_rapports = rapports_zip(args.entree, args.sortie)
+    print(f"{nb_rapports} études générées -> {args.sortie}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""Mode risque : projection Monte Carlo du cashflow cumulé et du patrimoine.
+
+Chaque chemin tire, mois par mois, la vacance locative, les impayés (couverts
+par la GLI ou perdus), l'inflation annuelle des charges propriétaire et le
+rendement du placement de la trésorerie. Les chemins sont simulés par lots
+vectorisés, chaque lot ayant sa propre graine dérivée de la graine principale :
+le résultat ne dépend ni du nombre de processus ni de l'ordre d'exécution.
+
+``simuler_risque`` attend la fin de tous les lots : l'app ne l'appelle que pour
+un seul lot et soumet les simulations plus longues à la file de travaux
+(``lots_risque``, ``simuler_lot`` puis ``combiner_risque``, cf. travaux.py).
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from moteur import MOIS_PAR_AN, PNO_ANNUELLE, capital_rembourse
+from travaux import executeur
+
+TAILLE_LOT = 4000
+PERCENTILES = (5, 50, 95)
+
+
+@dataclass(frozen=True)
+class HypothesesRisque:
+    vacance_mois_par_an: float = 0.5      # durée moyenne de vacance par an
+    proba_impaye: float = 0.02            # probabilité mensuelle d'un loyer impayé
+    inflation_charges: float = 2.0        # % / an, moyenne
+    volatilite_inflation: float = 1.0     # % / an, écart-type
+    volatilite_placement: float = 8.0     # % / an, écart-type du rendement
+
+
+@dataclass(frozen=True)
+class ResultatRisque:
+    """Percentiles annuels (lignes = PERCENTILES, colonnes = années)."""
+    percentiles: tuple
+    cashflow_cumul: np.ndarray
+    patrimoine: np.ndarray
+    proba_cashflow_negatif: float
+    nb_chemins: int
+
+
+# --- SIMULATION D'UN LOT ---
+def simuler_lot(bien, hypotheses, nb_chemins, graine):
+    """Cashflow cumulé en fin d'année pour ``nb_chemins`` chemins, tableau (nb_chemins, nb_annees)."""
+    rng = np.random.default_rng(graine)
+    nb_annees = int(bien["duree_annees"])
+    nb_mois = nb_annees * MOIS_PAR_AN
+
+    # Encaissement : bien occupé et loyer payé (ou impayé pris en charge par la GLI)
+    occupe = rng.random((nb_chemins, nb_mois)) >= hypotheses.vacance_mois_par_an / MOIS_PAR_AN
+    paye = rng.random((nb_chemins, nb_mois)) >= hypotheses.proba_impaye
+    encaisse = occupe & (paye | bien["gli_active"])
+    taux_frais = (bien["taux_gestion"] + (bien["taux_gli"] if bien["gli_active"] else 0)) / 100
+    cout_pno = PNO_ANNUELLE / MOIS_PAR_AN if bien["pno_active"] else 0.0
+    cashflow = np.where(encaisse, bien["loyer_cc"] * (1 - taux_frais), 0.0)
+    cashflow -= cout_pno + bien["credit_mensuel"]
+
+    # Charges propriétaire indexées chaque année sur une inflation aléatoire
+    inflation = rng.normal(hypotheses.inflation_charges, hypotheses.volatilite_inflation, (nb_chemins, nb_annees - 1)) / 100
+    indexation = np.cumprod(np.hstack([np.ones((nb_chemins, 1)), 1 + inflation]), axis=1)
+    cashflow -= bien["charges_proprio_mensuel"] * np.repeat(indexation, MOIS_PAR_AN, axis=1)
+
+    # Trésorerie positive placée à un rendement mensuel aléatoire
+    rendements = 1 + rng.normal(
+        bien["taux_placement"] / MOIS_PAR_AN, hypotheses.volatilite_placement / np.sqrt(MOIS_PAR_AN), (nb_chemins, nb_mois),
+    ) / 100
+    cumul = np.zeros(nb_chemins)
+    annuel = np.empty((nb_chemins, nb_annees))
+    for m in range(nb_mois):
+        cumul += cashflow[:, m]
+        np.multiply(cumul, rendements[:, m], out=cumul, where=cumul > 0)
+        if (m + 1) % MOIS_PAR_AN == 0:
+            annuel[:, m // MOIS_PAR_AN] = cumul
+    return annuel
+
+
+# --- SIMULATION COMPLÈTE ---
+def lots_risque(nb_chemins, graine=0):
+    """(taille, graine) de chaque lot de chemins, à passer à ``simuler_lot``."""
+    tailles = [TAILLE_LOT] * (nb_chemins // TAILLE_LOT)
+    if nb_chemins % TAILLE_LOT:
+        tailles.append(nb_chemins % TAILLE_LOT)
+    return list(zip(tailles, np.random.SeedSequence(graine).spawn(len(tailles))))
+
+
+def simuler_risque(bien, hypotheses=HypothesesRisque(), nb_chemins=10_000, graine=0, pool=None):
+    """Simule ``nb_chemins`` chemins et renvoie les bandes de percentiles annuelles.
+
+    ``bien`` reprend les paramètres de la barre latérale : loyer_cc, taux_gestion,
+    gli_active, taux_gli, pno_active, credit_mensuel, charges_proprio_mensuel,
+    taux_placement, capital, taux_credit, duree_annees. Au-delà d'un lot, les lots
+    sont répartis sur ``pool`` (par défaut le pool partagé de travaux.py) et
+    l'appel bloque jusqu'au dernier : réservé aux scripts, pas au thread d'une session.
+    """
+    lots = lots_risque(nb_chemins, graine)
+    if len(lots) == 1:
+        return combiner_risque(bien, [simuler_lot(bien, hypotheses, *lots[0])])
+    pool = pool or executeur()
+    tailles, graines = zip(*lots)
+    return combiner_risque(bien, pool.map(simuler_lot, [bien] * len(lots), [hypotheses] * len(lots), tailles, graines))
+
+
+def combiner_risque(bien, lots):
+    """Bandes de percentiles à partir des cashflows cumulés annuels de chaque lot (itérable)."""
+    cashflow = np.vstack(list(lots))
+    nb_chemins = cashflow.shape[0]
+
+    capital_annuel = capital_rembourse(bien["capital"], bien["taux_credit"], bien["duree_annees"] * MOIS_PAR_AN, cashflow.shape[1] * MOIS_PAR_AN)
+    capital_annuel = capital_annuel[MOIS_PAR_AN - 1::MOIS_PAR_AN]
+    bandes_cashflow = np.percentile(cashflow, PERCENTILES, axis=0)
+    return ResultatRisque(
+        percentiles=PERCENTILES,
+        cashflow_cumul=bandes_cashflow,
+        patrimoine=bandes_cashflow + capital_annuel,
+        proba_cashflow_negatif=float((cashflow[:, -1] < 0).mean()),
+        nb_chemins=nb_chemins,
+    )
@@ -0,0 +1,61 @@
+"""Grille de sensibilité loyer HC × honoraires de gestion (× taux GLI).
+
+Toute la grille est évaluée en une seule opération diffusée : les axes sont
+placés sur des dimensions distinctes (GLI, honoraires, loyer) et le moteur
+calcule directement les valeurs à l'horizon, sans série mensuelle.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from moteur import calculer_indicateurs, valeurs_a_horizon
+
+NB_LOYERS = 200
+NB_TAUX_GESTION = 50
+TAUX_GESTION_MIN, TAUX_GESTION_MAX = 4.0, 10.0
+TAUX_GLI = (2.5, 2.6, 2.7, 2.8)
+
+
+@dataclass(frozen=True)
+class GrilleSensibilite:
+    """Résultats indexés par [gli, taux_gestion, loyer_hc]."""
+    loyers_hc: np.ndarray
+    taux_gestion: np.ndarray
+    taux_gli: np.ndarray
+    cashflow_net_mensuel: np.ndarray
+    patrimoine_horizon: np.ndarray
+
+    def indice_gli(self, taux_gli):
+        return int(np.abs(self.taux_gli - taux_gli).argmin())
+
+
+def axe_loyers(loyer_hc, nb_points=NB_LOYERS, amplitude=0.5):
+    """Loyers HC à ±``amplitude`` autour du loyer courant (plage d'au moins 500 €)."""
+    bas = max(loyer_hc * (1 - amplitude), 0.0)
+    haut = max(loyer_hc * (1 + amplitude), bas + 500.0)
+    return np.linspace(bas, haut, nb_points)
+
+
+def axe_taux_gestion(nb_points=NB_TAUX_GESTION):
+    return np.linspace(TAUX_GESTION_MIN, TAUX_GESTION_MAX, nb_points)
+
+
+def calculer_grille(loyers_hc, taux_gestion, provision, gli_active, taux_gli, pno_active, credit_mensuel,
+                    tf_annuelle, copro_annuelle, taux_placement, capital, taux_credit, duree_annees):
+    """Cashflow net mensuel et patrimoine à l'horizon sur toute la grille, en une passe."""
+    loyers = np.asarray(loyers_hc, dtype=np.float64)[None, None, :]
+    gestion = np.asarray(taux_gestion, dtype=np.float64)[None, :, None]
+    gli = np.atleast_1d(np.asarray(taux_gli, dtype=np.float64))
+    indicateurs = calculer_indicateurs(
+        loyers, provision, gestion, gli_active, gli[:, None, None], pno_active, credit_mensuel, tf_annuelle, copro_annuelle,
+    )
+    cashflow_horizon, capital_horizon = valeurs_a_horizon(
+        indicateurs.cashflow_net_mensuel, taux_placement, capital, taux_credit, duree_annees,
+    )
+    return GrilleSensibilite(
+        loyers_hc=np.asarray(loyers_hc, dtype=np.float64),
+        taux_gestion=np.asarray(taux_gestion, dtype=np.float64),
+        taux_gli=gli,
+        cashflow_net_mensuel=indicateurs.cashflow_net_mensuel,
+        patrimoine_horizon=cashflow_horizon + capital_horizon,
+    )
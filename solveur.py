@@ -0,0 +1,109 @@
+"""Recherche d'objectifs (goal seek) sur le moteur PATRIM Gestion.
+
+Le cashflow net mensuel est affine en loyer et en taux d'honoraires, et la
+mensualité d'un prêt s'inverse en capital : ces objectifs ont une forme fermée.
+Le taux de crédit maximal n'en a pas ; il est obtenu par une bissection
+vectorisée. Toutes les fonctions diffusent (broadcast) scalaires et tableaux et
+renvoient NaN lorsque l'objectif est inatteignable.
+"""
+import numpy as np
+
+from moteur import MOIS_PAR_AN, PNO_ANNUELLE, mensualite_credit
+
+ITERATIONS_BISSECTION = 50   # intervalle divisé par 2^50 : précision bien sous le centime
+TAUX_CREDIT_PLAFOND = 20.0
+
+
+# --- BRIQUES ---
+def _f(x):
+    return np.asarray(x, dtype=np.float64)
+
+
+def _part_frais_variables(taux_gestion, gli_active, taux_gli):
+    """Part du loyer CC prélevée par les honoraires et la GLI."""
+    return _f(taux_gestion) / 100 + np.where(gli_active, _f(taux_gli) / 100, 0.0)
+
+
+def _charges_fixes(pno_active, tf_annuelle, copro_annuelle):
+    """Charges mensuelles indépendantes du loyer (PNO, taxe foncière, copropriété)."""
+    return np.where(pno_active, PNO_ANNUELLE / MOIS_PAR_AN, 0.0) + (_f(tf_annuelle) + _f(copro_annuelle)) / MOIS_PAR_AN
+
+
+def _resultat(x):
+    return np.asarray(x)[()]
+
+
+def bissection(fonction, bas, haut, iterations=ITERATIONS_BISSECTION):
+    """Plus grand ``x`` de [bas, haut] tel que ``fonction(x) >= 0``, ``fonction`` décroissante.
+
+    Chaque itération évalue ``fonction`` une seule fois sur tout le tableau ; NaN
+    là où ``fonction(bas) < 0`` (objectif inatteignable même au plancher).
+    """
+    bas, haut = np.broadcast_arrays(_f(bas), _f(haut))
+    bas, haut = bas.copy(), haut.copy()
+    atteignable = fonction(bas) >= 0
+    sature = fonction(haut) >= 0
+    for _ in range(iterations):
+        milieu = (bas + haut) / 2
+        ok = fonction(milieu) >= 0
+        bas = np.where(ok, milieu, bas)
+        haut = np.where(ok, haut, milieu)
+    return _resultat(np.where(atteignable, np.where(sature, haut, bas), np.nan))
+
+
+# --- OBJECTIFS ---
+def loyer_equilibre(provision, taux_gestion, gli_active, taux_gli, pno_active, credit_mensuel, tf_annuelle, copro_annuelle, cashflow_cible=0.0):
+    """Loyer HC minimal pour un cashflow net mensuel au moins égal à ``cashflow_cible``."""
+    marge = 1 - _part_frais_variables(taux_gestion, gli_active, taux_gli)
+    besoin = _f(cashflow_cible) + _charges_fixes(pno_active, tf_annuelle, copro_annuelle) + _f(credit_mensuel)
+    loyer_cc = besoin / np.where(marge > 0, marge, 1.0)
+    return _resultat(np.where(marge > 0, np.maximum(loyer_cc - _f(provision), 0.0), np.nan))
+
+
+def taux_gestion_max(loyer_hc, provision, gli_active, taux_gli, pno_active, credit_mensuel, tf_annuelle, copro_annuelle, cashflow_cible=0.0):
+    """Taux d'honoraires TTC maximal (%) préservant un cashflow net mensuel de ``cashflow_cible``."""
+    loyer_cc = _f(loyer_hc) + _f(provision)
+    besoin = _f(cashflow_cible) + _charges_fixes(pno_active, tf_annuelle, copro_annuelle) + _f(credit_mensuel)
+    part = 1 - _part_frais_variables(0.0, gli_active, taux_gli) - besoin / np.where(loyer_cc > 0, loyer_cc, 1.0)
+    return _resultat(np.where((loyer_cc > 0) & (part >= 0), part * 100, np.nan))
+
+
+def mensualite_max(loyer_hc, provision, taux_gestion, gli_active, taux_gli, pno_active, tf_annuelle, copro_annuelle, effort_max=0.0):
+    """Mensualité de crédit maximale pour un effort d'épargne mensuel d'au plus ``effort_max``."""
+    loyer_cc = _f(loyer_hc) + _f(provision)
+    disponible = loyer_cc * (1 - _part_frais_variables(taux_gestion, gli_active, taux_gli)) - _charges_fixes(pno_active, tf_annuelle, copro_annuelle)
+    mensualite = disponible + _f(effort_max)
+    return _resultat(np.where(mensualite >= 0, mensualite, np.nan))
+
+
+def capital_max(loyer_hc, provision, taux_gestion, gli_active, taux_gli, pno_active, tf_annuelle, copro_annuelle, taux_credit, duree_annees, effort_max=0.0):
+    """Capital empruntable maximal pour un effort d'épargne mensuel d'au plus ``effort_max``.
+
+    Inversion de l'annuité : ``P = M (1 - (1+i)^-n) / i`` (``M n`` à taux nul).
+    La mensualité est ici hors assurance.
+    """
+    mensualite = _f(mensualite_max(loyer_hc, provision, taux_gestion, gli_active, taux_gli, pno_active, tf_annuelle, copro_annuelle, effort_max))
+    i = _f(taux_credit) / 100 / MOIS_PAR_AN
+    n = _f(duree_annees) * MOIS_PAR_AN
+    facteur = np.where(i > 0, (1 - (1 + i) ** (-n)) / np.where(i > 0, i, 1.0), n)
+    return _resultat(mensualite * facteur)
+
+
+def taux_credit_max(capital, duree_annees, loyer_hc, provision, taux_gestion, gli_active, taux_gli, pno_active, tf_annuelle, copro_annuelle,
+                    effort_max=0.0, plafond=TAUX_CREDIT_PLAFOND):
+    """Taux de crédit annuel maximal (%) finançant ``capital`` pour un effort d'au plus ``effort_max``.
+
+    Pas de forme fermée : bissection vectorisée sur [0, ``plafond``].
+    """
+    budget = _f(mensualite_max(loyer_hc, provision, taux_gestion, gli_active, taux_gli, pno_active, tf_annuelle, copro_annuelle, effort_max))
+    capital, nb_mois = _f(capital), _f(duree_annees) * MOIS_PAR_AN
+    # Taux nul : mensualite_credit renvoie 0, la mensualité réelle vaut capital / n
+    sans_interet = np.where(nb_mois > 0, capital / np.where(nb_mois > 0, nb_mois, 1.0), capital)
+
+    def marge(taux):
+        # Taux infimes : (1+t)^-n arrondi à 1, mensualité infinie, donc écartés comme trop chers
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mensualite = np.where(taux > 0, mensualite_credit(capital, taux, nb_mois), sans_interet)
+        return np.nan_to_num(budget, nan=-np.inf) - mensualite
+
+    return bissection(marge, np.zeros(np.broadcast(budget, capital, nb_mois).shape), plafond)
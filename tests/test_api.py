@@ -0,0 +1,112 @@
+import math
+
+import numpy as np
+import pytest
+
+from api import TAILLE_MAX_LOT, app, colonnes, simuler_biens
+from moteur import calculer_indicateurs, projeter
+
+
+def test_simulation_d_un_bien():
+    [resultat] = simuler_biens([{"loyer_hc": 600, "provision": 50, "duree": 20}])
+    assert resultat["kpis"]["loyer_cc"] == 650
+    assert resultat["series"]["annees"] == list(range(1, 21))
+    assert resultat["patrimoine_horizon"] == resultat["series"]["patrimoine"][-1]
+
+
+@pytest.mark.parametrize("duree", [0, 51, 1e9, 1e30, math.inf, math.nan])
+def test_duree_hors_limites_refusee(duree):
+    with pytest.raises(ValueError, match="duree|durée"):
+        colonnes([{"loyer_hc": 600, "duree": duree}])
+
+
+@pytest.mark.parametrize("bien", [
+    {"loyer_hc": math.inf},
+    {"loyer_hc": "nan"},
+    {"loyer_hc": 600, "capital": math.inf},
+    {"loyer_hc": 600, "taux_placement": "-inf"},
+])
+def test_valeurs_non_finies_refusees(bien):
+    with pytest.raises(ValueError, match="Bien 0"):
+        colonnes([bien])
+
+
+def test_valeur_illisible_remplacee_par_le_defaut():
+    assert colonnes([{"loyer_hc": 600, "provision": "?"}])["provision"][0] == 0.0
+
+
+@pytest.mark.parametrize("duree", [1.5, "12.25"])
+def test_duree_non_entiere_refusee(duree):
+    with pytest.raises(ValueError, match="Bien 0 .*entier"):
+        colonnes([{"loyer_hc": 600, "duree": duree}])
+
+
+def test_series_aux_fins_d_annee_du_moteur():
+    biens = [{"loyer_hc": 600 + 40 * k, "capital": 80_000 + 5000 * k, "taux_credit": 1 + k / 2, "duree": 5 + 7 * k} for k in range(4)]
+    bloc = colonnes(biens)
+    indicateurs = calculer_indicateurs(bloc["loyer_hc"], bloc["provision"], bloc["taux_gestion"], bloc["gli"], bloc["taux_gli"], bloc["pno"],
+                                       bloc["credit_mensuel"], bloc["tf_annuelle"], bloc["copro_annuelle"])
+    projection = projeter(indicateurs.cashflow_net_mensuel, bloc["taux_placement"], bloc["capital"], bloc["taux_credit"], bloc["duree"]).annuelle()
+    for k, resultat in enumerate(simuler_biens(biens)):
+        duree = biens[k]["duree"]
+        assert resultat["series"]["cashflow_cumul"] == np.round(projection.cashflow_cumul[k, :duree], 2).tolist()
+        assert resultat["series"]["patrimoine"] == np.round(projection.patrimoine[k, :duree], 2).tolist()
+
+
+# --- ROUTES HTTP ---
+@pytest.fixture
+def client():
+    try:
+        from starlette.testclient import TestClient
+    except RuntimeError as exc:  # ni httpx2 ni httpx installé
+        pytest.skip(str(exc))
+
+    with TestClient(app) as client:
+        yield client
+
+
+def test_route_sante(client):
+    reponse = client.get("/sante")
+    assert reponse.status_code == 200 and reponse.json() == {"statut": "ok"}
+
+
+def test_route_simulation(client):
+    reponse = client.post("/simulation", json={"loyer_hc": 600, "provision": 50, "duree": 20})
+    assert reponse.status_code == 200
+    assert reponse.json() == simuler_biens([{"loyer_hc": 600, "provision": 50, "duree": 20}])[0]
+
+
+def test_route_simulations(client):
+    biens = [{"loyer_hc": 600 + k, "duree": 10} for k in range(3)]
+    reponse = client.post("/simulations", json={"biens": biens})
+    assert reponse.status_code == 200 and len(reponse.json()["resultats"]) == 3
+    assert client.post("/simulations", json={"biens": []}).json() == {"resultats": []}
+
+
+@pytest.mark.parametrize("route, corps, statut, message", [
+    ("/simulation", [1, 2], 400, "objet JSON"),
+    ("/simulation", {"provision": 50}, 400, "loyer_hc"),
+    ("/simulation", {"loyer_hc": 600, "duree": 1.5}, 400, "entier"),
+    ("/simulation", {"loyer_hc": 600, "duree": 80}, 400, "durée"),
+    ("/simulations", {"biens": {"loyer_hc": 600}}, 400, "biens"),
+    ("/simulations", {"biens": [{"loyer_hc": 600}, {"loyer_hc": "abc"}]}, 400, "Bien 1"),
+    ("/simulations", {"biens": [{"loyer_hc": 600}] * (TAILLE_MAX_LOT + 1)}, 413, "Au plus"),
+    ("/echeanciers", {"biens": []}, 400, "biens"),
+    ("/echeanciers", {"biens": [{"loyer_hc": 600, "capital": "-inf"}]}, 400, "non finie"),
+])
+def test_routes_refusent_les_entrees_invalides(client, route, corps, statut, message):
+    reponse = client.post(route, json=corps)
+    assert reponse.status_code == statut
+    assert message in reponse.json()["erreur"]
+
+
+def test_json_illisible(client):
+    reponse = client.post("/simulation", content=b"{pas du json", headers={"content-type": "application/json"})
+    assert reponse.status_code == 400
+
+
+def test_route_echeanciers(client):
+    reponse = client.post("/echeanciers", json={"biens": [{"loyer_hc": 600, "capital": 50_000, "taux_credit": 3, "duree": 2}] * 2})
+    assert reponse.status_code == 200 and reponse.headers["content-type"].startswith("text/csv")
+    lignes = reponse.text.splitlines()
+    assert lignes[0].startswith("bien,mois,") and len(lignes) == 1 + 2 * 24
@@ -0,0 +1,87 @@
+import json
+import os
+
+import pytest
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from streamlit.testing.v1 import AppTest
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "gestion_app.py")
+
+
+@pytest.fixture
+def app():
+    at = AppTest.from_file(APP, default_timeout=60)
+    at.run()
+    assert not at.exception
+    return at
+
+
+def case(at, debut_label):
+    return next(c for c in at.checkbox if c.label.startswith(debut_label))
+
+
+def envoyer_loyer_live(at, loyer, envoi):
+    # Valeur envoyée par le navigateur au relâchement du curseur (AppTest ne pilote pas les composants)
+    [composant] = [e for e in at._tree if getattr(e, "type", None) == "component_instance"]
+    etats = at._tree.get_widget_states()
+    etats.widgets.append(WidgetState(id=composant.proto.id, json_value=json.dumps(dict(loyer=loyer, envoi=envoi))))
+    at._run(widget_state=etats)
+    assert not at.exception
+
+
+def test_loyer_live_synchronise_au_relachement(app):
+    case(app, "⚡ Calcul instantané").check().run()
+    envoyer_loyer_live(app, 1230, 1)
+    assert app.session_state["loyer_hc"] == app.session_state["s_loyer"] == 1230
+
+
+def test_loyer_live_renvoye_apres_la_barre_laterale(app):
+    case(app, "⚡ Calcul instantané").check().run()
+    envoyer_loyer_live(app, 1230, 1)
+    app.slider(key="s_loyer").set_value(700).run()
+    assert app.session_state["loyer_hc"] == 700
+    envoyer_loyer_live(app, 1230, 2)
+    assert app.session_state["loyer_hc"] == app.session_state["s_loyer"] == 1230
+
+
+def ouvrir(at, cle_panneau):
+    # Les expanders à clé sont des widgets que AppTest ne sait pas ouvrir
+    [panneau] = [e for e in at.expander if e.key == cle_panneau]
+    etats = at._tree.get_widget_states()
+    etats.widgets.append(WidgetState(id=panneau.proto.id, bool_value=True))
+    at._run(widget_state=etats)
+    return at
+
+
+def test_comparaison_sans_credit(app):
+    # Sans crédit, cashflow et patrimoine donnent des figures identiques
+    case(app, "Crédit en cours").uncheck().run()
+    ouvrir(app, "panneau_comparaison")
+    assert not app.exception
+    identifiants = [graphique.proto.id for graphique in app.get("plotly_chart")]
+    assert sum("comparaison_" in identifiant for identifiant in identifiants) == 2
+
+
+def lancer_avec_etat(code):
+    at = AppTest.from_file(APP, default_timeout=60)
+    at.query_params["etat"] = code
+    return at.run()
+
+
+def test_lien_de_partage_applique():
+    from etudes import PARAMETRES_DEFAUT, encoder_etat
+
+    at = lancer_avec_etat(encoder_etat(dict(PARAMETRES_DEFAUT, loyer_hc=1250, taux_gestion=7.5)))
+    assert not at.exception
+    assert at.session_state["loyer_hc"] == at.session_state["s_loyer"] == 1250
+    assert at.session_state["taux_gestion"] == 7.5
+
+
+@pytest.mark.parametrize("modification", [dict(loyer_hc=99999), dict(taux_gestion=50), dict(tf_annuelle=float("inf"))])
+def test_lien_de_partage_invalide_ignore(modification):
+    from test_etudes import code_brut, valeurs_avec
+
+    at = lancer_avec_etat(code_brut(valeurs_avec(**modification)))
+    assert not at.exception
+    assert at.session_state["loyer_hc"] == 600 and at.session_state["taux_gestion"] == 5.0
+    assert any("Lien de partage ignoré" in toast.value for toast in at.toast)
@@ -0,0 +1,69 @@
+import base64
+import os
+
+import pytest
+
+import assets
+
+
+@pytest.fixture
+def dossiers(tmp_path, monkeypatch):
+    pytest.importorskip("PIL")
+    from PIL import Image
+
+    app, static = tmp_path / "app", tmp_path / "app" / "static"
+    app.mkdir()
+
+    Image.new("RGB", (1200, 300), "red").save(app / "logo.png")
+    monkeypatch.setattr(assets, "DOSSIER_APP", str(app))
+    monkeypatch.setattr(assets, "DOSSIER_STATIC", str(static))
+    assets.charger.cache_clear()
+    assets.url.cache_clear()
+    yield app, static
+    assets.charger.cache_clear()
+    assets.url.cache_clear()
+
+
+def test_url_statique_a_empreinte(dossiers):
+    _, static = dossiers
+    url = assets.url("logo.png", service_statique=True)
+    image = assets.charger("logo.png")
+    assert url == f"{assets.URL_STATIC}/logo.{image.empreinte}.webp"
+    assert image.mime == "image/webp"
+    assert (static / image.nom_fichier).read_bytes() == image.donnees
+
+
+def test_image_redimensionnee(dossiers):
+    from PIL import Image
+
+    _, static = dossiers
+    assets.url("logo.png", True)
+    with Image.open(static / assets.charger("logo.png").nom_fichier) as image:
+        assert image.width == assets.OPTIMISATIONS["logo.png"][0]
+
+
+def test_repli_base64_sans_service_statique(dossiers):
+    url = assets.url("logo.png", service_statique=False)
+    assert url.startswith("data:image/webp;base64,")
+    assert base64.b64decode(url.split(",", 1)[1]) == assets.charger("logo.png").donnees
+
+
+def test_repli_base64_en_lecture_seule(dossiers, monkeypatch):
+    def refuser(asset):
+        raise PermissionError("lecture seule")
+
+    monkeypatch.setattr(assets, "_publier", refuser)
+    assert assets.url("logo.png", service_statique=True).startswith("data:image/webp;base64,")
+
+
+def test_version_deja_publiee_relue(dossiers, monkeypatch):
+    _, static = dossiers
+    assets.url("logo.png", True)
+    assets.charger.cache_clear()
+    monkeypatch.setattr(assets, "_reencoder", lambda *args: pytest.fail("ré-encodé au démarrage"))
+    assert assets.charger("logo.png").mime == "image/webp"
+    assert len(os.listdir(static)) == 1
+
+
+def test_image_absente(dossiers):
+    assert assets.url("absente.png", True) is None
@@ -0,0 +1,29 @@
+import platform
+
+from benchmarks.suite import regressions
+
+MESURES = {"micro.projeter_1_bien_20ans_ms": 1.0, "octets.total": 2000, "demarrage.modules_charges": 700}
+
+
+def reference(machine):
+    return {"machine": machine, "mesures": {"micro.projeter_1_bien_20ans_ms": 0.1, "octets.total": 1000, "demarrage.modules_charges": 500}}
+
+
+def test_historique_local_prioritaire():
+    historique = [{"mesures": {"micro.projeter_1_bien_20ans_ms": 0.95}}]
+    alertes = regressions(MESURES, historique, execution_reference=reference(platform.node()))
+    assert [nom for nom, *_ in alertes] == ["octets.total", "demarrage.modules_charges"]
+
+
+def test_reference_de_la_meme_machine():
+    alertes = regressions(MESURES, [], execution_reference=reference(platform.node()))
+    assert len(alertes) == 3
+
+
+def test_reference_d_une_autre_machine_sans_les_durees():
+    alertes = regressions(MESURES, [], execution_reference=reference(platform.node() + "-autre"))
+    assert [nom for nom, *_ in alertes] == ["octets.total", "demarrage.modules_charges"]
+
+
+def test_sans_reference():
+    assert regressions(MESURES, []) == []
@@ -0,0 +1,32 @@
+from cache import CacheLRU, normaliser_cle
+
+
+def test_eviction_du_moins_recemment_utilise():
+    cache = CacheLRU(taille_max=2)
+    cache.obtenir("a", lambda: 1)
+    cache.obtenir("b", lambda: 2)
+    cache.obtenir("a", lambda: 0)         # "a" redevient le plus récent
+    cache.obtenir("c", lambda: 3)         # évince "b"
+    assert cache.consulter("b") is None
+    assert cache.consulter("a") == 1 and cache.consulter("c") == 3
+
+
+def test_statistiques():
+    cache = CacheLRU(taille_max=4)
+    appels = []
+    for cle in ("a", "b", "a", "a"):
+        cache.obtenir(cle, lambda: appels.append(cle) or cle)
+    assert appels == ["a", "b"]
+    assert cache.statistiques() == {"hits": 2, "misses": 2, "entrees": 2, "taille_max": 4, "taux_hit": 0.5}
+    cache.vider()
+    assert cache.statistiques()["entrees"] == 0 and cache.statistiques()["taux_hit"] == 0.0
+
+
+def test_consulter_sans_calcul():
+    cache = CacheLRU()
+    assert cache.consulter("absente") is None
+    assert cache.statistiques()["misses"] == 0
+
+
+def test_normaliser_cle():
+    assert normaliser_cle(0.1 + 0.2, -0.0, True, (1.0000000001, 2)) == normaliser_cle(0.3, 0.0, True, [1.0, 2])
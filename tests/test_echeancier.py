@@ -0,0 +1,46 @@
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import echeancier
+import exports
+from portefeuille import ecrire_blocs_formates, taches_formatees
+from travaux import GestionnaireTravaux
+
+CSV = "loyer_hc,capital,taux_credit,duree\n" + "".join(f"{600 + k},{50_000 + 1000 * k},3.5,{5 + k % 3}\n" for k in range(7))
+
+
+@pytest.fixture
+def dossier_exports(tmp_path, monkeypatch):
+    monkeypatch.setattr(exports, "DOSSIER_EXPORTS", str(tmp_path))
+    return tmp_path
+
+
+def test_echeancier_d_un_bien():
+    e = echeancier.calculer_echeancier(100.0, 4.0, 100_000, 3.5, 20)
+    assert e.nb_mois == 240
+    np.testing.assert_allclose(e.capital_amorti.sum(), 100_000)
+    np.testing.assert_allclose(e.mensualite - e.interets, e.capital_amorti)
+    assert e.capital_restant_du[-1] == pytest.approx(0, abs=1e-6)
+
+
+def test_portefeuille_par_la_file_de_travaux(dossier_exports):
+    direct = io.BytesIO()
+    nb_lignes = echeancier.exporter_portefeuille(io.BytesIO(CSV.encode()), direct, taille_bloc=3, format_entree="csv", format_sortie="csv")
+    assert nb_lignes == 12 * sum(5 + k % 3 for k in range(7))
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        travail = GestionnaireTravaux(pool).soumettre(
+            "s1", "echeanciers", taches_formatees(echeancier.taches_echeancier(io.BytesIO(CSV.encode()), 3, "csv"), "csv"),
+            lambda blocs: exports.publier_export(lambda chemin: ecrire_blocs_formates(blocs, chemin, "csv"), "csv"),
+        )
+        url, chemin, nb_lignes_publiees = travail.resultat(10)
+    assert nb_lignes_publiees == nb_lignes
+    assert url == f"{exports.URL_EXPORTS}/{os.path.basename(chemin)}"
+    with open(chemin, "rb") as f:
+        assert f.read() == direct.getvalue()
+    assert pd.read_csv(chemin)["bien"].nunique() == 7
@@ -0,0 +1,54 @@
+import base64
+import json
+import zlib
+
+import pytest
+
+import etudes
+from etudes import PARAMETRES_DEFAUT, decoder_etat, encoder_etat
+
+
+def code_brut(valeurs):
+    """Code de partage construit à la main (lien modifié ou d'une version précédente)."""
+    texte = json.dumps(valeurs, separators=(",", ":"), allow_nan=True)
+    return "1." + base64.urlsafe_b64encode(zlib.compress(texte.encode())).decode().rstrip("=")
+
+
+def valeurs_avec(**modifications):
+    return [modifications.get(nom, defaut) for nom, defaut in PARAMETRES_DEFAUT.items()]
+
+
+def test_aller_retour():
+    parametres = dict(PARAMETRES_DEFAUT, loyer_hc=1250, taux_gestion=7.5, gli_active=False, duree_restante_annees=12)
+    assert decoder_etat(encoder_etat(parametres)) == parametres
+
+
+@pytest.mark.parametrize("code", [
+    "2.abc",                                        # version inconnue
+    "1.!!!",                                        # base64 illisible
+    "1." + base64.urlsafe_b64encode(b"pas du zlib").decode(),
+    code_brut([1, 2, 3]),                           # incomplet
+    code_brut(valeurs_avec(loyer_hc=99999)),        # au-delà du curseur (0-5000)
+    code_brut(valeurs_avec(loyer_hc=-10)),
+    code_brut(valeurs_avec(taux_gestion=50)),       # au-delà du curseur (4-10)
+    code_brut(valeurs_avec(taux_gli=3.5)),
+    code_brut(valeurs_avec(duree_restante_annees=40)),
+    code_brut(valeurs_avec(taux_placement=-1)),
+    code_brut(valeurs_avec(tf_annuelle=float("inf"))),
+    code_brut(valeurs_avec(credit_mensuel_ass=float("nan"))),
+    code_brut(valeurs_avec(montant_emprunte_initial=10 ** 400)),
+    code_brut(valeurs_avec(loyer_hc="600")),
+])
+def test_codes_refuses(code):
+    with pytest.raises(ValueError):
+        decoder_etat(code)
+
+
+def test_recherche_par_prefixe(tmp_path):
+    base = str(tmp_path / "etudes.sqlite")
+    identifiant = etudes.enregistrer("Élodie Durand", "12 rue des Arcades", {"loyer_hc": 700}, {"indicateurs": {}}, base=base)
+    etudes.enregistrer("Marc Petit", "Studio", {}, {}, base=base)
+    assert [r.id for r in etudes.rechercher("elodie", base=base)] == [identifiant]
+    assert [r.id for r in etudes.rechercher("12 RUE", base=base)] == [identifiant]
+    assert len(etudes.rechercher("", base=base)) == 2
+    assert etudes.charger(identifiant, base=base).parametres == {"loyer_hc": 700}
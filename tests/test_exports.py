@@ -0,0 +1,63 @@
+import os
+import time
+
+import pytest
+
+import exports
+
+
+@pytest.fixture
+def dossier(tmp_path, monkeypatch):
+    monkeypatch.setattr(exports, "DOSSIER_EXPORTS", str(tmp_path))
+    monkeypatch.setattr(exports, "_purge", None)
+    return tmp_path
+
+
+def perime(dossier, nom):
+    fichier = dossier / nom
+    fichier.write_text("x")
+    os.utime(fichier, (0, 0))
+    return fichier
+
+
+def test_publication(dossier):
+    url, chemin, valeur = exports.publier_export(lambda chemin: open(chemin, "w").write("abc"), "csv")
+    assert valeur == 3 and open(chemin).read() == "abc"
+    assert url == f"{exports.URL_EXPORTS}/{os.path.basename(chemin)}" and os.path.dirname(chemin) == str(dossier)
+    assert exports.publier_export(lambda chemin: open(chemin, "w").close(), "csv")[1] != chemin
+
+
+def test_export_interrompu_sans_fichier_residuel(dossier):
+    def ecrire(chemin):
+        open(chemin, "wb").close()
+        raise RuntimeError("interrompu")
+
+    with pytest.raises(RuntimeError):
+        exports.publier_export(ecrire, "csv")
+    assert os.listdir(dossier) == []
+
+
+def test_purge_des_exports_perimes(dossier):
+    ancien = perime(dossier, "ancien.csv")
+    recent = dossier / "recent.csv"
+    recent.write_text("x")
+    assert exports.purger_exports() == 1
+    assert not ancien.exists() and recent.exists()
+
+
+def test_purge_sans_dossier(tmp_path, monkeypatch):
+    monkeypatch.setattr(exports, "DOSSIER_EXPORTS", str(tmp_path / "absent"))
+    assert exports.purger_exports() == 0
+
+
+def test_purge_au_demarrage_sans_nouvel_export(dossier):
+    perime(dossier, "export_d_un_processus_precedent.csv")
+    exports.demarrer_purge()
+    fil = exports._purge
+    exports.demarrer_purge()   # un seul thread par processus
+    assert exports._purge is fil and fil.daemon
+    for _ in range(50):
+        if not os.listdir(dossier):
+            break
+        time.sleep(0.02)
+    assert os.listdir(dossier) == []
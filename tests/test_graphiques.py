@@ -0,0 +1,55 @@
+import numpy as np
+
+from graphiques import COULEURS_OFFRES, PAS_CARTE_COMPACTE, SEUIL_MARQUEURS, figure_carte, figure_comparaison, figure_projection
+
+ANNEES = np.arange(1, 21)
+
+
+def test_gabarit_reutilise_et_mis_a_jour():
+    gabarits = {}
+    fig = figure_projection(gabarits, "cashflow", ANNEES, ANNEES * 100.0, "#00aa00")
+    assert figure_projection(gabarits, "cashflow", ANNEES, ANNEES * 200.0, "#aa0000") is fig
+    assert len(gabarits) == 1
+    np.testing.assert_array_equal(fig.data[-1].y, ANNEES * 200.0)
+    assert fig.data[-1].line.color == "#aa0000" and fig.data[-1].marker.line.color == "#aa0000"
+
+
+def test_gabarits_propres_a_chaque_session():
+    session_a, session_b = {}, {}
+    fig_a = figure_projection(session_a, "patrimoine", ANNEES, ANNEES * 1.0, "#000000")
+    fig_b = figure_projection(session_b, "patrimoine", ANNEES, ANNEES * 2.0, "#000000")
+    assert fig_a is not fig_b
+    np.testing.assert_array_equal(fig_a.data[-1].y, ANNEES * 1.0)
+
+
+def test_variantes_de_projection():
+    gabarits = {}
+    bandes = np.vstack([ANNEES * 0.5, ANNEES * 1.0, ANNEES * 1.5])
+    avec_bandes = figure_projection(gabarits, "patrimoine", ANNEES, ANNEES * 1.0, "#123456", bandes=bandes)
+    assert [trace.name for trace in avec_bandes.data] == ["P95", "P5", "Médiane", "Patrimoine"]
+    np.testing.assert_array_equal(avec_bandes.data[0].y, bandes[2])
+
+    compacte = figure_projection(gabarits, "patrimoine", ANNEES, ANNEES * 1.0, "#123456", compact=True)
+    assert compacte.data[-1].y.dtype == np.float32 and compacte.data[-1].mode == "lines"
+    longue = np.arange(1, SEUIL_MARQUEURS + 2)
+    assert figure_projection(gabarits, "patrimoine", longue, longue * 1.0, "#123456").data[-1].mode == "lines"
+    assert len(gabarits) == 3
+
+
+def test_comparaison():
+    gabarits = {}
+    series = np.vstack([ANNEES * 1.0, ANNEES * 2.0, ANNEES * 3.0])
+    fig = figure_comparaison(gabarits, "cashflow", ANNEES, series, ["A", "B", "C"], reference=1)
+    assert [trace.name for trace in fig.data] == ["A", "B", "C"]
+    assert [trace.line.width for trace in fig.data] == [2, 3, 2]
+    assert fig.data[1].line.color == COULEURS_OFFRES[0]
+    assert figure_comparaison(gabarits, "cashflow", ANNEES, series[:2], ["A", "B"]) is not fig
+
+
+def test_carte_compacte_sous_echantillonnee():
+    loyers, taux = np.linspace(300, 900, 10), np.linspace(4, 10, 5)
+    z = np.arange(50.0).reshape(5, 10)
+    fig = figure_carte({}, "cashflow", "Titre", loyers, taux, z, [[0, "red"], [1, "green"]], (600, 5), compact=True)
+    carte, marque = fig.data
+    assert len(carte.x) == 10 // PAS_CARTE_COMPACTE and carte.z.shape == (5, 10 // PAS_CARTE_COMPACTE)
+    assert marque.x == (600,) and fig.layout.title.text == "Titre"
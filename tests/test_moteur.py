@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from moteur import calculer_indicateurs, capital_rembourse_au_mois, cashflow_au_mois, mensualite_credit, projeter, valeurs_a_horizon
+
+PARAMETRES = [
+    # cashflow net mensuel, taux placement, capital, taux crédit, durée (années)
+    (150.0, 4.0, 100_000, 3.5, 20),
+    (-85.5, 4.0, 100_000, 3.5, 20),
+    (42.0, 0.0, 250_000, 1.2, 25),
+    (10.0, 15.0, 0, 3.5, 5),
+    (0.0, 2.5, 80_000, 0.0, 10),
+]
+
+
+def boucle_mensuelle(cashflow_net_mensuel, taux_placement, capital, taux_credit, duree_annees):
+    """Boucle mois par mois de la version d'origine de l'app (points de fin d'année)."""
+    nb_mois = duree_annees * 12
+    cashflow, cumul = [], 0
+    for m in range(1, nb_mois + 1):
+        if cashflow_net_mensuel > 0: cumul = (cumul + cashflow_net_mensuel) * (1 + taux_placement / 100 / 12)
+        else: cumul += cashflow_net_mensuel
+        if m % 12 == 0: cashflow.append(cumul)
+
+    patrimoine, rembourse, restant = [], 0, capital
+    taux_mensuel = taux_credit / 100 / 12
+    mensualite = 0
+    if capital > 0 and taux_credit > 0:
+        mensualite = capital * (taux_mensuel / (1 - (1 + taux_mensuel) ** (-nb_mois)))
+    for m in range(1, nb_mois + 1):
+        capital_mois = mensualite - restant * taux_mensuel
+        if restant > 0:
+            rembourse += capital_mois
+            restant -= capital_mois
+        if m % 12 == 0: patrimoine.append(cashflow[m // 12 - 1] + rembourse)
+    return cashflow, patrimoine
+
+
+@pytest.mark.parametrize("parametres", PARAMETRES)
+def test_projection_identique_a_la_boucle(parametres):
+    cashflow, patrimoine = boucle_mensuelle(*parametres)
+    projection = projeter(*parametres).annuelle()
+    np.testing.assert_allclose(projection.cashflow_cumul, cashflow, rtol=1e-9, atol=1e-6)
+    np.testing.assert_allclose(projection.patrimoine, patrimoine, rtol=1e-9, atol=1e-6)
+
+
+def test_projection_diffusee_sur_un_lot():
+    colonnes = [np.array(c) for c in zip(*PARAMETRES)]
+    projection = projeter(*colonnes).annuelle()
+    for k, parametres in enumerate(PARAMETRES):
+        cashflow, patrimoine = boucle_mensuelle(*parametres)
+        duree = parametres[-1]
+        np.testing.assert_allclose(projection.cashflow_cumul[k, :duree], cashflow, rtol=1e-9, atol=1e-6)
+        np.testing.assert_allclose(projection.patrimoine[k, :duree], patrimoine, rtol=1e-9, atol=1e-6)
+
+
+def test_capital_plafonne_apres_la_duree():
+    rembourse = capital_rembourse_au_mois(100_000, 3.5, 120, np.array([119, 120, 121, 240]))
+    assert rembourse[0] < 100_000
+    np.testing.assert_allclose(rembourse[1:], 100_000)
+
+
+def test_cashflow_au_mois_sans_placement():
+    np.testing.assert_allclose(cashflow_au_mois(100.0, 0.0, np.array([1, 12, 240])), [100, 1200, 24000])
+    np.testing.assert_allclose(cashflow_au_mois(-50.0, 8.0, 12), -600)
+
+
+def test_valeurs_a_horizon_coherentes_avec_la_serie():
+    cashflow, capital = valeurs_a_horizon(150.0, 4.0, 100_000, 3.5, 20)
+    projection = projeter(150.0, 4.0, 100_000, 3.5, 20)
+    assert cashflow == pytest.approx(projection.cashflow_cumul[-1])
+    assert capital == pytest.approx(projection.capital_rembourse[-1])
+
+
+def test_indicateurs_scalaires_et_mensualite_nulle():
+    indicateurs = calculer_indicateurs(600, 50, 5.0, True, 2.8, True, 400, 800, 400)
+    assert indicateurs.loyer_cc == 650
+    assert indicateurs.total_frais_gestion == pytest.approx(650 * 0.078 + 80 / 12)
+    assert np.ndim(indicateurs.cashflow_net_mensuel) == 0
+    assert mensualite_credit(100_000, 0.0, 240) == 0
@@ -0,0 +1,116 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from moteur import calculer_indicateurs, valeurs_a_horizon
+from portefeuille import ecrire_blocs_formates, ecrire_resultats, lire_par_blocs, simuler_bloc, simuler_portefeuille, taches_formatees
+
+CSV = """loyer_hc,provision,taux_gestion,gli,taux_gli,pno,credit_mensuel,capital,taux_credit,duree
+600,50,5,oui,2.8,oui,400,100000,3.5,20
+1200,80,7.5,non,2.5,non,0,0,0,10
+450,30,6,1,2.6,0,350,60000,1.9,25
+"""
+
+
+def simuler(contenu, **options):
+    sortie = io.BytesIO()
+    nb_biens = simuler_portefeuille(io.BytesIO(contenu.encode("utf-8")), sortie, format_entree="csv", format_sortie="csv", **options)
+    sortie.seek(0)
+    return nb_biens, pd.read_csv(sortie)
+
+
+def test_aller_retour_csv():
+    nb_biens, resultats = simuler(CSV)
+    entree = pd.read_csv(io.StringIO(CSV))
+    assert nb_biens == len(resultats) == 3
+    pd.testing.assert_series_equal(resultats["loyer_hc"], entree["loyer_hc"].astype(float))
+    assert resultats["gli"].tolist() == [True, False, True]
+
+    for k, bien in resultats.iterrows():
+        indicateurs = calculer_indicateurs(bien.loyer_hc, bien.provision, bien.taux_gestion, bien.gli, bien.taux_gli, bien.pno,
+                                           bien.credit_mensuel, bien.tf_annuelle, bien.copro_annuelle)
+        cashflow, capital = valeurs_a_horizon(indicateurs.cashflow_net_mensuel, bien.taux_placement, bien.capital, bien.taux_credit, bien.duree)
+        assert bien.cashflow_net_mensuel == pytest.approx(indicateurs.cashflow_net_mensuel)
+        assert bien.patrimoine_horizon == pytest.approx(cashflow + capital)
+
+
+def test_aller_retour_parquet_par_blocs():
+    pytest.importorskip("pyarrow")
+    # Premier bloc entier, blocs suivants décimaux : même schéma pour tous les blocs écrits
+    lignes = [f"{600 + k},{50 if k < 5 else 50 + k / 2}" for k in range(12)]
+    entree = "loyer_hc,provision\n" + "\n".join(lignes) + "\n"
+    sortie = io.BytesIO()
+    nb_biens = simuler_portefeuille(io.BytesIO(entree.encode("utf-8")), sortie, taille_bloc=5, format_entree="csv", format_sortie="parquet")
+    sortie.seek(0)
+    resultats = pd.read_parquet(sortie)
+    assert nb_biens == len(resultats) == 12
+    assert resultats["provision"].tolist() == [50.0] * 5 + [50 + k / 2 for k in range(5, 12)]
+    _, en_csv = simuler(entree)
+    pd.testing.assert_frame_equal(resultats, en_csv, check_dtype=False)
+
+
+@pytest.mark.parametrize("format_sortie", ["csv", "parquet"])
+def test_blocs_formates_identiques(format_sortie):
+    if format_sortie == "parquet":
+        pytest.importorskip("pyarrow")
+    # Mise en forme par les tâches (dans le pool) puis concaténation : même fichier qu'une écriture directe
+    source = lambda: io.BytesIO(CSV.encode("utf-8"))
+    direct, formate = io.BytesIO(), io.BytesIO()
+    ecrire_resultats((simuler_bloc(bloc) for bloc in lire_par_blocs(source(), 1, "csv")), direct, format_sortie)
+    taches = taches_formatees(((simuler_bloc, bloc) for bloc in lire_par_blocs(source(), 1, "csv")), format_sortie)
+    assert ecrire_blocs_formates((fonction(*arguments) for fonction, *arguments in taches), formate, format_sortie) == 3
+    if format_sortie == "csv":
+        assert formate.getvalue() == direct.getvalue()
+    else:
+        pd.testing.assert_frame_equal(pd.read_parquet(formate), pd.read_parquet(direct))
+
+
+def test_blocs_sans_effet_sur_les_resultats():
+    _, en_un_bloc = simuler(CSV)
+    _, par_ligne = simuler(CSV, taille_bloc=1)
+    pd.testing.assert_frame_equal(en_un_bloc, par_ligne)
+
+
+def test_valeurs_par_defaut():
+    _, resultats = simuler("loyer_hc,provision\n700,50\n")
+    assert resultats.loc[0, "duree"] == 20 and resultats.loc[0, "tf_annuelle"] == 800
+    assert np.isfinite(resultats.loc[0, "patrimoine_horizon"])
+
+
+def test_colonne_obligatoire_manquante():
+    with pytest.raises(ValueError, match="loyer_hc"):
+        simuler("provision\n50\n")
+
+
+@pytest.mark.parametrize("separateur", [",", ";", "\t"])
+def test_separateur_detecte(separateur):
+    _, resultats = simuler(CSV.replace(",", separateur))
+    assert len(resultats) == 3 and resultats.loc[1, "loyer_hc"] == 1200
+
+
+def test_une_seule_colonne():
+    _, resultats = simuler("loyer_hc\n700\n800\n")
+    assert resultats["loyer_hc"].tolist() == [700, 800]
+
+
+def test_loyer_manquant_refuse():
+    with pytest.raises(ValueError, match="Bien 1 .*loyer_hc"):
+        simuler("loyer_hc,provision\n700,50\n,50\n")
+
+
+@pytest.mark.parametrize("duree", ["0", "51", "1e9", "1e30", "inf"])
+def test_duree_hors_limites_refusee(duree):
+    with pytest.raises(ValueError, match="durée|duree"):
+        simuler(f"loyer_hc,duree\n700,20\n700,{duree}\n")
+
+
+def test_duree_non_entiere_refusee():
+    with pytest.raises(ValueError, match="Bien 1 .*entier"):
+        simuler("loyer_hc,duree\n700,20.0\n700,1.5\n")
+
+
+def test_valeur_infinie_refusee():
+    with pytest.raises(ValueError, match="Bien 0 .*capital"):
+        simuler("loyer_hc,capital\n700,inf\n")
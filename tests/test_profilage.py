@@ -0,0 +1,70 @@
+import json
+import time
+
+import pytest
+
+import profilage
+from profilage import Profil, agreger, lire_journal
+
+
+def test_profil_inactif_ne_mesure_rien():
+    profil = Profil(False)
+    profil.etape("a")
+    with profil.phase("b"):
+        pass
+    profil.compter("css", lambda: pytest.fail("évalué en mode inactif"))
+    assert profil.terminer() is None and profil.phases == {}
+
+
+def test_etapes_phases_et_octets():
+    profil = Profil(True, "s1")
+    profil.etape("scenario")
+    with profil.phase("figures"):
+        time.sleep(0.01)
+    profil.compter("plotly", lambda: 1200)
+    profil.compter("plotly", 300)
+    profil.etape("exports")
+    enregistrement = profil.terminer()
+    assert enregistrement["session"] == "s1"
+    assert list(enregistrement["phases"]) == ["scenario.figures", "scenario", "exports"]
+    assert enregistrement["phases"]["scenario.figures"] >= 10
+    assert enregistrement["phases"]["scenario"] >= enregistrement["phases"]["scenario.figures"]
+    assert enregistrement["octets"] == {"plotly": 1500}
+    assert enregistrement["total_ms"] >= sum(d for nom, d in enregistrement["phases"].items() if "." not in nom)
+
+
+def enregistrement(total, phases, octets=None, session="s"):
+    return {"date": "2026-01-01T00:00:00", "session": session, "total_ms": total, "phases": phases, "octets": octets or {}}
+
+
+def test_agreger():
+    stats = agreger([enregistrement(10 * k, {"scenario": k}, {"css": 100}) for k in range(1, 101)])
+    assert stats["total"]["n"] == 100
+    assert stats["total"]["p50"] == pytest.approx(505) and stats["total"]["p95"] == pytest.approx(950.5)
+    assert stats["scenario"]["p50"] == pytest.approx(50.5)
+    assert stats["octets.css"] == {"n": 100, "p50": 100.0, "p95": 100.0}
+
+
+def test_journal_a_rotation(tmp_path, monkeypatch):
+    chemin = str(tmp_path / "profilage.jsonl")
+    monkeypatch.setattr(profilage, "JOURNAL", chemin)
+    monkeypatch.setattr(profilage, "TAILLE_MAX_JOURNAL", 400)
+    monkeypatch.setattr(profilage, "NB_ARCHIVES", 2)
+    monkeypatch.setattr(profilage, "_journal", None)
+    journal = profilage._journal_profilage()
+    try:
+        for k in range(30):
+            journal.info(json.dumps(enregistrement(k, {"scenario": k})))
+        fichiers = sorted(p.name for p in tmp_path.iterdir())
+        assert fichiers == ["profilage.jsonl", "profilage.jsonl.1", "profilage.jsonl.2"]
+        relus = lire_journal(chemin)
+        assert 0 < len(relus) < 30   # les plus anciens sont sortis des archives
+        assert {e["total_ms"] for e in relus} <= set(range(30)) and 29 in {e["total_ms"] for e in relus}
+    finally:
+        for gestionnaire in list(journal.handlers):
+            journal.removeHandler(gestionnaire)
+            gestionnaire.close()
+
+
+def test_lire_journal_absent(tmp_path):
+    assert lire_journal(str(tmp_path / "absent.jsonl")) == []
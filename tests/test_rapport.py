@@ -0,0 +1,53 @@
+import io
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import rapport
+
+CSV = "reference,loyer_hc,capital,taux_credit,duree\n" + "".join(f"B{k},{600 + k},50000,3.5,10\n" for k in range(3))
+
+
+def test_un_pdf_par_bien():
+    sortie = io.BytesIO()
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        assert rapport.rapports_zip(io.BytesIO(CSV.encode()), sortie, pool=pool, format_entree="csv") == 3
+    noms = zipfile.ZipFile(sortie).namelist()
+    assert noms == ["etude_00001_B0.pdf", "etude_00002_B1.pdf", "etude_00003_B2.pdf"]
+    assert all(zipfile.ZipFile(sortie).read(nom).startswith(b"%PDF") for nom in noms)
+
+
+def test_echec_d_un_rendu_annule_les_suivants(monkeypatch):
+    rendus, liberation = [], threading.Event()
+
+    def rendre_bien(bien, indice):
+        if indice == 1:
+            raise ValueError("rendu impossible")
+        liberation.wait(5)
+        rendus.append(indice)
+        return f"{indice}.pdf", b""
+
+    monkeypatch.setattr(rapport, "rendre_bien", rendre_bien)
+    csv = "loyer_hc\n" + "700\n" * 50
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        with pytest.raises(ValueError, match="rendu impossible"):
+            rapport.rapports_zip(io.BytesIO(csv.encode()), io.BytesIO(), pool=pool, en_vol=10, format_entree="csv")
+        liberation.set()
+    assert len(rendus) < 9     # les rendus déjà soumis mais pas commencés ont été retirés
+
+
+def test_zip_de_la_file_de_travaux_publie_sur_disque(tmp_path, monkeypatch):
+    import exports
+    from travaux import GestionnaireTravaux
+
+    monkeypatch.setattr(exports, "DOSSIER_EXPORTS", str(tmp_path))
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        travail = GestionnaireTravaux(pool).soumettre(
+            "s1", "rapports", rapport.taches_rapports(io.BytesIO(CSV.encode()), "csv"),
+            lambda rapports: exports.publier_export(lambda chemin: rapport.ecrire_zip(rapports, chemin), "zip"),
+        )
+        url, chemin, nb_rapports = travail.resultat(30)
+    assert nb_rapports == 3 and url.endswith(".zip")
+    assert len(zipfile.ZipFile(chemin).namelist()) == 3
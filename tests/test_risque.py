@@ -0,0 +1,60 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from moteur import MOIS_PAR_AN, capital_rembourse_au_mois, cashflow_au_mois
+from risque import PERCENTILES, TAILLE_LOT, HypothesesRisque, combiner_risque, lots_risque, simuler_lot, simuler_risque
+
+BIEN = dict(
+    loyer_cc=650.0, taux_gestion=5.0, gli_active=True, taux_gli=2.8, pno_active=True, credit_mensuel=400.0,
+    charges_proprio_mensuel=100.0, taux_placement=4.0, capital=100_000.0, taux_credit=3.5, duree_annees=20,
+)
+SANS_ALEA = HypothesesRisque(vacance_mois_par_an=0, proba_impaye=0, inflation_charges=0, volatilite_inflation=0, volatilite_placement=0)
+
+
+def test_lot_deterministe_a_graine_fixe():
+    hypotheses = HypothesesRisque()
+    a = simuler_lot(BIEN, hypotheses, 200, 7)
+    assert a.shape == (200, 20)
+    np.testing.assert_array_equal(a, simuler_lot(BIEN, hypotheses, 200, 7))
+    assert not np.array_equal(a, simuler_lot(BIEN, hypotheses, 200, 8))
+
+
+def test_lots_et_graines():
+    lots = lots_risque(2 * TAILLE_LOT + 10, graine=3)
+    assert [taille for taille, _ in lots] == [TAILLE_LOT, TAILLE_LOT, 10]
+    assert [g.entropy for _, g in lots] == [3] * 3
+    assert [tuple(g.spawn_key) for _, g in lots] == [tuple(g.spawn_key) for _, g in lots_risque(2 * TAILLE_LOT + 10, graine=3)]
+
+
+def test_sans_alea_egal_au_moteur():
+    net = BIEN["loyer_cc"] * (1 - (BIEN["taux_gestion"] + BIEN["taux_gli"]) / 100) - 80 / MOIS_PAR_AN - BIEN["credit_mensuel"] - BIEN["charges_proprio_mensuel"]
+    resultat = combiner_risque(BIEN, [simuler_lot(BIEN, SANS_ALEA, 5, 0)])
+    mois = np.arange(1, 21) * MOIS_PAR_AN
+    for bande in resultat.cashflow_cumul:
+        np.testing.assert_allclose(bande, cashflow_au_mois(net, BIEN["taux_placement"], mois), rtol=1e-9)
+    np.testing.assert_allclose(
+        resultat.patrimoine - resultat.cashflow_cumul,
+        np.broadcast_to(capital_rembourse_au_mois(BIEN["capital"], BIEN["taux_credit"], 240, mois), (3, 20)), rtol=1e-9,
+    )
+
+
+def test_percentiles_ordonnes():
+    resultat = simuler_risque(BIEN, nb_chemins=2000, graine=1)
+    assert resultat.percentiles == PERCENTILES and resultat.nb_chemins == 2000
+    assert resultat.cashflow_cumul.shape == resultat.patrimoine.shape == (3, 20)
+    p5, p50, p95 = resultat.cashflow_cumul
+    assert np.all(p5 <= p50) and np.all(p50 <= p95)
+    assert np.all(resultat.patrimoine[0] <= resultat.patrimoine[1]) and np.all(resultat.patrimoine[1] <= resultat.patrimoine[2])
+    assert 0 <= resultat.proba_cashflow_negatif <= 1
+
+
+def test_independant_du_pool():
+    nb_chemins = TAILLE_LOT + 500
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        en_parallele = simuler_risque(BIEN, nb_chemins=nb_chemins, graine=5, pool=pool)
+    lots = [simuler_lot(BIEN, HypothesesRisque(), taille, graine) for taille, graine in lots_risque(nb_chemins, 5)]
+    sequentiel = combiner_risque(BIEN, lots)
+    np.testing.assert_array_equal(en_parallele.cashflow_cumul, sequentiel.cashflow_cumul)
+    assert en_parallele.proba_cashflow_negatif == pytest.approx(sequentiel.proba_cashflow_negatif)
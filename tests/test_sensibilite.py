@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from moteur import calculer_indicateurs, valeurs_a_horizon
+from sensibilite import TAUX_GLI, axe_loyers, axe_taux_gestion, calculer_grille
+
+BIEN = dict(provision=50, gli_active=True, pno_active=True, credit_mensuel=400, tf_annuelle=800, copro_annuelle=400,
+            taux_placement=4.0, capital=100_000, taux_credit=3.5, duree_annees=20)
+
+
+def test_axes():
+    loyers = axe_loyers(600, nb_points=11)
+    assert loyers[0] == 300 and loyers[-1] == 900 and len(loyers) == 11
+    assert axe_loyers(100)[-1] - axe_loyers(100)[0] == pytest.approx(500)   # plage d'au moins 500 €
+    assert axe_loyers(0)[0] == 0
+    taux = axe_taux_gestion(13)
+    assert taux[0] == 4.0 and taux[-1] == 10.0 and len(taux) == 13
+
+
+def test_grille_egale_au_calcul_point_par_point():
+    loyers, taux_gestion = axe_loyers(800, nb_points=7), axe_taux_gestion(5)
+    grille = calculer_grille(loyers, taux_gestion, taux_gli=TAUX_GLI, **BIEN)
+    assert grille.cashflow_net_mensuel.shape == grille.patrimoine_horizon.shape == (len(TAUX_GLI), 5, 7)
+    for g, taux_gli in enumerate(TAUX_GLI):
+        for t, gestion in enumerate(taux_gestion):
+            for l, loyer in enumerate(loyers):
+                indicateurs = calculer_indicateurs(loyer, BIEN["provision"], gestion, True, taux_gli, True, BIEN["credit_mensuel"],
+                                                   BIEN["tf_annuelle"], BIEN["copro_annuelle"])
+                cashflow, capital = valeurs_a_horizon(indicateurs.cashflow_net_mensuel, BIEN["taux_placement"], BIEN["capital"],
+                                                      BIEN["taux_credit"], BIEN["duree_annees"])
+                assert grille.cashflow_net_mensuel[g, t, l] == pytest.approx(indicateurs.cashflow_net_mensuel)
+                assert grille.patrimoine_horizon[g, t, l] == pytest.approx(cashflow + capital)
+
+
+def test_monotonie():
+    grille = calculer_grille(axe_loyers(800, nb_points=9), axe_taux_gestion(6), taux_gli=2.8, **BIEN)
+    cashflow = grille.cashflow_net_mensuel[0]
+    assert np.all(np.diff(cashflow, axis=1) > 0)   # plus de loyer, plus de cashflow
+    assert np.all(np.diff(cashflow, axis=0) < 0)   # plus d'honoraires, moins de cashflow
+
+
+def test_indice_gli():
+    grille = calculer_grille(axe_loyers(800, nb_points=3), axe_taux_gestion(2), taux_gli=TAUX_GLI, **BIEN)
+    assert grille.indice_gli(2.7) == 2
+    assert grille.indice_gli(2.74) == 2 and grille.indice_gli(9) == len(TAUX_GLI) - 1
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from moteur import calculer_indicateurs, mensualite_credit
+from solveur import capital_max, loyer_equilibre, mensualite_max, taux_credit_max, taux_gestion_max
+
+BIEN = dict(provision=50, gli_active=True, taux_gli=2.8, pno_active=True, tf_annuelle=800, copro_annuelle=400)
+
+
+@pytest.mark.parametrize("cashflow_cible", [-100.0, 0.0, 250.0])
+def test_loyer_equilibre_aller_retour(cashflow_cible):
+    loyer = loyer_equilibre(BIEN["provision"], 6.0, BIEN["gli_active"], BIEN["taux_gli"], BIEN["pno_active"], 400, BIEN["tf_annuelle"], BIEN["copro_annuelle"], cashflow_cible)
+    indicateurs = calculer_indicateurs(loyer, BIEN["provision"], 6.0, BIEN["gli_active"], BIEN["taux_gli"], BIEN["pno_active"], 400, BIEN["tf_annuelle"], BIEN["copro_annuelle"])
+    assert indicateurs.cashflow_net_mensuel == pytest.approx(cashflow_cible, abs=1e-9)
+
+
+def test_taux_gestion_max_aller_retour():
+    taux = taux_gestion_max(1200, BIEN["provision"], BIEN["gli_active"], BIEN["taux_gli"], BIEN["pno_active"], 400, BIEN["tf_annuelle"], BIEN["copro_annuelle"])
+    indicateurs = calculer_indicateurs(1200, BIEN["provision"], taux, BIEN["gli_active"], BIEN["taux_gli"], BIEN["pno_active"], 400, BIEN["tf_annuelle"], BIEN["copro_annuelle"])
+    assert indicateurs.cashflow_net_mensuel == pytest.approx(0.0, abs=1e-9)
+
+
+def test_taux_gestion_max_inatteignable():
+    assert np.isnan(taux_gestion_max(300, 0, False, 2.8, True, 900, 800, 400))
+
+
+@pytest.mark.parametrize("taux_credit", [0.0, 1.5, 3.5])
+def test_capital_max_aller_retour(taux_credit):
+    args = (1000, BIEN["provision"], 6.0, BIEN["gli_active"], BIEN["taux_gli"], BIEN["pno_active"], BIEN["tf_annuelle"], BIEN["copro_annuelle"])
+    capital = capital_max(*args, taux_credit, 20, 50)
+    mensualite = mensualite_credit(capital, taux_credit, 240) if taux_credit else capital / 240
+    assert mensualite == pytest.approx(mensualite_max(*args, 50))
+
+
+def test_taux_credit_max_aller_retour():
+    args = (1000, BIEN["provision"], 6.0, BIEN["gli_active"], BIEN["taux_gli"], BIEN["pno_active"], BIEN["tf_annuelle"], BIEN["copro_annuelle"])
+    taux = taux_credit_max(100_000, 20, *args)
+    assert 0 < taux < 20
+    assert mensualite_credit(100_000, taux, 240) == pytest.approx(mensualite_max(*args), abs=1e-6)
+
+
+def test_objectifs_diffuses_sur_un_tableau():
+    loyers = np.array([500.0, 900.0, 1500.0])
+    taux = taux_credit_max(100_000, 20, loyers, BIEN["provision"], 6.0, BIEN["gli_active"], BIEN["taux_gli"], BIEN["pno_active"], BIEN["tf_annuelle"], BIEN["copro_annuelle"])
+    assert taux.shape == (3,)
+    assert np.isnan(taux[0]) and taux[1] < taux[2]
@@ -0,0 +1,137 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+import travaux
+from travaux import ANNULE, ECHEC, TERMINE, FileSaturee, GestionnaireTravaux, QuotaDepasse, TravailAnnule
+
+# Pool de threads à la place du pool de processus : mêmes futures, sans spawn
+DELAI_S = 5
+
+
+@pytest.fixture
+def pool():
+    with ThreadPoolExecutor(max_workers=4) as executeur:
+        yield executeur
+
+
+@pytest.fixture
+def liberation():
+    evenement = threading.Event()
+    yield evenement
+    evenement.set()
+
+
+def carre(x):
+    return x * x
+
+
+def bloquer(evenement):
+    evenement.wait(DELAI_S)
+    return 0
+
+
+def echouer():
+    raise ValueError("bien invalide")
+
+
+def taches_bloquees(evenement, nb=3):
+    return [(bloquer, evenement)] * nb
+
+
+def test_resultats_combines_dans_l_ordre(pool):
+    gestionnaire = GestionnaireTravaux(pool, en_vol_par_travail=2)
+    travail = gestionnaire.soumettre("s1", "calcul", [(carre, x) for x in range(10)], sum)
+    assert travail.resultat(DELAI_S) == sum(x * x for x in range(10))
+    assert travail.statut == TERMINE and travail.faites == 10 and travail.progression == 1.0
+    assert gestionnaire.travail("s1", "calcul") is None
+
+
+def test_quota_par_session(pool, liberation):
+    gestionnaire = GestionnaireTravaux(pool, quota_session=2)
+    gestionnaire.soumettre("s1", "a", taches_bloquees(liberation))
+    gestionnaire.soumettre("s1", "b", taches_bloquees(liberation))
+    with pytest.raises(QuotaDepasse):
+        gestionnaire.soumettre("s1", "c", taches_bloquees(liberation))
+    gestionnaire.soumettre("s2", "a", taches_bloquees(liberation))   # autre session : accepté
+
+
+def test_capacite_du_serveur(pool, liberation):
+    gestionnaire = GestionnaireTravaux(pool, capacite=2)
+    gestionnaire.soumettre("s1", "a", taches_bloquees(liberation))
+    gestionnaire.soumettre("s2", "a", taches_bloquees(liberation))
+    with pytest.raises(FileSaturee):
+        gestionnaire.soumettre("s3", "a", taches_bloquees(liberation))
+    gestionnaire.annuler("s1")
+    gestionnaire.soumettre("s3", "a", taches_bloquees(liberation))  # place libérée par l'annulation
+
+
+def test_annulation_explicite(pool, liberation):
+    gestionnaire = GestionnaireTravaux(pool)
+    travail = gestionnaire.soumettre("s1", "a", taches_bloquees(liberation, 20))
+    travail.annuler()
+    liberation.set()
+    with pytest.raises(TravailAnnule):
+        travail.resultat(DELAI_S)
+    assert travail.statut == ANNULE and travail.faites < 20
+
+
+def test_remplacement_ou_reutilisation_par_signature(pool, liberation):
+    gestionnaire = GestionnaireTravaux(pool)
+    premier = gestionnaire.soumettre("s1", "a", taches_bloquees(liberation), signature=1)
+    assert gestionnaire.soumettre("s1", "a", taches_bloquees(liberation), signature=1) is premier
+    second = gestionnaire.soumettre("s1", "a", [(carre, 3)], signature=2)
+    assert premier.annule
+    assert second.resultat(DELAI_S) == [9]
+
+
+def test_annulation_a_la_deconnexion(pool, liberation):
+    sessions_actives = {"s1"}
+    gestionnaire = GestionnaireTravaux(pool, en_vol_par_travail=1, est_active=lambda session: session in sessions_actives)
+    travail = gestionnaire.soumettre("s1", "a", taches_bloquees(liberation, 20))
+    sessions_actives.clear()
+    with pytest.raises(TravailAnnule):
+        travail.resultat(DELAI_S)
+
+
+def test_erreur_d_une_tache(pool):
+    gestionnaire = GestionnaireTravaux(pool)
+    travail = gestionnaire.soumettre("s1", "a", [(carre, 2), (echouer,)])
+    with pytest.raises(ValueError, match="bien invalide"):
+        travail.resultat(DELAI_S)
+    assert travail.statut == ECHEC
+
+
+def test_contre_pression(pool, liberation):
+    gestionnaire = GestionnaireTravaux(pool, en_vol_max=2, en_vol_par_travail=2)
+    lancees = []
+
+    def taches():
+        for k in range(10):
+            lancees.append(k)
+            yield bloquer, liberation
+
+    travail = gestionnaire.soumettre("s1", "a", taches(), total=10)
+    time.sleep(0.5)
+    assert len(lancees) <= 3     # deux tâches dans le pool, au plus une en attente de place
+    liberation.set()
+    assert travail.resultat(DELAI_S) == [0] * 10
+
+
+def test_pool_partage_remplace_apres_la_mort_d_un_processus(monkeypatch):
+    monkeypatch.setattr(travaux, "NB_PROCESSUS", 1)
+    monkeypatch.setattr(travaux, "_executeur", None)
+    gestionnaire = GestionnaireTravaux()
+    try:
+        travail = gestionnaire.soumettre("s1", "a", [(os._exit, 1)])
+        with pytest.raises(BrokenProcessPool):
+            travail.resultat(60)
+        assert travail.statut == ECHEC
+        assert gestionnaire.soumettre("s1", "b", [(carre, 3)]).resultat(60) == [9]
+    finally:
+        if travaux._executeur is not None:
+            travaux._executeur.shutdown()
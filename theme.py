@@ -0,0 +1,179 @@
+"""Charte PATRIM partagée par l'app et les rapports PDF : palette, formatage des montants et feuille de style."""
+from functools import lru_cache
+
+# --- PALETTE DE COULEURS ---
+COLOR_ROUGE = "#8a0e01"
+COLOR_VERT = "#2e7d32"
+COLOR_GRIS = "#393939"
+COLOR_ROSE = "#d35f52"
+COLOR_BLEU_PATRIMOINE = "#34495e"
+COLOR_BG_CARD = "#ffffff"
+
+
+# --- FORMATAGE ---
+def fmt(nombre):
+    return f"{nombre:,.0f}".replace(",", ".")
+
+
+def fmt_dec(nombre):
+    return f"{nombre:,.2f}".replace(",", ".").replace(".", ",")
+
+
+# --- FEUILLE DE STYLE DE L'APP ---
+@lru_cache(maxsize=None)
+def css_application(arcades_url=None):
+    """Bloc <style> de l'app (palette, écrans mobile/ordinateur, impression), construit une fois par processus."""
+    bg_css = ""
+    if arcades_url:
+        bg_css = f"""
+        .arcades-overlay {{
+            position: fixed; top: 0; left: 0; width: 100%; height: 100%;
+            background-image: url("{arcades_url}");
+            background-size: cover; background-position: center;
+            opacity: 0.05; z-index: -1; pointer-events: none; mix-blend-mode: overlay;
+        }}
+        """
+    return f"""
+    <style>
+    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700;800&display=swap');
+    :root {{ --primary-red: {COLOR_ROUGE}; --text-grey: {COLOR_GRIS}; }}
+    
+    /* FOND ANIMÉ 3D */
+    .background-container {{
+        position: fixed; top: 0; left: 0; width: 100vw; height: 100vh;
+        background-color: #f4f7f9; z-index: -3; overflow: hidden;
+    }}
+    .orb {{
+        position: absolute; border-radius: 50%; filter: blur(80px); opacity: 0.6;
+        animation: float 20s infinite ease-in-out alternate;
+    }}
+    .orb-1 {{ width: 70vh; height: 70vh; background: radial-gradient(circle, {COLOR_ROSE}, {COLOR_ROUGE}); top: -15%; left: -15%; animation-duration: 25s; }}
+    .orb-2 {{ width: 60vh; height: 60vh; background: radial-gradient(circle, #ffdfba, {COLOR_ROSE}); bottom: -15%; right: -15%; animation-delay: -5s; animation-duration: 28s; }}
+    .orb-3 {{ width: 40vh; height: 40vh; background: radial-gradient(circle, #ffffff, #dceefc); top: 40%; left: 40%; opacity: 0.8; animation: float-mid 35s infinite ease-in-out; }}
+    
+    @keyframes float {{ 0% {{ transform: translate(0, 0) rotate(0deg); }} 100% {{ transform: translate(-30px, 20px) rotate(-5deg); }} }}
+    @keyframes float-mid {{ 0% {{ transform: translate(0, 0) scale(1); }} 50% {{ transform: translate(40px, -30px) scale(1.1); }} 100% {{ transform: translate(0, 0) scale(1); }} }}
+
+    {bg_css}
+
+    /* BASE */
+    .stApp {{ background-color: transparent !important; font-family: 'Inter', sans-serif; color: var(--text-grey); }}
+    [data-testid="stAppViewContainer"] {{ background-color: transparent !important; }}
+    
+    /* ELEMENTS COMMUNS */
+    div[data-testid="stSidebarHeader"] {{ display: none; }}
+    .block-container {{ padding-top: 1rem !important; padding-bottom: 5rem !important; }}
+    .logo-container-html {{ display: flex; justify-content: center; align-items: center; margin-bottom: 20px; margin-top: 20px; padding: 0; background: transparent !important; }}
+    .custom-logo {{ width: 100% !important; max-width: 300px !important; height: auto; }}
+    
+    /* WIDGETS */
+    .stSlider > div > div > div > div {{ background-color: {COLOR_ROUGE} !important; }} 
+    .stNumberInput input, .stSelectbox div[data-baseweb="select"] {{ background-color: #ffffff !important; color: {COLOR_GRIS} !important; border: 1px solid #e0e0e0; border-radius: 8px; }}
+    button[data-testid="stNumberInputStepDown"], button[data-testid="stNumberInputStepUp"] {{ background-color: #ffffff !important; color: {COLOR_GRIS} !important; border-color: #e0e0e0 !important; font-weight: bold !important; }}
+    
+    /* --- CORRECTION VISIBILITÉ TEXTE SIDEBAR --- */
+    /* Force TOUS les titres (h1, h2, h3) dans la sidebar à être GRIS FONCÉ */
+    [data-testid="stSidebar"] h1, 
+    [data-testid="stSidebar"] h2, 
+    [data-testid="stSidebar"] h3 {{
+        color: #393939 !important;
+        font-weight: 800 !important;
+    }}
+    
+    /* Force TOUS les textes standards, labels et spans à être GRIS FONCÉ */
+    [data-testid="stSidebar"] p, 
+    [data-testid="stSidebar"] label, 
+    [data-testid="stSidebar"] span,
+    [data-testid="stSidebar"] div {{
+        color: #393939 !important;
+    }}
+    
+    /* Exception pour les captions (petits textes) un peu plus clairs */
+    [data-testid="stSidebar"] .stCaption {{
+        color: #666666 !important;
+    }}
+
+    /* KPI CARDS */
+    .kpi-card {{ 
+        background-color: rgba(255, 255, 255, 0.75); backdrop-filter: blur(15px);
+        padding: 25px 20px; border-radius: 16px; border: 1px solid rgba(255,255,255,0.6);
+        box-shadow: 0 4px 15px rgba(0,0,0,0.03); margin-bottom: 20px; position: relative; z-index: 1; transition: all 0.3s ease; height: 100%;
+    }}
+    .kpi-label {{ font-size: 0.8rem; font-weight: 600; color: #666; margin-bottom: 10px; }}
+    .kpi-value {{ font-size: 2.2rem; font-weight: 800; letter-spacing: -1px; }}
+    .kpi-sub {{ font-size: 0.85rem; color: #888; margin-top: 8px; font-weight: 500; }}
+
+    /* GRAPHIQUE */
+    .graph-header {{ color: {COLOR_GRIS}; padding: 10px 0px; font-weight: 800; font-size: 1.2rem; text-align: left; margin-top: 5px; position: relative; z-index: 2; }}
+    .graph-container {{ 
+        background-color: rgba(255, 255, 255, 0.8); backdrop-filter: blur(15px);
+        padding: 20px; border-radius: 24px; border: 1px solid rgba(255,255,255,0.6);
+        box-shadow: 0 8px 30px rgba(0,0,0,0.03); position: relative; z-index: 1; margin-bottom: 20px;
+    }}
+    .stTabs [data-baseweb="tab-list"] {{ gap: 10px; background-color: transparent; border-bottom: none; }}
+    .stTabs [data-baseweb="tab"] {{ height: 40px; border-radius: 20px; background-color: rgba(255,255,255,0.6); border: 1px solid rgba(0,0,0,0.05); color: {COLOR_GRIS}; font-weight: 600; padding: 0 20px; }}
+    .stTabs [data-baseweb="tab"][aria-selected="true"] {{ background-color: {COLOR_ROUGE}; color: white; border: none; }}
+
+    /* CONTEXTE & CONCLUSION */
+    .context-box, .conclusion-box {{
+        background-color: rgba(255, 255, 255, 0.8); backdrop-filter: blur(12px);
+        border-radius: 20px; padding: 25px; 
+        box-shadow: 0 4px 15px rgba(0,0,0,0.03); border: 1px solid rgba(255,255,255,0.6);
+    }}
+    .context-title {{ font-weight: 700; text-transform: uppercase; font-size: 0.85rem; margin-bottom: 15px; letter-spacing: 1px; }}
+    .context-text {{ color: {COLOR_GRIS}; font-size: 1.05rem; font-weight: 500; line-height: 1.5; }}
+    .conclusion-title {{ color: {COLOR_GRIS}; margin-top:0; margin-bottom: 25px; font-size: 1.6rem; font-weight: 800; letter-spacing: -1px; }}
+    .conclusion-p {{ font-size: 1.15rem; line-height: 1.8; color: #555; margin-bottom: 20px; font-weight: 500; }}
+    .highlight {{ font-weight: 700; color: {COLOR_GRIS}; background-color: rgba(255,255,255,0.5); padding: 2px 6px; border-radius: 4px; border:1px solid #eee; }}
+    .highlight-red {{ font-weight: 800; color: {COLOR_ROUGE}; }}
+
+
+    /* --- GESTION DES ECRANS --- */
+
+    /* MODE ORDINATEUR (ECRANS > 768px) */
+    @media (min-width: 769px) {{
+        [data-testid="stSidebar"] {{ 
+            min-width: 350px !important; 
+            max-width: 350px !important;
+            background-color: rgba(255, 255, 255, 0.65); 
+            backdrop-filter: blur(25px);
+            border-right: 1px solid rgba(255,255,255,0.4);
+            box-shadow: 5px 0 20px rgba(0,0,0,0.03); 
+        }}
+    }}
+
+    /* MODE MOBILE (ECRANS < 768px) */
+    @media (max-width: 768px) {{
+        /* Le menu prend tout l'écran quand il est ouvert pour être propre */
+        [data-testid="stSidebar"] {{ 
+            width: 100% !important; 
+            min-width: 100% !important;
+            background-color: #ffffff !important; /* Fond blanc opaque sur mobile */
+            border-right: none;
+        }}
+        
+        /* Ajustement des marges */
+        .block-container {{ padding-left: 1rem !important; padding-right: 1rem !important; }}
+        
+        /* Titres plus petits */
+        h1 {{ font-size: 1.8rem !important; }}
+        .graph-header {{ font-size: 1rem !important; }}
+        
+        /* Cartes KPI compactes */
+        .kpi-value {{ font-size: 1.6rem !important; }}
+        .kpi-card {{ padding: 15px !important; margin-bottom: 10px !important; }}
+        
+        /* Cacher les décors lourds */
+        .arcades-overlay {{ display: none !important; }}
+        .orb {{ opacity: 0.3 !important; }}
+    }}
+
+    /* IMPRESSION */
+    @media print {{
+        @page {{ size: A4; margin: 10mm; }}
+        .background-container, .arcades-overlay, [data-testid="stSidebar"], header, footer, .no-print {{ display: none !important; }}
+        html, body, .stApp {{ background: white !important; }}
+        .kpi-card, .graph-container, .context-box, .conclusion-box {{ box-shadow: none !important; border: 1px solid #ccc !important; page-break-inside: avoid; }}
+    }}
+    </style>
+"""
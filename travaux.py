@@ -0,0 +1,293 @@
+"""Pool de processus partagé pour les calculs lourds, et file de travaux bornée par session.
+
+Le pool est créé au premier appel et réutilisé par toutes les sessions du serveur.
+Le contexte « spawn » évite de forker un serveur Streamlit multi-thread.
+
+Les sessions de l'app n'y soumettent pas directement : elles passent par
+``GestionnaireTravaux``, qui découpe chaque travail en tâches envoyées au pool au
+fil de l'eau. Le thread du script Streamlit ne calcule ni n'attend plus : les
+interactions légères restent fluides pendant qu'un collègue lance un gros travail.
+Les garde-fous sont les suivants :
+
+- file bornée : au-delà de ``CAPACITE`` travaux en attente ou en cours, ``FileSaturee`` ;
+- quota : ``QUOTA_SESSION`` travaux actifs par session, au-delà ``QuotaDepasse`` ;
+- contre-pression : au plus ``EN_VOL_MAX`` tâches dans le pool (toutes sessions) et
+  ``EN_VOL_PAR_TRAVAIL`` par travail, ce qui entrelace les travaux concurrents ;
+- annulation : explicite, par remplacement (même session, même clé, entrées
+  différentes) ou à la déconnexion de la session ;
+- progression : tâches terminées sur tâches prévues, lue par la page à intervalle régulier.
+"""
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import CancelledError, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+NB_PROCESSUS = os.cpu_count() or 1
+CAPACITE = 32
+QUOTA_SESSION = 2
+TRAVAUX_SIMULTANES = max(2, NB_PROCESSUS)
+EN_VOL_MAX = 2 * NB_PROCESSUS
+EN_VOL_PAR_TRAVAIL = NB_PROCESSUS
+ATTENTE_S = 0.2   # période de vérification des annulations pendant les attentes
+
+EN_ATTENTE, EN_COURS, TERMINE, ANNULE, ECHEC = "en attente", "en cours", "terminé", "annulé", "échec"
+
+_executeur = None
+_verrou = threading.Lock()
+
+
+def executeur():
+    global _executeur
+    with _verrou:
+        if _executeur is None:
+            _executeur = ProcessPoolExecutor(max_workers=NB_PROCESSUS, mp_context=multiprocessing.get_context("spawn"))
+    return _executeur
+
+
+def reinitialiser_executeur(pool_casse):
+    """Abandonne le pool partagé après un ``BrokenProcessPool`` (processus mort) ; le suivant est recréé à la demande."""
+    global _executeur
+    with _verrou:
+        if _executeur is pool_casse:
+            _executeur = None
+    pool_casse.shutdown(wait=False, cancel_futures=True)
+
+
+# --- ERREURS ---
+class FileSaturee(RuntimeError):
+    """Le serveur a déjà ``CAPACITE`` travaux en attente ou en cours."""
+
+
+class QuotaDepasse(RuntimeError):
+    """La session a déjà ``QUOTA_SESSION`` travaux actifs."""
+
+
+class TravailAnnule(CancelledError):
+    pass
+
+
+# --- SESSIONS STREAMLIT ---
+def session_courante():
+    """Identifiant de la session Streamlit du thread courant ("local" hors serveur)."""
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    contexte = get_script_run_ctx()
+    return contexte.session_id if contexte else "local"
+
+
+def session_active(session_id):
+    """Faux seulement si le serveur Streamlit sait la session fermée (onglet fermé, déconnexion)."""
+    from streamlit import runtime
+
+    if not runtime.exists():
+        return True
+    return runtime.get_instance().is_active_session(session_id)
+
+
+# --- TRAVAUX ---
+class Travail:
+    """Travail d'une session : tâches ``(fonction, *arguments)`` exécutées dans le pool, puis combinées.
+
+    ``combiner`` reçoit un itérateur des résultats des tâches, dans l'ordre de
+    soumission et au fur et à mesure (un ZIP peut ainsi s'écrire sans tout garder
+    en mémoire) ; sa valeur de retour est le résultat du travail.
+    """
+
+    def __init__(self, session_id, cle, signature, taches, combiner, total, libelle):
+        self.session_id = session_id
+        self.cle = cle
+        self.signature = signature
+        self.libelle = libelle
+        self.total = total
+        self.faites = 0
+        self.statut = EN_ATTENTE
+        self._taches = taches
+        self._combiner = combiner
+        self._annulation = threading.Event()
+        self._fin = threading.Event()
+        self._resultat = None
+        self.erreur = None
+        self._futures = deque()
+
+    @property
+    def annule(self):
+        """Annulation demandée (le travail peut encore finir sa tâche en cours)."""
+        return self._annulation.is_set()
+
+    @property
+    def actif(self):
+        """En attente ou en cours, et pas d'annulation demandée (compte dans la file et le quota)."""
+        return self.statut in (EN_ATTENTE, EN_COURS) and not self._annulation.is_set()
+
+    @property
+    def progression(self):
+        """Fraction terminée entre 0 et 1 (None si le nombre de tâches est inconnu)."""
+        if self.statut == TERMINE:
+            return 1.0
+        if not self.total:
+            return None
+        return min(self.faites / self.total, 1.0)
+
+    def annuler(self):
+        """Demande l'arrêt : plus aucune tâche soumise, celles en attente dans le pool sont retirées."""
+        self._annulation.set()
+        for future in list(self._futures):
+            future.cancel()
+
+    def resultat(self, timeout=None):
+        """Résultat du travail (attend la fin) ; relance l'erreur ou ``TravailAnnule``."""
+        if not self._fin.wait(timeout):
+            raise TimeoutError(f"Travail « {self.libelle} » toujours en cours")
+        if self.erreur is not None:
+            raise self.erreur
+        return self._resultat
+
+    def _verifier(self):
+        if self._annulation.is_set():
+            raise TravailAnnule(f"Travail « {self.libelle} » annulé")
+
+
+class GestionnaireTravaux:
+    """File de travaux partagée par les sessions, au-dessus du pool de processus."""
+
+    def __init__(self, pool=None, capacite=CAPACITE, quota_session=QUOTA_SESSION, travaux_simultanes=TRAVAUX_SIMULTANES,
+                 en_vol_max=EN_VOL_MAX, en_vol_par_travail=EN_VOL_PAR_TRAVAIL, est_active=session_active):
+        self._pool = pool
+        self.capacite = capacite
+        self.quota_session = quota_session
+        self.en_vol_par_travail = en_vol_par_travail
+        self._est_active = est_active
+        self._places = threading.BoundedSemaphore(en_vol_max)
+        self._coordinateurs = ThreadPoolExecutor(max_workers=travaux_simultanes, thread_name_prefix="travaux")
+        self._travaux = {}   # (session, clé) -> Travail
+        self._verrou = threading.Lock()
+
+    def soumettre(self, session_id, cle, taches, combiner=list, *, signature=None, total=None, libelle=""):
+        """Place un travail dans la file et le renvoie aussitôt.
+
+        Un travail actif de la même session et de même ``cle`` est réutilisé si sa
+        ``signature`` (entrées) est identique, annulé et remplacé sinon.
+        """
+        if total is None and hasattr(taches, "__len__"):
+            total = len(taches)
+        with self._verrou:
+            precedent = self._travaux.get((session_id, cle))
+            if precedent is not None and precedent.actif:
+                if precedent.signature == signature:
+                    return precedent
+                precedent.annuler()
+            actifs = [t for t in self._travaux.values() if t.actif and t is not precedent]
+            if len(actifs) >= self.capacite:
+                raise FileSaturee(f"{len(actifs)} travaux déjà en file sur le serveur, réessayer dans un instant")
+            if sum(t.session_id == session_id for t in actifs) >= self.quota_session:
+                raise QuotaDepasse(f"{self.quota_session} travaux déjà en cours pour cette session")
+            travail = Travail(session_id, cle, signature, iter(taches), combiner, total, libelle or str(cle))
+            self._travaux[(session_id, cle)] = travail
+        self._coordinateurs.submit(self._executer, travail)
+        return travail
+
+    def travail(self, session_id, cle):
+        """Travail actif de la session pour ``cle`` (None s'il n'y en a pas)."""
+        with self._verrou:
+            return self._travaux.get((session_id, cle))
+
+    def annuler(self, session_id, cle=None):
+        """Annule un travail de la session, ou tous si ``cle`` est None."""
+        with self._verrou:
+            cibles = [t for (session, c), t in self._travaux.items() if session == session_id and (cle is None or c == cle)]
+        for travail in cibles:
+            travail.annuler()
+
+    def statistiques(self):
+        with self._verrou:
+            actifs = [t for t in self._travaux.values() if t.actif]
+        return {
+            "en_attente": sum(t.statut == EN_ATTENTE for t in actifs),
+            "en_cours": sum(t.statut == EN_COURS for t in actifs),
+            "sessions": len({t.session_id for t in actifs}),
+        }
+
+    # --- exécution (threads coordinateurs : ils attendent le pool sans calculer) ---
+    def _verifier(self, travail):
+        if not travail._annulation.is_set() and not self._est_active(travail.session_id):
+            travail.annuler()
+        travail._verifier()
+
+    def _resultats(self, travail):
+        pool = self._pool or executeur()
+        futures = travail._futures
+
+        def liberer(future):
+            self._places.release()
+            if not future.cancelled():
+                travail.faites += 1
+
+        def premier_resultat():
+            future = futures[0]
+            while True:
+                self._verifier(travail)
+                try:
+                    resultat = future.result(timeout=ATTENTE_S)
+                    break
+                except TimeoutError:
+                    continue
+            futures.popleft()
+            return resultat
+
+        try:
+            for fonction, *arguments in travail._taches:
+                while not self._places.acquire(timeout=ATTENTE_S):
+                    self._verifier(travail)
+                try:
+                    self._verifier(travail)
+                    future = pool.submit(fonction, *arguments)
+                except BaseException:
+                    self._places.release()
+                    raise
+                future.add_done_callback(liberer)
+                futures.append(future)
+                while len(futures) >= self.en_vol_par_travail:
+                    yield premier_resultat()
+            while futures:
+                yield premier_resultat()
+        except BrokenProcessPool:
+            # Un processus est mort (mémoire, signal) : ce travail échoue, les suivants auront un pool neuf
+            if self._pool is None:
+                reinitialiser_executeur(pool)
+            raise
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def _executer(self, travail):
+        try:
+            travail._verifier()
+            travail.statut = EN_COURS
+            travail._resultat = travail._combiner(self._resultats(travail))
+            travail.statut = TERMINE
+        except (TravailAnnule, CancelledError) as exc:
+            travail.erreur = exc if isinstance(exc, TravailAnnule) else TravailAnnule(str(exc))
+            travail.statut = ANNULE
+        except Exception as exc:
+            travail.erreur = exc
+            travail.statut = ECHEC
+        finally:
+            travail._fin.set()
+            # La file ne garde que les travaux actifs ; le résultat reste accessible par l'objet Travail
+            with self._verrou:
+                if self._travaux.get((travail.session_id, travail.cle)) is travail:
+                    del self._travaux[(travail.session_id, travail.cle)]
+
+
+_gestionnaire = None
+
+
+def gestionnaire():
+    """Gestionnaire de travaux du processus, partagé par toutes les sessions."""
+    global _gestionnaire
+    with _verrou:
+        if _gestionnaire is None:
+            _gestionnaire = GestionnaireTravaux()
+    return _gestionnaire